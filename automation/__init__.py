@@ -6,8 +6,13 @@ anti-detection, proxy rotation, and CAPTCHA solving capabilities.
 """
 
 from automation.browser import Browser
+from automation.context_pool import ContextPool
+from automation.page_pool import PagePool
+from automation.fleet import BrowserFleet
 from automation.anti_detect import AntiDetect
 from automation.proxy_rotation import ProxyRotation
+from automation.routing import RoutingProfile
+from automation.response_cache import ResponseCache
 from automation.captcha_solver import CaptchaSolver
 from automation.page_actions import PageActions
 from automation.screenshot import ScreenshotManager
@@ -16,8 +21,13 @@ __version__ = "1.0.0"
 
 __all__ = [
     "Browser",
+    "ContextPool",
+    "PagePool",
+    "BrowserFleet",
     "AntiDetect",
     "ProxyRotation",
+    "RoutingProfile",
+    "ResponseCache",
     "CaptchaSolver",
     "PageActions",
     "ScreenshotManager",
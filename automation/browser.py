@@ -6,17 +6,27 @@ Playwright browser instances with proxy and anti-detection support.
 """
 
 import asyncio
+import inspect
 import logging
-from typing import Optional, List, Dict, Any
+import os
+from typing import Optional, List, Dict, Any, Callable, Union
 from contextlib import asynccontextmanager
 
-from playwright.async_api import async_playwright, Browser as PWBrowser, Page, BrowserContext
+from playwright.async_api import Browser as PWBrowser, Page, BrowserContext
 
 from automation.anti_detect import AntiDetect
-from automation.proxy_rotation import ProxyRotation
+from automation.cookie_manager import session_storage_init_script
+from automation.driver import PlaywrightDriver, shared_driver
+from automation.profiles import clone_profile
+from automation.proxy_rotation import PROXY_ERROR_MARKERS, ProxyRotation
+from automation.response_cache import ResponseCache
+from automation.routing import RoutingProfile
 
 logger = logging.getLogger(__name__)
 
+# Called as callback(browser, lost_contexts) after an unexpected disconnect
+CrashListener = Callable[["Browser", List[BrowserContext]], Any]
+
 
 class Browser:
     """
@@ -25,12 +35,30 @@ class Browser:
     Manages Playwright browser lifecycle with integrated
     proxy rotation and anti-detection features.
 
+    With user_data_dir the browser runs a persistent context on that
+    profile, keeping Chromium's HTTP and code caches between runs. All
+    pages then share that one context: new_page() applies the viewport
+    and anti-detection scripts per page, while proxy, locale and user
+    agent are fixed when the browser launches. Routing profiles and
+    the response cache work by installing routes, which disable the
+    browser's HTTP cache, so they cannot be combined with user_data_dir.
+
     Args:
         headless: Run browser in headless mode.
         browser_type: Browser engine ('chromium', 'firefox', 'webkit').
         proxy_rotation: Optional ProxyRotation instance.
         user_data_dir: Optional persistent browser profile directory.
         timeout: Default navigation timeout in milliseconds.
+        routing_profile: Optional request blocking profile for all contexts.
+        response_cache: Optional on-disk cache for static responses.
+        driver: Playwright driver manager; defaults to the process-wide
+            driver shared by all Browser instances.
+        relaunch_attempts: Relaunch attempts after the browser crashes
+            or disconnects (0 disables relaunching).
+        relaunch_backoff: Seconds before the first relaunch attempt,
+            doubled after each failure.
+        profile_template: Warmed-up profile cloned into user_data_dir
+            when that directory does not exist yet.
 
     Example:
         >>> async with Browser(headless=True) as browser:
@@ -45,15 +73,35 @@ class Browser:
         proxy_rotation: Optional[ProxyRotation] = None,
         user_data_dir: Optional[str] = None,
         timeout: int = 30000,
+        routing_profile: Optional[RoutingProfile] = None,
+        response_cache: Optional[ResponseCache] = None,
+        driver: Optional[PlaywrightDriver] = None,
+        relaunch_attempts: int = 3,
+        relaunch_backoff: float = 1.0,
+        profile_template: Optional[str] = None,
     ):
+        if user_data_dir and (routing_profile or response_cache):
+            raise ValueError("routing_profile and response_cache are not supported with user_data_dir")
         self.headless = headless
         self.browser_type = browser_type
         self.proxy_rotation = proxy_rotation
         self.user_data_dir = user_data_dir
+        self.profile_template = profile_template
         self.timeout = timeout
+        self.routing_profile = routing_profile
+        self.response_cache = response_cache
+        self.driver = driver or shared_driver
         self._playwright = None
+        self.relaunch_attempts = relaunch_attempts
+        self.relaunch_backoff = relaunch_backoff
+        self.crash_count = 0
         self._browser: Optional[PWBrowser] = None
+        self._persistent_context: Optional[BrowserContext] = None
+        self._initial_page: Optional[Page] = None
         self._contexts: List[BrowserContext] = []
+        self._crash_listeners: List[CrashListener] = []
+        self._relaunch_task: Optional[asyncio.Task] = None
+        self._closing = False
 
     async def __aenter__(self):
         """Async context manager entry - launch browser."""
@@ -66,33 +114,135 @@ class Browser:
 
     async def launch(self) -> None:
         """Launch the Playwright browser instance."""
-        self._playwright = await async_playwright().start()
+        self._closing = False
+        self._playwright = await self.driver.acquire()
+        try:
+            await self._launch_browser()
+        except Exception:
+            self._playwright = None
+            await self.driver.release()
+            raise
 
+    async def _launch_browser(self) -> None:
+        """Start a browser on the acquired driver and watch it for crashes."""
         launcher = getattr(self._playwright, self.browser_type)
         launch_options: Dict[str, Any] = {
             "headless": self.headless,
         }
 
         # Add proxy if available
+        proxy = None
         if self.proxy_rotation:
             proxy = self.proxy_rotation.get_next()
             if proxy:
                 launch_options["proxy"] = {"server": proxy}
                 logger.info("Launching browser with proxy: %s", proxy)
 
+        if self.user_data_dir:
+            await self._launch_persistent(launcher, proxy)
+            return
+
         self._browser = await launcher.launch(**launch_options)
+        self._browser.on("disconnected", self._on_disconnected)
         logger.info(
             "Browser launched: %s (headless=%s)",
             self.browser_type,
             self.headless,
         )
 
+    async def _launch_persistent(self, launcher: Any, proxy: Optional[str]) -> None:
+        """Launch a persistent context on user_data_dir, cloning the template if needed."""
+        if self.profile_template and not os.path.exists(self.user_data_dir):
+            await asyncio.to_thread(clone_profile, self.profile_template, self.user_data_dir)
+
+        context_options = self.build_context_options(proxy=proxy)
+        context = await launcher.launch_persistent_context(
+            self.user_data_dir,
+            headless=self.headless,
+            **context_options,
+        )
+        self._persistent_context = context
+        self._initial_page = context.pages[0] if context.pages else None
+        context.on("close", self._on_disconnected)
+        await self._setup_context(context, context_options)
+        logger.info(
+            "Browser launched: %s (headless=%s, profile=%s)",
+            self.browser_type,
+            self.headless,
+            self.user_data_dir,
+        )
+
+    def add_crash_listener(self, callback: CrashListener) -> None:
+        """
+        Register a callback for unexpected browser disconnects.
+
+        The callback receives this Browser and the contexts that were
+        lost, before relaunching starts, so in-flight work can be
+        requeued. It may be a plain function or a coroutine function.
+        """
+        self._crash_listeners.append(callback)
+
+    def _on_disconnected(self, target: Any) -> None:
+        if self._closing or target is not (self._persistent_context or self._browser):
+            return
+
+        self.crash_count += 1
+        lost = list(self._contexts)
+        if self._persistent_context:
+            lost.append(self._persistent_context)
+        self._contexts.clear()
+        self._browser = None
+        self._persistent_context = None
+        logger.error("Browser disconnected unexpectedly (%d contexts lost)", len(lost))
+        self._relaunch_task = asyncio.ensure_future(self._recover(lost))
+
+    async def _recover(self, lost: List[BrowserContext]) -> None:
+        """Notify crash listeners, then relaunch with exponential backoff."""
+        for callback in list(self._crash_listeners):
+            try:
+                result = callback(self, lost)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error("Crash listener failed: %s", str(e))
+
+        delay = self.relaunch_backoff
+        for attempt in range(1, self.relaunch_attempts + 1):
+            await asyncio.sleep(delay)
+            if self._closing:
+                return
+            try:
+                await self._launch_browser()
+                logger.info("Browser relaunched after crash (attempt %d)", attempt)
+                return
+            except Exception as e:
+                logger.warning("Relaunch attempt %d failed: %s", attempt, str(e))
+                delay *= 2
+
+        logger.error("Browser could not be relaunched after %d attempts", self.relaunch_attempts)
+
+    async def wait_until_running(self) -> None:
+        """
+        Wait for an in-progress crash relaunch to finish.
+
+        Raises:
+            RuntimeError: If the browser is not running afterwards.
+        """
+        task = self._relaunch_task
+        if task and not task.done():
+            await asyncio.shield(task)
+        if not self._browser and not self._persistent_context:
+            raise RuntimeError("Browser not launched. Call launch() first.")
+
     async def new_page(
         self,
         anti_detect: Optional[AntiDetect] = None,
         viewport: Optional[Dict[str, int]] = None,
         locale: str = "en-US",
         timezone: Optional[str] = None,
+        routing_profile: Optional[RoutingProfile] = None,
+        affinity_key: Optional[str] = None,
+        storage_state: Optional[Union[str, Dict[str, Any]]] = None,
     ) -> Page:
         """
         Create a new browser page with optional anti-detection.
@@ -102,13 +252,92 @@ class Browser:
             viewport: Custom viewport size {'width': int, 'height': int}.
             locale: Browser locale setting.
             timezone: Timezone override.
+            routing_profile: Request blocking profile overriding the browser default.
+            affinity_key: Target host or session key; contexts with the same
+                key reuse the same rotated proxy while it stays healthy.
+            storage_state: Snapshot from CookieManager.load_state() or a
+                storage state file path, to start the page already logged in.
 
         Returns:
             Configured Playwright Page instance.
         """
-        if not self._browser:
-            raise RuntimeError("Browser not launched. Call launch() first.")
+        await self.wait_until_running()
+        if self._persistent_context:
+            if storage_state:
+                raise ValueError("storage_state is not supported with user_data_dir")
+            if routing_profile:
+                raise ValueError("routing_profile is not supported with user_data_dir")
+            return await self._new_persistent_page(anti_detect, viewport)
+
+        context_options = self.build_context_options(
+            anti_detect=anti_detect,
+            viewport=viewport,
+            locale=locale,
+            timezone=timezone,
+            affinity_key=affinity_key,
+            storage_state=storage_state,
+        )
+        context = await self.new_context(routing_profile=routing_profile, **context_options)
+        if isinstance(storage_state, dict):
+            script = session_storage_init_script(storage_state)
+            if script:
+                await context.add_init_script(script)
+
+        page = await context.new_page()
+        page.set_default_timeout(self.timeout)
+
+        # Inject anti-detection scripts
+        if anti_detect:
+            await anti_detect.apply_to_page(page)
+
+        logger.debug("New page created with viewport %s", context_options["viewport"])
+        return page
+
+    async def _new_persistent_page(
+        self,
+        anti_detect: Optional[AntiDetect],
+        viewport: Optional[Dict[str, int]],
+    ) -> Page:
+        """Open a page in the persistent context, reusing its initial blank page."""
+        page = self._initial_page
+        self._initial_page = None
+        if page is None or page.is_closed():
+            page = await self._persistent_context.new_page()
+        page.set_default_timeout(self.timeout)
+        if viewport:
+            await page.set_viewport_size(viewport)
+
+        if anti_detect:
+            await anti_detect.apply_to_page(page)
+        return page
+
+    def build_context_options(
+        self,
+        anti_detect: Optional[AntiDetect] = None,
+        viewport: Optional[Dict[str, int]] = None,
+        locale: str = "en-US",
+        timezone: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        proxy: Optional[str] = None,
+        affinity_key: Optional[str] = None,
+        storage_state: Optional[Union[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build the keyword arguments for a new browser context.
+
+        Args:
+            anti_detect: AntiDetect instance supplying user agent and headers.
+            viewport: Custom viewport size {'width': int, 'height': int}.
+            locale: Browser locale setting.
+            timezone: Timezone override.
+            user_agent: Explicit user agent, takes precedence over anti_detect.
+            proxy: Explicit proxy URL, otherwise one is taken from rotation.
+            affinity_key: Affinity key passed to the proxy rotation.
+            storage_state: Storage state snapshot or file path to start from.
 
+        Returns:
+            Dict of Playwright context options.
+        """
         context_options: Dict[str, Any] = {
             "viewport": viewport or {"width": 1920, "height": 1080},
             "locale": locale,
@@ -123,25 +352,99 @@ class Browser:
             context_options["user_agent"] = anti_detect.get_user_agent()
             if anti_detect.extra_headers:
                 context_options["extra_http_headers"] = anti_detect.extra_headers
+        if user_agent:
+            context_options["user_agent"] = user_agent
 
         # Set proxy for this context if rotation enabled
-        if self.proxy_rotation:
-            proxy = self.proxy_rotation.get_next()
-            if proxy:
-                context_options["proxy"] = {"server": proxy}
+        if not proxy and self.proxy_rotation:
+            proxy = self.proxy_rotation.get_next(affinity_key=affinity_key)
+        if proxy:
+            context_options["proxy"] = {"server": proxy}
+
+        # Playwright restores cookies and localStorage; sessionStorage needs an init script
+        if isinstance(storage_state, dict):
+            context_options["storage_state"] = {
+                "cookies": storage_state.get("cookies", []),
+                "origins": storage_state.get("origins", []),
+            }
+        elif storage_state:
+            context_options["storage_state"] = storage_state
+
+        return context_options
+
+    async def new_context(
+        self,
+        routing_profile: Optional[RoutingProfile] = None,
+        **context_options: Any,
+    ) -> BrowserContext:
+        """
+        Create a tracked browser context.
 
-        context = await self._browser.new_context(**context_options)
-        self._contexts.append(context)
+        Contexts are forgotten again once they are closed, so callers
+        that recycle contexts do not grow the tracking list.
 
-        page = await context.new_page()
-        page.set_default_timeout(self.timeout)
+        Args:
+            routing_profile: Request blocking profile overriding the browser default.
+            **context_options: Options passed to Playwright's new_context().
 
-        # Inject anti-detection scripts
-        if anti_detect:
-            await anti_detect.apply_to_page(page)
+        Returns:
+            New Playwright BrowserContext.
+        """
+        await self.wait_until_running()
+        if self._persistent_context:
+            raise RuntimeError("Browser runs a persistent context (user_data_dir); use new_page()")
 
-        logger.debug("New page created with viewport %s", context_options["viewport"])
-        return page
+        context = await self._browser.new_context(**context_options)
+        self._contexts.append(context)
+        context.on("close", lambda _: self._forget_context(context))
+        await self._setup_context(context, context_options, routing_profile)
+        return context
+
+    async def _setup_context(
+        self,
+        context: BrowserContext,
+        context_options: Dict[str, Any],
+        routing_profile: Optional[RoutingProfile] = None,
+    ) -> None:
+        """Attach proxy tracking, the response cache and request blocking."""
+        proxy = context_options.get("proxy")
+        if self.proxy_rotation and proxy:
+            self._track_proxy_timings(context, proxy["server"])
+
+        # Routes run last-registered first, so blocking is checked before the cache
+        if self.response_cache:
+            await self.response_cache.install(context)
+        routing_profile = routing_profile or self.routing_profile
+        if routing_profile:
+            await routing_profile.install(context)
+
+    def _track_proxy_timings(self, context: BrowserContext, proxy: str) -> None:
+        """Feed document load timings and proxy errors back to the rotation."""
+        rotation = self.proxy_rotation
+
+        def on_finished(request) -> None:
+            if request.resource_type != "document":
+                return
+            latency = request.timing.get("responseEnd", -1)
+            if latency >= 0:
+                rotation.report_success(proxy, latency_ms=latency)
+
+        def on_failed(request) -> None:
+            if request.resource_type != "document":
+                return
+            failure = request.failure or ""
+            if any(marker in failure for marker in PROXY_ERROR_MARKERS):
+                rotation.report_failure(proxy)
+
+        context.on("requestfinished", on_finished)
+        context.on("requestfailed", on_failed)
+
+    def _forget_context(self, context: BrowserContext) -> None:
+        """Stop tracking a closed context."""
+        try:
+            self._contexts.remove(context)
+        except ValueError:
+            pass
 
     async def screenshot(
         self,
@@ -171,23 +474,65 @@ class Browser:
         logger.info("Screenshot saved: %s", path)
         return path
 
-    async def close(self) -> None:
-        """Close all contexts and the browser."""
-        for context in self._contexts:
+    async def restart(self) -> None:
+        """
+        Replace the browser process with a fresh one on the same driver.
+
+        All tracked contexts are closed, so callers should drain
+        in-flight work first.
+        """
+        await self.wait_until_running()
+        self._closing = True
+        try:
+            await self._close_browser()
+        finally:
+            self._closing = False
+        await self._launch_browser()
+        logger.info("Browser restarted")
+
+    async def _close_browser(self) -> None:
+        for context in list(self._contexts):
             await context.close()
         self._contexts.clear()
 
+        if self._persistent_context:
+            context, self._persistent_context = self._persistent_context, None
+            self._initial_page = None
+            await context.close()
+
         if self._browser:
             await self._browser.close()
             self._browser = None
 
+    async def close(self) -> None:
+        """Close all contexts and the browser."""
+        self._closing = True
+        if self._relaunch_task and not self._relaunch_task.done():
+            self._relaunch_task.cancel()
+            try:
+                await self._relaunch_task
+            except asyncio.CancelledError:
+                pass
+        self._relaunch_task = None
+        await self._close_browser()
+
         if self._playwright:
-            await self._playwright.stop()
             self._playwright = None
+            await self.driver.release()
+
+        if self.response_cache:
+            self.response_cache.flush()
 
         logger.info("Browser closed")
 
+    @property
+    def contexts(self) -> List[BrowserContext]:
+        """Open contexts created through this browser."""
+        return list(self._contexts)
+
     @property
     def is_running(self) -> bool:
         """Check if browser is currently running."""
+        if self._persistent_context is not None:
+            return True
         return self._browser is not None and self._browser.is_connected()
\ No newline at end of file
@@ -0,0 +1,429 @@
+"""
+Context Pool Module.
+
+Keeps warm Playwright browser contexts keyed by their option set
+so jobs can reuse them instead of paying context start-up cost.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from playwright.async_api import BrowserContext
+
+from automation.browser import Browser
+
+logger = logging.getLogger(__name__)
+
+ContextKey = Tuple[Any, ...]
+
+CLEAR_ORIGIN_SCRIPT = """
+async () => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+    if (indexedDB.databases) {
+        for (const db of await indexedDB.databases()) {
+            indexedDB.deleteDatabase(db.name);
+        }
+    }
+}
+"""
+
+
+@dataclass
+class PooledContext:
+    """Bookkeeping for a single pooled browser context."""
+    context: BrowserContext
+    key: ContextKey
+    created_at: float = field(default_factory=time.monotonic)
+    released_at: float = field(default_factory=time.monotonic)
+    uses: int = 0
+
+
+class ContextPool:
+    """
+    Pool of reusable browser contexts.
+
+    Contexts are grouped by viewport, locale, timezone, user agent
+    and proxy. Released contexts are reset and handed out again until
+    they reach max_uses or max_age, after which they are closed and
+    replaced on demand. The total number of contexts never exceeds
+    max_size; idle contexts of other option sets are evicted first.
+    If the browser crashes, idle contexts are dropped and contexts in
+    use are closed when released.
+
+    Resetting closes pages and clears cookies and permissions. With
+    clear_storage, localStorage and IndexedDB are also cleared for
+    every origin that stored something in localStorage; IndexedDB of
+    origins that never touched localStorage is not discoverable and
+    survives. Jobs that need full storage isolation should use
+    discard() or max_uses=1.
+
+    Args:
+        browser: Launched Browser used to create contexts.
+        max_size: Maximum number of open contexts across all keys.
+        max_uses: Number of jobs a context serves before it is recycled.
+        max_age: Seconds a context may live before it is recycled.
+        clear_storage: Clear origin storage when a context is reset.
+
+    Example:
+        >>> pool = ContextPool(browser, max_size=8)
+        >>> await pool.warm(4, locale="en-US")
+        >>> async with pool.context(locale="en-US") as context:
+        ...     page = await context.new_page()
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        max_size: int = 10,
+        max_uses: int = 50,
+        max_age: float = 600.0,
+        clear_storage: bool = True,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.browser = browser
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.clear_storage = clear_storage
+        self._idle: Dict[ContextKey, Deque[PooledContext]] = {}
+        self._in_use: Dict[int, PooledContext] = {}
+        self._size: int = 0
+        self._closed: bool = False
+        self._paused: bool = False
+        self._retired: Set[int] = set()
+        self._condition = asyncio.Condition()
+        self._stats: Dict[str, int] = {"created": 0, "reused": 0, "recycled": 0, "crashed": 0}
+        browser.add_crash_listener(self._on_browser_crash)
+
+    @staticmethod
+    def make_key(
+        viewport: Optional[Dict[str, int]] = None,
+        locale: str = "en-US",
+        timezone: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        proxy: Optional[str] = None,
+    ) -> ContextKey:
+        """Build the pool key for a context option set."""
+        viewport = viewport or {"width": 1920, "height": 1080}
+        return (viewport["width"], viewport["height"], locale, timezone, user_agent, proxy)
+
+    async def warm(self, count: int, **options: Any) -> int:
+        """
+        Pre-create idle contexts for an option set.
+
+        Args:
+            count: Number of contexts to create.
+            **options: Same keyword arguments as acquire().
+
+        Returns:
+            Number of contexts actually created (bounded by max_size).
+        """
+        key = self.make_key(**options)
+        created = 0
+        for _ in range(count):
+            async with self._condition:
+                if self._closed or self._size >= self.max_size:
+                    break
+                self._size += 1
+
+            entry = await self._create(key, options)
+            async with self._condition:
+                self._idle.setdefault(key, deque()).append(entry)
+                self._condition.notify_all()
+            created += 1
+
+        logger.info("Warmed %d contexts for key %s", created, key)
+        return created
+
+    async def acquire(
+        self,
+        viewport: Optional[Dict[str, int]] = None,
+        locale: str = "en-US",
+        timezone: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        proxy: Optional[str] = None,
+    ) -> BrowserContext:
+        """
+        Take a context for the given option set, waiting if the pool is full.
+
+        Args:
+            viewport: Custom viewport size {'width': int, 'height': int}.
+            locale: Browser locale setting.
+            timezone: Timezone override.
+            user_agent: User agent override.
+            proxy: Proxy URL; None takes one from the browser's rotation.
+
+        Returns:
+            Playwright BrowserContext that must be passed back to release().
+        """
+        options = {
+            "viewport": viewport,
+            "locale": locale,
+            "timezone": timezone,
+            "user_agent": user_agent,
+            "proxy": proxy,
+        }
+        key = self.make_key(**options)
+        stale: List[PooledContext] = []
+
+        async with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Context pool is closed")
+                if self._paused:
+                    await self._condition.wait()
+                    continue
+
+                entry = self._take_idle(key, stale)
+                if entry:
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                victim = self._evict_idle()
+                if victim:
+                    stale.append(victim)
+                    break
+                await self._condition.wait()
+
+        for old in stale:
+            await self._close_entry(old)
+
+        if entry:
+            self._stats["reused"] += 1
+        else:
+            entry = await self._create(key, options)
+
+        self._in_use[id(entry.context)] = entry
+        return entry.context
+
+    async def release(self, context: BrowserContext) -> None:
+        """
+        Return a context to the pool.
+
+        The context is reset (pages closed, cookies, permissions and
+        optionally origin storage cleared) or closed if it reached its use or age limit.
+        """
+        entry = self._in_use.pop(id(context), None)
+        if entry is None:
+            raise ValueError("Context was not acquired from this pool")
+
+        entry.uses += 1
+        recycle = self._closed or self._is_expired(entry) or id(context) in self._retired
+        self._retired.discard(id(context))
+        if not recycle:
+            try:
+                await self._reset(entry.context)
+            except Exception as e:
+                logger.warning("Context reset failed, recycling: %s", str(e))
+                recycle = True
+
+        if recycle:
+            await self._close_entry(entry)
+            async with self._condition:
+                self._size -= 1
+                self._condition.notify_all()
+            return
+
+        entry.released_at = time.monotonic()
+        async with self._condition:
+            self._idle.setdefault(entry.key, deque()).append(entry)
+            self._condition.notify_all()
+
+    async def discard(self, context: BrowserContext) -> None:
+        """Close an acquired context instead of returning it to the pool."""
+        entry = self._in_use.pop(id(context), None)
+        if entry is None:
+            raise ValueError("Context was not acquired from this pool")
+        self._retired.discard(id(context))
+
+        await self._close_entry(entry)
+        async with self._condition:
+            self._size -= 1
+            self._condition.notify_all()
+
+    async def retire(self, context: BrowserContext) -> bool:
+        """
+        Close a pooled context now if idle, or when it is next released.
+
+        Returns:
+            False if the context does not belong to this pool.
+        """
+        if id(context) in self._in_use:
+            self._retired.add(id(context))
+            return True
+
+        async with self._condition:
+            for idle in self._idle.values():
+                entry = next((e for e in idle if e.context is context), None)
+                if entry:
+                    idle.remove(entry)
+                    self._size -= 1
+                    self._condition.notify_all()
+                    break
+            else:
+                return False
+
+        await self._close_entry(entry)
+        return True
+
+    @asynccontextmanager
+    async def drained(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Pause the pool while no context is in use.
+
+        New acquisitions wait, in-use contexts are waited for and idle
+        contexts are closed; acquisitions resume when the block exits.
+        Useful for restarting the browser under the pool.
+
+        Raises:
+            asyncio.TimeoutError: If contexts are still in use after timeout.
+        """
+        async with self._condition:
+            self._paused = True
+        try:
+            async with self._condition:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: not self._in_use), timeout,
+                )
+                entries = [entry for idle in self._idle.values() for entry in idle]
+                self._idle.clear()
+                self._size -= len(entries)
+
+            for entry in entries:
+                await self._close_entry(entry)
+            yield
+        finally:
+            async with self._condition:
+                self._paused = False
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def context(self, **options: Any) -> AsyncIterator[BrowserContext]:
+        """Acquire a context for the duration of an async with block."""
+        context = await self.acquire(**options)
+        try:
+            yield context
+        finally:
+            await self.release(context)
+
+    async def close(self) -> None:
+        """Close idle contexts; contexts still in use close on release."""
+        async with self._condition:
+            self._closed = True
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+            self._size -= len(entries)
+            self._condition.notify_all()
+
+        for entry in entries:
+            await self._close_entry(entry)
+        logger.info("Context pool closed (%d contexts)", len(entries))
+
+    @property
+    def contexts(self) -> List[BrowserContext]:
+        """All contexts owned by the pool, idle and in use."""
+        idle = [entry.context for entries in self._idle.values() for entry in entries]
+        return idle + [entry.context for entry in self._in_use.values()]
+
+    async def _on_browser_crash(self, browser: Browser, lost: List[BrowserContext]) -> None:
+        """Forget idle contexts that died with the browser."""
+        async with self._condition:
+            dropped = sum(len(idle) for idle in self._idle.values())
+            self._idle.clear()
+            self._size -= dropped
+            self._stats["crashed"] += dropped
+            self._condition.notify_all()
+        logger.warning("Dropped %d idle contexts after browser crash", dropped)
+
+    async def _create(self, key: ContextKey, options: Dict[str, Any]) -> PooledContext:
+        """Create a context, giving back its reserved slot on failure."""
+        try:
+            context_options = self.browser.build_context_options(**options)
+            context = await self.browser.new_context(**context_options)
+        except Exception:
+            async with self._condition:
+                self._size -= 1
+                self._condition.notify_all()
+            raise
+
+        self._stats["created"] += 1
+        return PooledContext(context=context, key=key)
+
+    def _take_idle(self, key: ContextKey, stale: List[PooledContext]) -> Optional[PooledContext]:
+        """Pop the most recently used idle context, collecting expired ones."""
+        idle = self._idle.get(key)
+        while idle:
+            entry = idle.pop()
+            if not self._is_expired(entry):
+                return entry
+            stale.append(entry)
+            self._size -= 1
+        return None
+
+    def _evict_idle(self) -> Optional[PooledContext]:
+        """Remove the least recently used idle context of any key."""
+        # Each deque is in release order, so its head is that key's oldest
+        oldest = min(
+            (idle for idle in self._idle.values() if idle),
+            key=lambda idle: idle[0].released_at,
+            default=None,
+        )
+        return oldest.popleft() if oldest else None
+
+    def _is_expired(self, entry: PooledContext) -> bool:
+        return (
+            entry.uses >= self.max_uses
+            or time.monotonic() - entry.created_at >= self.max_age
+        )
+
+    async def _reset(self, context: BrowserContext) -> None:
+        """Clear per-job state from a context."""
+        for page in list(context.pages):
+            await page.close()
+        await context.clear_cookies()
+        await context.clear_permissions()
+        if self.clear_storage:
+            state = await context.storage_state()
+            origins = [origin["origin"] for origin in state.get("origins", [])]
+            if origins:
+                await self._clear_origins(context, origins)
+
+    async def _clear_origins(self, context: BrowserContext, origins: List[str]) -> None:
+        """Clear storage of each origin from a blank page served at that origin."""
+        page = await context.new_page()
+        try:
+            await page.route(
+                "**/*",
+                lambda route: route.fulfill(status=200, content_type="text/html", body="<html></html>"),
+            )
+            for origin in origins:
+                await page.goto(origin)
+                await page.evaluate(CLEAR_ORIGIN_SCRIPT)
+        finally:
+            await page.close()
+
+    async def _close_entry(self, entry: PooledContext) -> None:
+        self._stats["recycled"] += 1
+        try:
+            await entry.context.close()
+        except Exception as e:
+            logger.debug("Error closing pooled context: %s", str(e))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get pool statistics."""
+        idle = sum(len(entries) for entries in self._idle.values())
+        return {
+            **self._stats,
+            "size": self._size,
+            "idle": idle,
+            "in_use": len(self._in_use),
+        }
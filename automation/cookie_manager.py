@@ -1,64 +1,172 @@
 """Cookie and session management for browser automation."""
 
+import asyncio
 import json
 import logging
-import os
-from typing import List, Dict, Optional, Any
-from pathlib import Path
+from collections import OrderedDict
+from typing import Iterable, List, Dict, Optional, Any
 from datetime import datetime
+from pathlib import Path
+
+from automation.cookie_store import CookieStore, JsonCookieStore
 
 logger = logging.getLogger(__name__)
 
+# Key under which save_state() keeps sessionStorage, which storage_state() omits
+SESSION_STORAGE_KEY = "session_storage"
+
+# sessionStorage key marking a tab whose origin was already restored
+SESSION_RESTORED_MARKER = "__session_restored__"
+
+READ_SESSION_STORAGE_SCRIPT = """
+(marker) => ({
+    origin: location.origin,
+    items: Object.fromEntries(Object.entries(sessionStorage).filter(([key]) => key !== marker)),
+})
+"""
+
+# Runs on every navigation; restores once per tab and origin so later removals stick
+RESTORE_SESSION_STORAGE_SCRIPT = """
+(byOrigin, marker) => {
+    const items = byOrigin[location.origin];
+    if (!items || sessionStorage.getItem(marker) !== null) return;
+    sessionStorage.setItem(marker, "1");
+    for (const [key, value] of Object.entries(items)) {
+        if (sessionStorage.getItem(key) === null) sessionStorage.setItem(key, value);
+    }
+}
+"""
+
+
+def session_storage_init_script(state: Dict[str, Any]) -> Optional[str]:
+    """Build an init script restoring a snapshot's sessionStorage, if it has any."""
+    entries = state.get(SESSION_STORAGE_KEY)
+    if not entries:
+        return None
+    by_origin = {entry["origin"]: entry["items"] for entry in entries}
+    return (
+        f"({RESTORE_SESSION_STORAGE_SCRIPT.strip()})"
+        f"({json.dumps(by_origin)}, {json.dumps(SESSION_RESTORED_MARKER)})"
+    )
 
-class CookieManager:
-    """Manage browser cookies for persistent sessions across automation runs."""
 
-    def __init__(self, storage_dir: str = "./cookies"):
-        self.storage_dir = Path(storage_dir)
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
-        self._cookies: Dict[str, List[Dict]] = {}
-
-    def _get_cookie_path(self, profile: str) -> Path:
-        safe_name = "".join(c if c.isalnum() else "_" for c in profile)
-        return self.storage_dir / f"{safe_name}.json"
+class CookieManager:
+    """Manage browser cookies for persistent sessions across automation runs.
+
+    Cookies are kept in a CookieStore: one JSON file per profile by
+    default, or a SqliteCookieStore for large numbers of profiles.
+    Profiles are cached in memory on save and load, so repeated loads of a
+    profile skip the store. At most max_cached profiles are kept, least
+    recently used first out. Changes made by other processes are not picked
+    up until the profile is evicted or dropped with forget().
+    """
+
+    def __init__(
+        self,
+        storage_dir: str = "./cookies",
+        store: Optional[CookieStore] = None,
+        max_cached: int = 1000,
+    ):
+        self.store = store or JsonCookieStore(storage_dir)
+        self.max_cached = max_cached
+        self._cookies: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._states: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
     async def save_cookies(self, context, profile: str) -> int:
-        """Save cookies from a browser context to a file."""
+        """Save cookies from a browser context to the store."""
         cookies = await context.cookies()
-        cookie_path = self._get_cookie_path(profile)
-        data = {
-            "profile": profile,
-            "saved_at": datetime.utcnow().isoformat(),
-            "cookie_count": len(cookies),
-            "cookies": cookies,
-        }
-        with open(cookie_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, default=str)
-
-        self._cookies[profile] = cookies
+        await asyncio.to_thread(self.store.save, profile, cookies)
+
+        self._remember(self._cookies, profile, cookies)
         logger.info(f"Saved {len(cookies)} cookies for profile '{profile}'")
         return len(cookies)
 
     async def load_cookies(self, context, profile: str) -> int:
-        """Load cookies from a file into a browser context."""
-        cookie_path = self._get_cookie_path(profile)
-        if not cookie_path.exists():
-            logger.warning(f"No saved cookies for profile '{profile}'")
-            return 0
+        """Load cookies from the cache or the store into a browser context."""
+        cookies = self._cookies.get(profile)
+        if cookies is None:
+            cookies = await asyncio.to_thread(self.store.load, profile)
+            if cookies is None:
+                logger.warning(f"No saved cookies for profile '{profile}'")
+                return 0
 
-        with open(cookie_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        cookies = data.get("cookies", [])
         valid_cookies = self._filter_expired(cookies)
+        self._remember(self._cookies, profile, valid_cookies)
 
         if valid_cookies:
             await context.add_cookies(valid_cookies)
-            self._cookies[profile] = valid_cookies
             logger.info(f"Loaded {len(valid_cookies)} cookies for profile '{profile}'")
 
         return len(valid_cookies)
 
+    async def save_many(self, contexts: Dict[str, Any]) -> int:
+        """Save cookies from several contexts, keyed by profile, in one store write."""
+        profiles = {profile: await context.cookies() for profile, context in contexts.items()}
+        await asyncio.to_thread(self.store.save_many, profiles)
+        for profile, cookies in profiles.items():
+            self._remember(self._cookies, profile, cookies)
+        logger.info(f"Saved cookies for {len(profiles)} profiles")
+        return sum(len(cookies) for cookies in profiles.values())
+
+    async def preload(self, profiles: Iterable[str]) -> int:
+        """Read several profiles into the cache in one store read."""
+        missing = [p for p in profiles if p not in self._cookies]
+        loaded = await asyncio.to_thread(self.store.load_many, missing)
+        for profile, cookies in loaded.items():
+            self._remember(self._cookies, profile, cookies)
+        return len(loaded)
+
+    async def save_state(self, context, profile: str, session_storage: bool = False) -> Dict[str, Any]:
+        """Snapshot a context's cookies and localStorage, optionally with sessionStorage.
+
+        sessionStorage is read from the context's open pages, one entry per origin.
+        """
+        state = await context.storage_state()
+        if session_storage:
+            entries = {}
+            for page in context.pages:
+                try:
+                    entry = await page.evaluate(READ_SESSION_STORAGE_SCRIPT, SESSION_RESTORED_MARKER)
+                except Exception as e:
+                    logger.debug(f"Could not read sessionStorage from {page.url}: {e}")
+                    continue
+                if entry["origin"] != "null" and entry["items"]:
+                    entries[entry["origin"]] = entry
+            state[SESSION_STORAGE_KEY] = list(entries.values())
+
+        await asyncio.to_thread(self.store.save_state, profile, state)
+        self._remember(self._states, profile, state)
+        logger.info(
+            f"Saved storage state for profile '{profile}' "
+            f"({len(state.get('cookies', []))} cookies, {len(state.get('origins', []))} origins)"
+        )
+        return state
+
+    async def load_state(self, profile: str) -> Optional[Dict[str, Any]]:
+        """Return a saved snapshot for Browser.new_page(storage_state=...), with expired cookies removed."""
+        state = self._states.get(profile)
+        if state is None:
+            state = await asyncio.to_thread(self.store.load_state, profile)
+            if state is None:
+                logger.warning(f"No saved storage state for profile '{profile}'")
+                return None
+        self._remember(self._states, profile, state)
+        return {**state, "cookies": self._filter_expired(state.get("cookies", []))}
+
+    @property
+    def storage_dir(self) -> Optional[Path]:
+        """Directory of the JSON cookie store, or None for other stores."""
+        if isinstance(self.store, JsonCookieStore):
+            return self.store.storage_dir
+        return None
+
+    def _remember(self, cache: "OrderedDict[str, Any]", profile: str, value: Any) -> None:
+        """Cache a profile as most recently used, evicting the oldest beyond max_cached."""
+        cache[profile] = value
+        cache.move_to_end(profile)
+        while len(cache) > self.max_cached:
+            cache.popitem(last=False)
+
     def _filter_expired(self, cookies: List[Dict]) -> List[Dict]:
         """Remove expired cookies from the list."""
         now = datetime.utcnow().timestamp()
@@ -69,32 +177,37 @@ class CookieManager:
                 valid.append(cookie)
         return valid
 
-    def delete_profile(self, profile: str) -> bool:
-        """Delete saved cookies for a profile."""
-        cookie_path = self._get_cookie_path(profile)
-        if cookie_path.exists():
-            cookie_path.unlink()
+    def forget(self, profile: Optional[str] = None) -> None:
+        """Drop a profile (or all profiles) from the in-memory cache."""
+        if profile is None:
+            self._cookies.clear()
+            self._states.clear()
+        else:
             self._cookies.pop(profile, None)
+            self._states.pop(profile, None)
+
+    def delete_profile(self, profile: str) -> bool:
+        """Delete saved cookies and storage state for a profile."""
+        self.forget(profile)
+        if self.store.delete(profile):
             logger.info(f"Deleted cookies for profile '{profile}'")
             return True
         return False
 
-    def list_profiles(self) -> List[Dict[str, Any]]:
-        """List all saved cookie profiles."""
-        profiles = []
-        for path in self.storage_dir.glob("*.json"):
-            try:
-                with open(path, "r") as f:
-                    data = json.load(f)
-                profiles.append({
-                    "profile": data.get("profile", path.stem),
-                    "cookie_count": data.get("cookie_count", 0),
-                    "saved_at": data.get("saved_at"),
-                    "file_size": path.stat().st_size,
-                })
-            except (json.JSONDecodeError, KeyError):
-                continue
-        return profiles
+    def list_profiles(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List saved cookie profiles, optionally only those with cookies for a domain."""
+        return self.store.list_profiles(domain)
+
+    async def purge_expired(self) -> int:
+        """Remove expired cookies from the store and the cache."""
+        removed = await asyncio.to_thread(self.store.purge_expired)
+        for profile, cookies in self._cookies.items():
+            self._cookies[profile] = self._filter_expired(cookies)
+        return removed
+
+    def close(self) -> None:
+        """Close the underlying store."""
+        self.store.close()
 
     async def clear_cookies(self, context) -> None:
         """Clear all cookies from a browser context."""
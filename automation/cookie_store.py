@@ -0,0 +1,342 @@
+"""Storage backends for saved cookie profiles."""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CookieStore(ABC):
+    """Base class for cookie profile storage.
+
+    Methods are blocking; CookieManager calls them from a worker thread.
+    """
+
+    def save(self, profile: str, cookies: List[Dict]) -> None:
+        self.save_many({profile: cookies})
+
+    def load(self, profile: str) -> Optional[List[Dict]]:
+        """Return a profile's cookies, or None if it was never saved."""
+        return self.load_many([profile]).get(profile)
+
+    @abstractmethod
+    def save_many(self, profiles: Dict[str, List[Dict]]) -> None:
+        """Store cookies for several profiles, replacing what they had."""
+
+    @abstractmethod
+    def load_many(self, profiles: Iterable[str]) -> Dict[str, List[Dict]]:
+        """Return cookies for each saved profile among the given names."""
+
+    @abstractmethod
+    def save_state(self, profile: str, state: Dict[str, Any]) -> None:
+        """Store a full storage_state snapshot for a profile."""
+
+    @abstractmethod
+    def load_state(self, profile: str) -> Optional[Dict[str, Any]]:
+        """Return a profile's storage_state snapshot, or None if it was never saved."""
+
+    @abstractmethod
+    def delete(self, profile: str) -> bool:
+        """Delete a profile's cookies and storage state."""
+
+    @abstractmethod
+    def list_profiles(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List profile metadata, optionally only profiles holding cookies for a domain."""
+
+    @abstractmethod
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Remove expired cookies and return how many were removed."""
+
+    def close(self) -> None:
+        pass
+
+
+def _is_expired(cookie: Dict, now: float) -> bool:
+    expires = cookie.get("expires", -1)
+    return expires != -1 and expires <= now
+
+
+class JsonCookieStore(CookieStore):
+    """One JSON file per profile in a directory."""
+
+    def __init__(self, storage_dir: str = "./cookies"):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.state_dir = self.storage_dir / "states"
+
+    @staticmethod
+    def _safe_name(profile: str) -> str:
+        return "".join(c if c.isalnum() else "_" for c in profile)
+
+    def _get_cookie_path(self, profile: str) -> Path:
+        return self.storage_dir / f"{self._safe_name(profile)}.json"
+
+    def _get_state_path(self, profile: str) -> Path:
+        return self.state_dir / f"{self._safe_name(profile)}.json"
+
+    def _write_file(self, path: Path, data: Dict[str, Any]) -> None:
+        """Write JSON atomically so readers never see a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.storage_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"), default=str)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    def _read_file(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save_many(self, profiles: Dict[str, List[Dict]]) -> None:
+        saved_at = datetime.utcnow().isoformat()
+        for profile, cookies in profiles.items():
+            data = {
+                "profile": profile,
+                "saved_at": saved_at,
+                "cookie_count": len(cookies),
+                "cookies": cookies,
+            }
+            self._write_file(self._get_cookie_path(profile), data)
+
+    def load_many(self, profiles: Iterable[str]) -> Dict[str, List[Dict]]:
+        loaded = {}
+        for profile in profiles:
+            data = self._read_file(self._get_cookie_path(profile))
+            if data is not None:
+                loaded[profile] = data.get("cookies", [])
+        return loaded
+
+    def save_state(self, profile: str, state: Dict[str, Any]) -> None:
+        self.state_dir.mkdir(exist_ok=True)
+        self._write_file(self._get_state_path(profile), state)
+
+    def load_state(self, profile: str) -> Optional[Dict[str, Any]]:
+        return self._read_file(self._get_state_path(profile))
+
+    def delete(self, profile: str) -> bool:
+        deleted = False
+        for path in (self._get_cookie_path(profile), self._get_state_path(profile)):
+            try:
+                path.unlink()
+                deleted = True
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def list_profiles(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        profiles = []
+        for path in self.storage_dir.glob("*.json"):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                if domain and not any(c.get("domain") == domain for c in data.get("cookies", [])):
+                    continue
+                profiles.append({
+                    "profile": data.get("profile", path.stem),
+                    "cookie_count": data.get("cookie_count", 0),
+                    "saved_at": data.get("saved_at"),
+                    "file_size": path.stat().st_size,
+                })
+            except (json.JSONDecodeError, KeyError):
+                continue
+        return profiles
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        removed = 0
+        for path in self.storage_dir.glob("*.json"):
+            try:
+                data = self._read_file(path)
+            except json.JSONDecodeError:
+                continue
+            if data is None:
+                continue
+            cookies = data.get("cookies", [])
+            valid = [c for c in cookies if not _is_expired(c, now)]
+            if len(valid) != len(cookies):
+                removed += len(cookies) - len(valid)
+                data["cookies"] = valid
+                data["cookie_count"] = len(valid)
+                self._write_file(path, data)
+        return removed
+
+
+class SqliteCookieStore(CookieStore):
+    """All profiles in one SQLite database.
+
+    Each cookie is a row indexed by profile, domain and expiry, so
+    profile metadata, domain lookups and expiry purging are plain
+    queries that never parse cookie bodies.
+    """
+
+    def __init__(self, path: str = "./cookies.db", timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                profile TEXT PRIMARY KEY,
+                saved_at TEXT NOT NULL,
+                cookie_count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cookies (
+                profile TEXT NOT NULL,
+                name TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                path TEXT NOT NULL,
+                expires REAL NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (profile, domain, path, name)
+            );
+            CREATE INDEX IF NOT EXISTS idx_cookies_domain ON cookies (domain);
+            CREATE INDEX IF NOT EXISTS idx_cookies_expires ON cookies (expires);
+            CREATE TABLE IF NOT EXISTS states (
+                profile TEXT PRIMARY KEY,
+                saved_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def save_many(self, profiles: Dict[str, List[Dict]]) -> None:
+        saved_at = datetime.utcnow().isoformat()
+        cookie_rows = [
+            (
+                profile,
+                cookie.get("name", ""),
+                cookie.get("domain", ""),
+                cookie.get("path", "/"),
+                cookie.get("expires", -1),
+                json.dumps(cookie, separators=(",", ":"), default=str),
+            )
+            for profile, cookies in profiles.items()
+            for cookie in cookies
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "DELETE FROM cookies WHERE profile = ?",
+                    [(profile,) for profile in profiles],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cookies (profile, name, domain, path, expires, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    cookie_rows,
+                )
+                # Count stored rows: duplicate (domain, path, name) cookies were merged
+                self._conn.executemany(
+                    "INSERT INTO profiles (profile, saved_at, cookie_count) "
+                    "VALUES (?, ?, (SELECT COUNT(*) FROM cookies WHERE profile = ?)) "
+                    "ON CONFLICT(profile) DO UPDATE SET "
+                    "saved_at = excluded.saved_at, cookie_count = excluded.cookie_count",
+                    [(profile, saved_at, profile) for profile in profiles],
+                )
+
+    def load_many(self, profiles: Iterable[str]) -> Dict[str, List[Dict]]:
+        names = list(profiles)
+        if not names:
+            return {}
+        loaded: Dict[str, List[Dict]] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                placeholders = ", ".join("?" for _ in chunk)
+                for (profile,) in self._conn.execute(
+                    f"SELECT profile FROM profiles WHERE profile IN ({placeholders})", chunk
+                ):
+                    loaded[profile] = []
+                for profile, data in self._conn.execute(
+                    f"SELECT profile, data FROM cookies WHERE profile IN ({placeholders})", chunk
+                ):
+                    loaded[profile].append(json.loads(data))
+        return loaded
+
+    def save_state(self, profile: str, state: Dict[str, Any]) -> None:
+        data = json.dumps(state, separators=(",", ":"), default=str)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO states (profile, saved_at, data) VALUES (?, ?, ?)",
+                    (profile, datetime.utcnow().isoformat(), data),
+                )
+
+    def load_state(self, profile: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM states WHERE profile = ?", (profile,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, profile: str) -> bool:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM cookies WHERE profile = ?", (profile,))
+                deleted = self._conn.execute(
+                    "DELETE FROM profiles WHERE profile = ?", (profile,)
+                ).rowcount
+                deleted += self._conn.execute(
+                    "DELETE FROM states WHERE profile = ?", (profile,)
+                ).rowcount
+        return deleted > 0
+
+    def list_profiles(self, domain: Optional[str] = None) -> List[Dict[str, Any]]:
+        # file_size is the stored size of the profile's cookie data
+        query = (
+            "SELECT profile, cookie_count, saved_at, "
+            "(SELECT COALESCE(SUM(LENGTH(data)), 0) FROM cookies WHERE cookies.profile = profiles.profile) "
+            "FROM profiles"
+        )
+        params: tuple = ()
+        if domain:
+            query += " WHERE profile IN (SELECT profile FROM cookies WHERE domain = ?)"
+            params = (domain,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {"profile": profile, "cookie_count": count, "saved_at": saved_at, "file_size": size}
+            for profile, count, saved_at, size in rows
+        ]
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        now = now if now is not None else time.time()
+        expired = "expires != -1 AND expires <= ?"
+        with self._lock:
+            with self._conn:
+                affected = [
+                    row[0] for row in self._conn.execute(
+                        f"SELECT DISTINCT profile FROM cookies WHERE {expired}", (now,)
+                    )
+                ]
+                cursor = self._conn.execute(f"DELETE FROM cookies WHERE {expired}", (now,))
+                self._conn.executemany(
+                    "UPDATE profiles SET cookie_count = "
+                    "(SELECT COUNT(*) FROM cookies WHERE cookies.profile = profiles.profile) "
+                    "WHERE profile = ?",
+                    [(profile,) for profile in affected],
+                )
+        logger.info(f"Purged {cursor.rowcount} expired cookies from {len(affected)} profiles")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
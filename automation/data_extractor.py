@@ -2,11 +2,35 @@
 
 import re
 import logging
-from typing import List, Dict, Any, Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# lxml refuses str input that carries an XML encoding declaration
+_XML_DECLARATION = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+# Evaluates every rule in one page.evaluate() call; results are aligned with the rules
+BATCH_EXTRACT_SCRIPT = """
+(rules) => {
+    const read = (el, attribute) => attribute ? el.getAttribute(attribute) : el.innerText;
+    return rules.map((rule) => {
+        try {
+            if (rule.multiple) {
+                const elements = document.querySelectorAll(rule.selector);
+                return {values: Array.from(elements, (el) => read(el, rule.attribute))};
+            }
+            const element = document.querySelector(rule.selector);
+            return element ? {value: read(element, rule.attribute)} : {missing: true};
+        } catch (e) {
+            return {error: String(e)};
+        }
+    });
+}
+"""
+
 
 @dataclass
 class ExtractionRule:
@@ -45,8 +69,15 @@ class DataExtractor:
     def add_list_rule(self, name: str, selector: str, **kwargs) -> "DataExtractor":
         return self.add_rule(ExtractionRule(name=name, selector=selector, multiple=True, **kwargs))
 
-    async def extract(self, page) -> ExtractionResult:
-        """Extract data from a page based on configured rules."""
+    async def extract(self, page, batched: bool = False) -> ExtractionResult:
+        """Extract data from a page based on configured rules.
+
+        With ``batched=True`` all rules are evaluated inside the page in a
+        single roundtrip and transforms are applied afterwards in Python.
+        """
+        if batched:
+            return await self._extract_batched(page)
+
         import time
         start = time.perf_counter()
         data = {}
@@ -80,12 +111,106 @@ class DataExtractor:
         logger.info(f"Extracted {len(data)} fields from {url} in {elapsed:.1f}ms")
         return ExtractionResult(url=url, data=data, errors=errors, extraction_time_ms=elapsed)
 
+    async def _extract_batched(self, page) -> ExtractionResult:
+        import time
+        start = time.perf_counter()
+        specs = [
+            {"selector": r.selector, "attribute": r.attribute, "multiple": r.multiple}
+            for r in self._rules
+        ]
+        try:
+            raw_results = await page.evaluate(BATCH_EXTRACT_SCRIPT, specs)
+        except Exception as e:
+            # e.g. the page navigated away; report it per rule like the unbatched path
+            raw_results = [{"error": str(e)} for _ in specs]
+
+        data, errors = self._apply_raw_results(raw_results)
+        elapsed = (time.perf_counter() - start) * 1000
+        url = page.url
+
+        logger.info(f"Extracted {len(data)} fields from {url} in {elapsed:.1f}ms (batched)")
+        return ExtractionResult(url=url, data=data, errors=errors, extraction_time_ms=elapsed)
+
+    def extract_html(self, html: str, url: str = "") -> ExtractionResult:
+        """Extract data from raw HTML without a browser.
+
+        Uses lxml with cssselect. Text rules read the element's text content,
+        which unlike a live page's innerText also includes hidden text.
+        """
+        import time
+        start = time.perf_counter()
+        specs = [
+            {"selector": r.selector, "attribute": r.attribute, "multiple": r.multiple}
+            for r in self._rules
+        ]
+        raw_results = _evaluate_html(html, specs)
+
+        data, errors = self._apply_raw_results(raw_results)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        logger.debug(f"Extracted {len(data)} fields from {url or 'html'} in {elapsed:.1f}ms (offline)")
+        return ExtractionResult(url=url, data=data, errors=errors, extraction_time_ms=elapsed)
+
+    def extract_documents(
+        self,
+        documents: Iterable[Tuple[str, str]],
+        max_workers: Optional[int] = None,
+        chunksize: int = 16,
+    ) -> List[ExtractionResult]:
+        """Run extract_html() over many (url, html) documents in a process pool.
+
+        The extractor is sent to each worker once, so rule transforms must be
+        picklable (module-level functions such as clean_price, not lambdas).
+        Results are returned in input order.
+        """
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_document_worker,
+            initargs=(self,),
+        ) as executor:
+            results = list(executor.map(_extract_document, documents, chunksize=chunksize))
+
+        logger.info(f"Extracted {len(results)} documents offline")
+        return results
+
+    def _apply_raw_results(self, raw_results: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[str]]:
+        """Turn per-rule raw values into extracted data, mirroring extract()."""
+        data = {}
+        errors = []
+
+        for rule, raw in zip(self._rules, raw_results):
+            try:
+                if "error" in raw:
+                    raise ValueError(raw["error"])
+                if rule.multiple:
+                    values = []
+                    for value in raw["values"]:
+                        value = self._finalize_value(value, rule)
+                        if value is not None:
+                            values.append(value)
+                    data[rule.name] = values
+                elif raw.get("missing"):
+                    data[rule.name] = rule.default
+                    if rule.default is None:
+                        errors.append(f"Element not found: {rule.selector}")
+                else:
+                    data[rule.name] = self._finalize_value(raw["value"], rule)
+            except Exception as e:
+                errors.append(f"Error extracting '{rule.name}': {str(e)}")
+                data[rule.name] = rule.default
+
+        return data, errors
+
     async def _get_value(self, element, rule: ExtractionRule) -> Any:
         if rule.attribute:
             value = await element.get_attribute(rule.attribute)
         else:
             value = await element.inner_text()
 
+        return self._finalize_value(value, rule)
+
+    @staticmethod
+    def _finalize_value(value: Optional[str], rule: ExtractionRule) -> Any:
         if value and rule.transform:
             value = rule.transform(value.strip())
         elif value:
@@ -103,4 +228,51 @@ class DataExtractor:
     def clean_number(text: str) -> int:
         """Transform function to extract integer from text."""
         numbers = re.findall(r"\d+", text.replace(",", ""))
-        return int(numbers[0]) if numbers else 0
\ No newline at end of file
+        return int(numbers[0]) if numbers else 0
+
+
+@lru_cache(maxsize=256)
+def _compile_selector(selector: str):
+    from lxml.cssselect import CSSSelector
+    return CSSSelector(selector)
+
+
+def _evaluate_html(html: str, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Offline counterpart of BATCH_EXTRACT_SCRIPT producing the same payload."""
+    from lxml import html as lxml_html
+
+    def read(element, attribute):
+        return element.get(attribute) if attribute else element.text_content()
+
+    html = _XML_DECLARATION.sub("", html, count=1)
+    try:
+        tree = lxml_html.document_fromstring(html) if html.strip() else None
+    except Exception as e:
+        return [{"error": f"Could not parse HTML: {e}"} for _ in specs]
+
+    results = []
+    for spec in specs:
+        try:
+            elements = _compile_selector(spec["selector"])(tree) if tree is not None else []
+            if spec["multiple"]:
+                results.append({"values": [read(el, spec["attribute"]) for el in elements]})
+            elif elements:
+                results.append({"value": read(elements[0], spec["attribute"])})
+            else:
+                results.append({"missing": True})
+        except Exception as e:
+            results.append({"error": str(e)})
+    return results
+
+
+_document_extractor: Optional[DataExtractor] = None
+
+
+def _init_document_worker(extractor: DataExtractor) -> None:
+    global _document_extractor
+    _document_extractor = extractor
+
+
+def _extract_document(document: Tuple[str, str]) -> ExtractionResult:
+    url, html = document
+    return _document_extractor.extract_html(html, url=url)
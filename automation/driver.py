@@ -0,0 +1,85 @@
+"""
+Playwright Driver Module.
+
+Shares one reference-counted Playwright driver process between all
+Browser instances running on the same event loop.
+"""
+
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Optional
+
+from playwright.async_api import Playwright, async_playwright
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _DriverEntry:
+    """Driver state for one event loop."""
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    playwright: Optional[Playwright] = None
+    refs: int = 0
+
+
+class PlaywrightDriver:
+    """
+    Reference-counted Playwright driver manager.
+
+    The Node driver is started on the first acquire() and stopped when
+    the last holder calls release(). Playwright objects are bound to the
+    event loop that created them, so each running loop gets its own
+    driver.
+
+    Example:
+        >>> playwright = await shared_driver.acquire()
+        >>> browser = await playwright.chromium.launch()
+        >>> await browser.close()
+        >>> await shared_driver.release()
+    """
+
+    def __init__(self):
+        self._entries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _DriverEntry]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _entry(self) -> _DriverEntry:
+        loop = asyncio.get_running_loop()
+        entry = self._entries.get(loop)
+        if entry is None:
+            entry = self._entries[loop] = _DriverEntry()
+        return entry
+
+    async def acquire(self) -> Playwright:
+        """Get the loop's driver, starting it if needed."""
+        entry = self._entry()
+        async with entry.lock:
+            if entry.playwright is None:
+                entry.playwright = await async_playwright().start()
+                logger.info("Playwright driver started")
+            entry.refs += 1
+            return entry.playwright
+
+    async def release(self) -> None:
+        """Drop a reference, stopping the driver when none remain."""
+        entry = self._entry()
+        async with entry.lock:
+            if entry.refs == 0:
+                return
+            entry.refs -= 1
+            if entry.refs == 0 and entry.playwright is not None:
+                playwright, entry.playwright = entry.playwright, None
+                await playwright.stop()
+                logger.info("Playwright driver stopped")
+
+    @property
+    def refs(self) -> int:
+        """References held on the current event loop's driver."""
+        entry = self._entries.get(asyncio.get_running_loop())
+        return entry.refs if entry else 0
+
+
+# Process-wide driver used by Browser unless another is passed in
+shared_driver = PlaywrightDriver()
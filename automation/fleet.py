@@ -0,0 +1,409 @@
+"""
+Browser Fleet Module.
+
+Runs several Browser instances in separate worker processes so
+Playwright driver traffic is spread over all CPU cores of a host.
+"""
+
+import asyncio
+import functools
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import connection
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from automation.browser import Browser
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class WorkerStats:
+    """Throughput counters for a single fleet worker."""
+    worker_id: int
+    pid: Optional[int] = None
+    completed: int = 0
+    failed: int = 0
+    restarts: int = 0
+    busy_time: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def throughput(self) -> float:
+        """Jobs finished per second since the worker was first started."""
+        elapsed = time.monotonic() - self.started_at
+        return (self.completed + self.failed) / elapsed if elapsed > 0 else 0.0
+
+
+@dataclass
+class _WorkerHandle:
+    """Parent-side state of a worker process."""
+    worker_id: int
+    process: Any
+    conn: Any
+    stats: WorkerStats
+    in_flight: Dict[int, asyncio.Future] = field(default_factory=dict)
+    exited: bool = False
+
+
+class BrowserFleet:
+    """
+    Pool of worker processes, each owning its own Browser and event loop.
+
+    Jobs are async callables invoked as ``await job(browser, *args, **kwargs)``
+    inside a worker. Jobs, arguments and results must be picklable, so jobs
+    have to be module-level functions. Submissions wait once max_pending
+    jobs are queued, and crashed workers are restarted automatically.
+
+    Args:
+        workers: Number of worker processes (defaults to CPU count).
+        jobs_per_worker: Concurrent jobs each worker runs on its browser.
+        max_pending: Queued jobs accepted before submit() waits.
+        browser_factory: Picklable callable returning an unlaunched Browser.
+        restart_delay: Seconds to wait before restarting a crashed worker.
+        **browser_kwargs: Browser arguments used when no factory is given.
+
+    Example:
+        >>> async def fetch_title(browser, url):
+        ...     page = await browser.new_page()
+        ...     await page.goto(url)
+        ...     return await page.title()
+        >>> async with BrowserFleet(workers=4) as fleet:
+        ...     title = await fleet.submit(fetch_title, "https://example.com")
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        jobs_per_worker: int = 4,
+        max_pending: int = 100,
+        browser_factory: Optional[Callable[[], Browser]] = None,
+        restart_delay: float = 1.0,
+        **browser_kwargs: Any,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.jobs_per_worker = jobs_per_worker
+        self.max_pending = max_pending
+        self.browser_factory = browser_factory or functools.partial(Browser, **browser_kwargs)
+        self.restart_delay = restart_delay
+        self._mp = multiprocessing.get_context("spawn")
+        self._workers: Dict[int, _WorkerHandle] = {}
+        self._stats: Dict[int, WorkerStats] = {}
+        self._ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._slot_freed: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._reader: Optional[threading.Thread] = None
+        self._running: bool = False
+
+    async def __aenter__(self):
+        """Async context manager entry - start workers."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - stop workers."""
+        await self.close()
+
+    async def start(self) -> None:
+        """Spawn the worker processes and start dispatching jobs."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._slot_freed = asyncio.Event()
+        self._running = True
+
+        for worker_id in range(self.workers):
+            self._stats[worker_id] = WorkerStats(worker_id=worker_id)
+            self._spawn(worker_id)
+
+        self._reader = threading.Thread(target=self._read_results, daemon=True)
+        self._reader.start()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info("Browser fleet started with %d workers", self.workers)
+
+    async def submit(self, job: Job, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a job on the next free worker and return its result.
+
+        Args:
+            job: Module-level async function taking a Browser first.
+            *args: Positional arguments for the job.
+            **kwargs: Keyword arguments for the job.
+
+        Returns:
+            The job's return value. Exceptions raised by the job are re-raised.
+        """
+        if not self._running:
+            raise RuntimeError("Fleet not started. Call start() first.")
+
+        payload = pickle.dumps((job, args, kwargs))
+        future = self._loop.create_future()
+        await self._queue.put((next(self._ids), payload, future))
+        return await future
+
+    async def close(self) -> None:
+        """Finish in-flight jobs, stop the workers and fail queued jobs."""
+        if not self._running:
+            return
+        self._running = False
+
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Fleet closed"))
+
+        handles = list(self._workers.values())
+        for handle in handles:
+            try:
+                handle.conn.send(None)
+            except OSError:
+                pass
+        for handle in handles:
+            await self._loop.run_in_executor(None, handle.process.join, 30)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+        if self._reader:
+            await self._loop.run_in_executor(None, self._reader.join)
+        # Let results forwarded by the reader thread settle their futures
+        await asyncio.sleep(0)
+        for handle in handles:
+            self._fail_in_flight(handle, "Fleet closed")
+            handle.conn.close()
+        self._workers.clear()
+        logger.info("Browser fleet closed")
+
+    def _spawn(self, worker_id: int) -> None:
+        """Start (or restart) the process for a worker slot."""
+        parent_conn, child_conn = self._mp.Pipe()
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(worker_id, self.browser_factory, child_conn),
+            name=f"browser-fleet-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+
+        stats = self._stats[worker_id]
+        stats.pid = process.pid
+        self._workers[worker_id] = _WorkerHandle(
+            worker_id=worker_id, process=process, conn=parent_conn, stats=stats,
+        )
+        if self._slot_freed:
+            self._slot_freed.set()
+
+    async def _dispatch(self) -> None:
+        """Hand queued jobs to workers with free capacity."""
+        while True:
+            job_id, payload, future = await self._queue.get()
+            if future.done():
+                continue
+
+            try:
+                handle = await self._free_worker()
+            except asyncio.CancelledError:
+                future.set_exception(RuntimeError("Fleet closed"))
+                raise
+            handle.in_flight[job_id] = future
+            try:
+                handle.conn.send((job_id, payload))
+            except OSError as e:
+                handle.in_flight.pop(job_id, None)
+                future.set_exception(RuntimeError(f"Failed to send job to worker: {e}"))
+
+    async def _free_worker(self) -> _WorkerHandle:
+        """Wait for the live worker with the most free job slots."""
+        while True:
+            candidates = [
+                h for h in self._workers.values()
+                if not h.exited and len(h.in_flight) < self.jobs_per_worker
+            ]
+            if candidates:
+                return min(candidates, key=lambda h: len(h.in_flight))
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+
+    def _read_results(self) -> None:
+        """Reader thread: forward worker messages and exits to the event loop."""
+        while self._running or any(not h.exited for h in self._workers.values()):
+            handles = [h for h in list(self._workers.values()) if not h.exited]
+            waitables = {}
+            for handle in handles:
+                waitables[handle.conn] = handle
+                waitables[handle.process.sentinel] = handle
+            if not waitables:
+                time.sleep(0.1)
+                continue
+
+            for ready in connection.wait(list(waitables), timeout=0.5):
+                handle = waitables[ready]
+                if handle.exited:
+                    continue
+                if ready is handle.conn:
+                    try:
+                        message = handle.conn.recv()
+                    except (EOFError, OSError):
+                        message = None
+                    except Exception as e:
+                        # An undecodable result leaves the worker's jobs unaccounted for
+                        logger.error("Bad message from fleet worker %d: %s", handle.worker_id, str(e))
+                        handle.process.terminate()
+                        message = None
+                    if message is not None:
+                        self._loop.call_soon_threadsafe(self._on_result, handle, message)
+                        continue
+                elif handle.conn.poll():
+                    # Drain results sent right before the process exited
+                    continue
+
+                handle.exited = True
+                self._loop.call_soon_threadsafe(self._on_worker_exit, handle)
+
+    def _on_result(self, handle: _WorkerHandle, message: tuple) -> None:
+        job_id, ok, value, duration = message
+        future = handle.in_flight.pop(job_id, None)
+        handle.stats.busy_time += duration
+        if ok:
+            handle.stats.completed += 1
+        else:
+            handle.stats.failed += 1
+
+        if future is not None and not future.done():
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        self._slot_freed.set()
+
+    def _on_worker_exit(self, handle: _WorkerHandle) -> None:
+        self._fail_in_flight(
+            handle, f"Fleet worker {handle.worker_id} exited (code {handle.process.exitcode})",
+        )
+        if not self._running or self._workers.get(handle.worker_id) is not handle:
+            return
+
+        logger.warning(
+            "Fleet worker %d exited with code %s, restarting",
+            handle.worker_id,
+            handle.process.exitcode,
+        )
+        handle.stats.restarts += 1
+        handle.conn.close()
+        self._loop.call_later(self.restart_delay, self._restart, handle.worker_id)
+
+    def _restart(self, worker_id: int) -> None:
+        if self._running:
+            self._spawn(worker_id)
+
+    def _fail_in_flight(self, handle: _WorkerHandle, reason: str) -> None:
+        for future in handle.in_flight.values():
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+                handle.stats.failed += 1
+        handle.in_flight.clear()
+        if self._slot_freed:
+            self._slot_freed.set()
+
+    @property
+    def stats(self) -> List[Dict[str, Any]]:
+        """Get per-worker statistics."""
+        result = []
+        for worker_id, stats in sorted(self._stats.items()):
+            handle = self._workers.get(worker_id)
+            result.append({
+                "worker_id": worker_id,
+                "pid": stats.pid,
+                "alive": bool(handle and not handle.exited),
+                "in_flight": len(handle.in_flight) if handle else 0,
+                "completed": stats.completed,
+                "failed": stats.failed,
+                "restarts": stats.restarts,
+                "busy_time": round(stats.busy_time, 3),
+                "throughput": round(stats.throughput, 3),
+            })
+        return result
+
+
+def _worker_main(worker_id: int, browser_factory: Callable[[], Browser], conn) -> None:
+    """Worker process entry point."""
+    try:
+        asyncio.run(_worker_loop(browser_factory, conn))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    logger.debug("Fleet worker %d stopped", worker_id)
+
+
+async def _worker_loop(browser_factory: Callable[[], Browser], conn) -> None:
+    """Receive jobs from the parent and run them on this worker's browser."""
+    loop = asyncio.get_running_loop()
+    tasks = set()
+
+    async with browser_factory() as browser:
+        while True:
+            try:
+                item = await loop.run_in_executor(None, conn.recv)
+            except (EOFError, OSError):
+                break
+            if item is None:
+                break
+
+            job_id, payload = item
+            task = asyncio.create_task(_run_job(browser, conn, job_id, payload))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _run_job(browser: Browser, conn, job_id: int, payload: bytes) -> None:
+    """Run one job and send its outcome back to the parent.
+
+    A job that fails because the browser crashed under it is run once
+    more after the browser has been relaunched.
+    """
+    start = time.perf_counter()
+    for attempt in range(2):
+        crash_count = browser.crash_count
+        try:
+            job, args, kwargs = pickle.loads(payload)
+            value = await job(browser, *args, **kwargs)
+            ok = True
+        except Exception as e:
+            value = e
+            ok = False
+        if ok or attempt or browser.crash_count == crash_count:
+            break
+        try:
+            await browser.wait_until_running()
+        except RuntimeError:
+            break
+        logger.info("Requeuing fleet job %d after browser crash", job_id)
+
+    duration = time.perf_counter() - start
+    try:
+        # Exceptions with custom __init__ signatures pickle but fail to unpickle
+        pickle.loads(pickle.dumps(value))
+    except Exception as e:
+        value = RuntimeError(f"Job outcome not picklable: {value!r} ({e})")
+        ok = False
+    conn.send((job_id, ok, value, duration))
@@ -0,0 +1,203 @@
+"""
+Perceptual Image Hashing Module.
+
+Provides average, difference and DCT perceptual hashes for
+screenshots, and a BK-tree index for near-duplicate lookup by
+Hamming distance.
+"""
+
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+HASH_METHODS = ("ahash", "dhash", "phash")
+
+
+def _grayscale(image: Union[str, Any], size: Tuple[int, int]):
+    """Load an image (path or PIL image) as a grayscale float array of size (w, h)."""
+    from PIL import Image
+    import numpy as np
+
+    if isinstance(image, (str, os.PathLike)):
+        with Image.open(image) as img:
+            small = img.convert("L").resize(size, Image.LANCZOS)
+    else:
+        small = image.convert("L").resize(size, Image.LANCZOS)
+    return np.asarray(small, dtype=np.float64)
+
+
+def _to_int(bits) -> int:
+    import numpy as np
+
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+def average_hash(image: Union[str, Any], hash_size: int = 8) -> int:
+    """Hash each pixel of a downscaled image against the mean brightness."""
+    pixels = _grayscale(image, (hash_size, hash_size))
+    return _to_int(pixels > pixels.mean())
+
+
+def difference_hash(image: Union[str, Any], hash_size: int = 8) -> int:
+    """Hash the brightness gradient between horizontally adjacent pixels."""
+    pixels = _grayscale(image, (hash_size + 1, hash_size))
+    return _to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(size: int):
+    import numpy as np
+
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0] /= np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+def perceptual_hash(image: Union[str, Any], hash_size: int = 8, highfreq_factor: int = 4) -> int:
+    """Hash the low-frequency DCT coefficients against their median."""
+    import numpy as np
+
+    size = hash_size * highfreq_factor
+    pixels = _grayscale(image, (size, size))
+    dct = _dct_matrix(size)
+    low = (dct @ pixels @ dct.T)[:hash_size, :hash_size]
+    # The DC term only tracks overall brightness
+    median = np.median(low.flatten()[1:])
+    return _to_int(low > median)
+
+
+def compute_hash(image: Union[str, Any], method: str = "phash", hash_size: int = 8) -> int:
+    """
+    Compute a perceptual hash.
+
+    Args:
+        image: Image path or PIL image.
+        method: 'ahash', 'dhash' or 'phash'.
+        hash_size: Hash edge length; the hash has hash_size ** 2 bits.
+
+    Returns:
+        Hash as an integer.
+    """
+    if method == "ahash":
+        return average_hash(image, hash_size)
+    if method == "dhash":
+        return difference_hash(image, hash_size)
+    if method == "phash":
+        return perceptual_hash(image, hash_size)
+    raise ValueError(f"Unknown hash method: {method}")
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """Number of differing bits between two hashes."""
+    return (hash_a ^ hash_b).bit_count()
+
+
+class HashIndex:
+    """
+    BK-tree of image hashes for near-neighbor search.
+
+    Each node's children are keyed by their Hamming distance to the
+    node, so a search within radius r only descends into children whose
+    key lies within r of the query's distance to the node. Lookups
+    visit a small fraction of the tree for the small radii used for
+    near-duplicate detection.
+
+    Args:
+        method: Hash method used for entries, recorded with saved indexes.
+
+    Example:
+        >>> index = HashIndex()
+        >>> index.add(compute_hash("home.png"), "home.png")
+        >>> index.nearest(compute_hash("home_v2.png"), max_distance=8)
+    """
+
+    def __init__(self, method: str = "phash"):
+        if method not in HASH_METHODS:
+            raise ValueError(f"Unknown hash method: {method}")
+        self.method = method
+        # Node layout: [hash, keys, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, image_hash: int, key: str) -> None:
+        """Add a key under a hash; keys with identical hashes share a node."""
+        self._size += 1
+        if self._root is None:
+            self._root = [image_hash, [key], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(image_hash, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [image_hash, [key], {}]
+                return
+            node = child
+
+    def search(self, image_hash: int, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find keys within a Hamming distance.
+
+        Returns:
+            List of (distance, key) sorted by distance.
+        """
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node_hash, keys, children = stack.pop()
+            distance = hamming_distance(image_hash, node_hash)
+            if distance <= max_distance:
+                results.extend((distance, key) for key in keys)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in children.items() if low <= d <= high)
+
+        results.sort()
+        return results
+
+    def nearest(self, image_hash: int, max_distance: int = 10) -> Optional[Tuple[int, str]]:
+        """Closest (distance, key) within max_distance, or None."""
+        results = self.search(image_hash, max_distance)
+        return results[0] if results else None
+
+    def save(self, path: str) -> None:
+        """Write the index to a JSON file."""
+        entries = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node_hash, keys, children = stack.pop()
+            entries.append([format(node_hash, "x"), keys])
+            stack.extend(children.values())
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"method": self.method, "entries": entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        logger.info("Saved hash index with %d entries to %s", self._size, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HashIndex":
+        """Read an index written by save()."""
+        with open(path, "r", encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+
+        index = cls(method=data["method"])
+        # Parents were saved before children, so re-adding rebuilds the same tree
+        for hex_hash, keys in data["entries"]:
+            for key in keys:
+                index.add(int(hex_hash, 16), key)
+        return index
@@ -0,0 +1,281 @@
+"""
+Memory Watchdog Module.
+
+Samples the resident memory of the browser process tree and the JS
+heap of each context, recycling heavy contexts or the whole browser
+when a memory budget is exceeded.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import BrowserContext
+
+from automation.browser import Browser
+from automation.context_pool import ContextPool
+
+logger = logging.getLogger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _read_parent_pids(proc_dir: str = "/proc") -> Dict[int, int]:
+    """Map every visible pid to its parent pid."""
+    parents = {}
+    for name in os.listdir(proc_dir):
+        if not name.isdigit():
+            continue
+        try:
+            with open(os.path.join(proc_dir, name, "stat"), "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces and parentheses; fields resume after the last ')'
+        fields = stat[stat.rfind(b")") + 2:].split()
+        parents[int(name)] = int(fields[1])
+    return parents
+
+
+def process_tree_rss(root_pid: Optional[int] = None, include_root: bool = False, proc_dir: str = "/proc") -> int:
+    """
+    Sum the resident set size of a process's descendants.
+
+    Args:
+        root_pid: Process whose descendants are measured (default: this process).
+        include_root: Also count the root process itself.
+        proc_dir: procfs mount point.
+
+    Returns:
+        Resident memory in bytes, or 0 where procfs is unavailable.
+    """
+    if not os.path.isdir(proc_dir):
+        return 0
+    root_pid = root_pid or os.getpid()
+
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in _read_parent_pids(proc_dir).items():
+        children.setdefault(ppid, []).append(pid)
+
+    pids = [root_pid] if include_root else []
+    stack = list(children.get(root_pid, ()))
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        stack.extend(children.get(pid, ()))
+
+    total = 0
+    for pid in pids:
+        try:
+            with open(os.path.join(proc_dir, str(pid), "statm"), "rb") as f:
+                total += int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+async def context_heap_usage(context: BrowserContext) -> int:
+    """
+    Sum the used JS heap of a context's pages via CDP (Chromium only).
+
+    Returns:
+        Used JS heap in bytes; pages that cannot be measured count as 0.
+    """
+    total = 0
+    for page in list(context.pages):
+        try:
+            session = await context.new_cdp_session(page)
+            try:
+                await session.send("Performance.enable")
+                metrics = await session.send("Performance.getMetrics")
+            finally:
+                await session.detach()
+        except Exception as e:
+            logger.debug("Could not read heap metrics: %s", str(e))
+            continue
+        total += int(next(
+            (m["value"] for m in metrics["metrics"] if m["name"] == "JSHeapUsedSize"), 0,
+        ))
+    return total
+
+
+class MemoryWatchdog:
+    """
+    Memory budget enforcement for a browser.
+
+    Each check samples the RSS of a process tree and the JS heap of
+    each open context. Contexts above context_heap_budget_mb are
+    retired. When the RSS budget is exceeded, the heaviest pooled
+    contexts are retired first; if memory is still over budget at the
+    next check, the browser is restarted once the pool has drained.
+    Only pooled contexts can be drained: while the browser holds
+    contexts the pool does not own (such as those behind new_page()),
+    the restart is postponed rather than closing them mid-job.
+
+    By default the tree is every process descended from this one (the
+    Playwright driver and all browsers it launched), so the budget only
+    describes the watched browser when it is the only one in the
+    process, as in a BrowserFleet worker. Pass root_pid to measure a
+    specific process and its descendants instead.
+
+    Retired pooled contexts finish their current job and are closed on
+    release. Without a pool there is no way to know when work is in
+    flight, so the watchdog only measures and logs: nothing is retired
+    or restarted.
+
+    Args:
+        browser: Launched Browser to watch.
+        pool: Optional ContextPool whose contexts can be retired and drained.
+        rss_budget_mb: Budget for the browser process tree's RSS.
+        root_pid: Process whose tree is measured, itself included
+            (default: the descendants of this process).
+        context_heap_budget_mb: Optional per-context JS heap budget.
+        interval: Seconds between background checks.
+        drain_timeout: Max seconds to wait for in-use contexts before a restart.
+
+    Example:
+        >>> watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=3072)
+        >>> watchdog.start()
+        >>> ...
+        >>> await watchdog.stop()
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        pool: Optional[ContextPool] = None,
+        rss_budget_mb: float = 2048.0,
+        context_heap_budget_mb: Optional[float] = None,
+        interval: float = 30.0,
+        drain_timeout: float = 60.0,
+        root_pid: Optional[int] = None,
+    ):
+        self.browser = browser
+        self.pool = pool
+        self.rss_budget = int(rss_budget_mb * 1024 * 1024)
+        self.root_pid = root_pid
+        self.context_heap_budget = (
+            int(context_heap_budget_mb * 1024 * 1024) if context_heap_budget_mb else None
+        )
+        self.interval = interval
+        self.drain_timeout = drain_timeout
+        self._over_budget: bool = False
+        self._task: Optional[asyncio.Task] = None
+        self._stats: Dict[str, int] = {"checks": 0, "retired": 0, "restarts": 0, "last_rss": 0}
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Sample memory once and act on it.
+
+        Returns:
+            Dict with rss_bytes, retired (context count) and restarted.
+        """
+        rss = await asyncio.to_thread(process_tree_rss, self.root_pid, self.root_pid is not None)
+        self._stats["checks"] += 1
+        self._stats["last_rss"] = rss
+
+        heaps: List[Tuple[int, BrowserContext]] = []
+        if self.pool is not None:
+            for context in self.pool.contexts:
+                heaps.append((await context_heap_usage(context), context))
+            heaps.sort(key=lambda item: item[0], reverse=True)
+
+        to_retire = [
+            context for heap, context in heaps
+            if self.context_heap_budget and heap > self.context_heap_budget
+        ]
+        restarted = False
+
+        if rss > self.rss_budget:
+            if self.pool is None:
+                logger.warning(
+                    "Browser RSS %.0f MB over budget %.0f MB; no pool to drain, not restarting",
+                    rss / 1048576,
+                    self.rss_budget / 1048576,
+                )
+            elif self._over_budget or not heaps:
+                restarted = await self._restart_browser(rss)
+            else:
+                # Retire the heaviest contexts until their heap covers the overshoot
+                excess = rss - self.rss_budget
+                for heap, context in heaps:
+                    if excess <= 0:
+                        break
+                    if context not in to_retire:
+                        to_retire.append(context)
+                    excess -= heap
+            self._over_budget = not restarted
+        else:
+            self._over_budget = False
+
+        retired = 0
+        if not restarted:
+            for context in to_retire:
+                if await self.pool.retire(context):
+                    retired += 1
+            self._stats["retired"] += retired
+            if retired:
+                logger.info("Retired %d contexts (RSS %.0f MB)", retired, rss / 1048576)
+
+        return {"rss_bytes": rss, "retired": retired, "restarted": restarted}
+
+    async def _restart_browser(self, rss: int) -> bool:
+        logger.warning(
+            "Browser RSS %.0f MB over budget %.0f MB, restarting",
+            rss / 1048576,
+            self.rss_budget / 1048576,
+        )
+        if self._has_unpooled_contexts():
+            return False
+        try:
+            async with self.pool.drained(timeout=self.drain_timeout):
+                # Contexts opened outside the pool while it drained
+                if self._has_unpooled_contexts():
+                    return False
+                await self.browser.restart()
+        except asyncio.TimeoutError:
+            logger.warning("Pool did not drain within %.0fs, restart postponed", self.drain_timeout)
+            return False
+        self._stats["restarts"] += 1
+        return True
+
+    def _has_unpooled_contexts(self) -> bool:
+        """Report whether the browser has open contexts the pool cannot drain."""
+        owned = {id(context) for context in self.pool.contexts}
+        unpooled = [c for c in self.browser.contexts if id(c) not in owned]
+        if unpooled:
+            logger.warning(
+                "%d browser contexts are not owned by the pool, restart postponed", len(unpooled),
+            )
+        return bool(unpooled)
+
+    def start(self) -> asyncio.Task:
+        """Start periodic checks in the background."""
+        if self._task and not self._task.done():
+            return self._task
+        self._task = asyncio.create_task(self._loop())
+        return self._task
+
+    async def stop(self) -> None:
+        """Stop the background checks."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error("Memory check failed: %s", str(e))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get watchdog statistics."""
+        return dict(self._stats)
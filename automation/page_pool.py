@@ -0,0 +1,219 @@
+"""
+Page Pool Module.
+
+Reuses pages within one browser context for jobs that do not need
+context isolation, avoiding a new context and page per job.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+CLEAR_STORAGE_SCRIPT = """
+() => {
+    try { localStorage.clear(); } catch (e) {}
+    try { sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+@dataclass
+class PooledPage:
+    """Bookkeeping for a single pooled page."""
+    page: Page
+    uses: int = 0
+    listeners: List[Tuple[str, Callable[..., Any]]] = field(default_factory=list)
+    popups: List[Page] = field(default_factory=list)
+
+
+class PagePool:
+    """
+    Pool of reusable pages in one browser context.
+
+    Released pages are reset before reuse: popups they opened are
+    closed, routes and listeners registered through listen() are
+    removed, storage is optionally cleared and the page is navigated
+    to about:blank. Pages are replaced after max_uses jobs or when a
+    reset fails. Cookies are shared by the whole context and are left
+    alone.
+
+    Args:
+        context: Browser context the pages belong to.
+        max_size: Maximum number of pages, idle and in use.
+        max_uses: Number of jobs a page serves before it is replaced.
+        clear_storage: Clear localStorage and sessionStorage on reset.
+        timeout: Default timeout in milliseconds set on new pages.
+
+    Example:
+        >>> pool = PagePool(context, max_size=4)
+        >>> async with pool.page() as page:
+        ...     pool.listen(page, "response", on_response)
+        ...     await page.goto("https://example.com/item/1")
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        max_size: int = 5,
+        max_uses: int = 100,
+        clear_storage: bool = False,
+        timeout: Optional[int] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.context = context
+        self.max_size = max_size
+        self.max_uses = max_uses
+        self.clear_storage = clear_storage
+        self.timeout = timeout
+        self._idle: List[PooledPage] = []
+        self._in_use: Dict[int, PooledPage] = {}
+        self._size: int = 0
+        self._closed: bool = False
+        self._condition = asyncio.Condition()
+        self._stats: Dict[str, int] = {"created": 0, "reused": 0, "recycled": 0, "leaked": 0}
+
+    async def acquire(self) -> Page:
+        """Take an idle page or open a new one, waiting if the pool is full."""
+        async with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Page pool is closed")
+                entry = None
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if not candidate.page.is_closed():
+                        entry = candidate
+                        break
+                    self._size -= 1
+                if entry or self._size < self.max_size:
+                    break
+                await self._condition.wait()
+            if entry is None:
+                self._size += 1
+
+        if entry:
+            self._stats["reused"] += 1
+        else:
+            entry = await self._create()
+
+        self._in_use[id(entry.page)] = entry
+        return entry.page
+
+    async def release(self, page: Page) -> None:
+        """Reset a page and return it to the pool, or close it if it is worn out."""
+        entry = self._in_use.pop(id(page), None)
+        if entry is None:
+            raise ValueError("Page was not acquired from this pool")
+
+        entry.uses += 1
+        recycle = self._closed or entry.uses >= self.max_uses or page.is_closed()
+        if not recycle:
+            try:
+                await self._reset(entry)
+            except Exception as e:
+                logger.warning("Page reset failed, recycling: %s", str(e))
+                recycle = True
+
+        async with self._condition:
+            if recycle:
+                self._size -= 1
+            else:
+                self._idle.append(entry)
+            self._condition.notify_all()
+
+        if recycle:
+            await self._close_entry(entry)
+
+    def listen(self, page: Page, event: str, handler: Callable[..., Any]) -> None:
+        """Attach an event listener that is removed when the page is released."""
+        entry = self._in_use.get(id(page))
+        if entry is None:
+            raise ValueError("Page was not acquired from this pool")
+        page.on(event, handler)
+        entry.listeners.append((event, handler))
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Acquire a page for the duration of an async with block."""
+        page = await self.acquire()
+        try:
+            yield page
+        finally:
+            await self.release(page)
+
+    async def close(self) -> None:
+        """Close idle pages; pages still in use are reported as leaked."""
+        async with self._condition:
+            self._closed = True
+            entries, self._idle = self._idle, []
+            self._size -= len(entries)
+            self._condition.notify_all()
+
+        for entry in entries:
+            await self._close_entry(entry)
+
+        if self._in_use:
+            self._stats["leaked"] += len(self._in_use)
+            logger.warning("Page pool closed with %d pages never released", len(self._in_use))
+
+    async def _create(self) -> PooledPage:
+        """Open a page, giving back its reserved slot on failure."""
+        try:
+            page = await self.context.new_page()
+        except Exception:
+            async with self._condition:
+                self._size -= 1
+                self._condition.notify_all()
+            raise
+
+        if self.timeout is not None:
+            page.set_default_timeout(self.timeout)
+        entry = PooledPage(page=page)
+        page.on("popup", entry.popups.append)
+        self._stats["created"] += 1
+        return entry
+
+    async def _reset(self, entry: PooledPage) -> None:
+        """Clear per-job state from a page."""
+        page = entry.page
+        for popup in entry.popups:
+            if not popup.is_closed():
+                await popup.close()
+        entry.popups.clear()
+
+        for event, handler in entry.listeners:
+            page.remove_listener(event, handler)
+        entry.listeners.clear()
+        await page.unroute_all(behavior="ignoreErrors")
+
+        if self.clear_storage:
+            try:
+                await page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except Exception as e:
+                logger.debug("Could not clear page storage: %s", str(e))
+        await page.goto("about:blank")
+
+    async def _close_entry(self, entry: PooledPage) -> None:
+        self._stats["recycled"] += 1
+        for page in (*entry.popups, entry.page):
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug("Error closing pooled page: %s", str(e))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get pool statistics."""
+        return {
+            **self._stats,
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+        }
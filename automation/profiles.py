@@ -0,0 +1,144 @@
+"""
+Browser Profile Module.
+
+Clones a warmed-up template browser profile into per-worker
+user data directories, using copy-on-write clones or hardlinks
+where the filesystem supports them.
+"""
+
+import errno
+import fnmatch
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# ioctl request for copy-on-write clones (btrfs, XFS, overlay on those)
+FICLONE = 0x40049409
+
+# Runtime files that tie a profile to a running browser instance
+SKIPPED_PATTERNS = ("Singleton*", "lockfile", "LOCK", "DevToolsActivePort", "*.tmp")
+
+# Chromium cache directories, relative to the profile root
+CACHE_DIRS = (
+    "Default/Cache",
+    "Default/Code Cache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+)
+
+_UNSUPPORTED_ERRNOS = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS}
+
+
+def _reflink(src: str, dst: str) -> None:
+    """Clone a file with FICLONE; raises OSError where unsupported."""
+    import fcntl
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            fdst.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+
+def clone_profile(
+    template_dir: str,
+    target_dir: str,
+    hardlink_caches: bool = False,
+    cache_dirs: Iterable[str] = CACHE_DIRS,
+    overwrite: bool = False,
+) -> Dict[str, int]:
+    """
+    Clone a template profile into a new user data directory.
+
+    Files are cloned copy-on-write where the filesystem supports it and
+    copied otherwise. With hardlink_caches, files in cache_dirs are
+    hardlinked instead, which is fastest and shares disk space but lets
+    a browser writing in place to a cache file change the template too.
+    Lock and socket files of a running browser are skipped.
+
+    Args:
+        template_dir: Warmed-up profile to clone.
+        target_dir: New user data directory.
+        hardlink_caches: Hardlink files in cache_dirs.
+        cache_dirs: Cache directories relative to the profile root.
+        overwrite: Replace an existing target directory.
+
+    Returns:
+        Counts of files reflinked, hardlinked, copied and skipped.
+
+    Raises:
+        FileNotFoundError: If the template does not exist.
+        FileExistsError: If the target exists and overwrite is False.
+    """
+    template = Path(template_dir)
+    target = Path(target_dir)
+    if not template.is_dir():
+        raise FileNotFoundError(f"Profile template not found: {template_dir}")
+    if target.exists():
+        if not overwrite:
+            raise FileExistsError(f"Profile directory already exists: {target_dir}")
+        shutil.rmtree(target)
+
+    link_roots = tuple(Path(d) for d in cache_dirs) if hardlink_caches else ()
+    stats = {"reflinked": 0, "hardlinked": 0, "copied": 0, "skipped": 0}
+    reflink_supported = os.name == "posix"
+
+    for root, dirs, files in os.walk(template):
+        rel_root = Path(root).relative_to(template)
+        (target / rel_root).mkdir(parents=True, exist_ok=True)
+        shutil.copystat(root, target / rel_root)
+
+        for name in [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            os.symlink(os.readlink(os.path.join(root, name)), target / rel_root / name)
+            dirs.remove(name)
+
+        for name in files:
+            src = os.path.join(root, name)
+            dst = str(target / rel_root / name)
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in SKIPPED_PATTERNS):
+                stats["skipped"] += 1
+                continue
+            if os.path.islink(src):
+                os.symlink(os.readlink(src), dst)
+                stats["copied"] += 1
+                continue
+
+            if link_roots and any(rel_root == d or d in rel_root.parents for d in link_roots):
+                try:
+                    os.link(src, dst)
+                    stats["hardlinked"] += 1
+                    continue
+                except OSError:
+                    pass
+
+            if reflink_supported:
+                try:
+                    _reflink(src, dst)
+                    stats["reflinked"] += 1
+                    continue
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED_ERRNOS:
+                        raise
+                    # Same filesystem for every file, so stop trying
+                    reflink_supported = False
+
+            shutil.copy2(src, dst)
+            stats["copied"] += 1
+
+    logger.info(
+        "Cloned profile %s -> %s (%d reflinked, %d hardlinked, %d copied)",
+        template_dir,
+        target_dir,
+        stats["reflinked"],
+        stats["hardlinked"],
+        stats["copied"],
+    )
+    return stats
@@ -6,16 +6,38 @@ and multiple rotation strategies for browser automation.
 """
 
 import time
+import heapq
 import random
 import asyncio
+import itertools
 import logging
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict
+from typing import Any, AsyncIterator, Callable, List, Optional, Dict, Set, Tuple
 
 import aiohttp
 
+from automation.proxy_store import ProxyStateStore
+
 logger = logging.getLogger(__name__)
 
+# Network errors that point at the proxy rather than the target site
+PROXY_ERROR_MARKERS = ("ERR_PROXY", "ERR_TUNNEL", "ERR_TIMED_OUT", "ERR_CONNECTION")
+
+
+def is_proxy_error(error: BaseException) -> bool:
+    """
+    Tell whether an exception points at the proxy rather than the job.
+
+    Connection errors and browser network errors carrying one of
+    PROXY_ERROR_MARKERS count; selector timeouts, parse errors and
+    other job failures do not.
+    """
+    if isinstance(error, (ConnectionError, aiohttp.ClientConnectionError)):
+        return True
+    message = str(error)
+    return any(marker in message for marker in PROXY_ERROR_MARKERS)
+
 
 @dataclass
 class ProxyInfo:
@@ -26,6 +48,9 @@ class ProxyInfo:
     fail_count: int = 0
     last_used: float = 0.0
     last_checked: float = 0.0
+    ewma_latency_ms: float = 0.0
+    success_count: int = 0
+    request_count: int = 0
 
 
 class ProxyRotation:
@@ -40,11 +65,20 @@ class ProxyRotation:
         check_url: URL to use for health checks.
         check_interval: Seconds between health checks.
         max_failures: Max failures before marking proxy as unhealthy.
+        check_concurrency: Max health checks in flight at once.
+        latency_alpha: Weight of the newest sample in the latency EWMA.
+        affinity_ttl: Seconds an affinity key stays pinned to its proxy.
+        state_store: Optional persistent store for proxy health, loaded at
+            start-up and synced by flush_state() and the background checks.
+        max_in_flight: Max concurrent leases per proxy (None for unlimited).
 
     Example:
         >>> rotation = ProxyRotation(proxies=["http://1.2.3.4:8080"])
         >>> proxy = rotation.get_next()
         >>> await rotation.health_check()
+        >>> rotation.start_health_checks()
+        >>> async with rotation.lease() as proxy:
+        ...     page = await browser.new_page()
     """
 
     def __init__(
@@ -53,99 +87,462 @@ class ProxyRotation:
         check_url: str = "https://httpbin.org/ip",
         check_interval: int = 300,
         max_failures: int = 3,
+        check_concurrency: int = 50,
+        latency_alpha: float = 0.3,
+        affinity_ttl: float = 600.0,
+        state_store: Optional[ProxyStateStore] = None,
+        max_in_flight: Optional[int] = None,
     ):
         self._proxies: List[ProxyInfo] = [
-            ProxyInfo(url=url) for url in proxies
+            ProxyInfo(url=url) for url in dict.fromkeys(proxies)
         ]
         self.check_url = check_url
         self.check_interval = check_interval
         self.max_failures = max_failures
+        self.check_concurrency = check_concurrency
+        self.latency_alpha = latency_alpha
+        self.affinity_ttl = affinity_ttl
+        self._affinity: Dict[str, Tuple[str, float]] = {}
+        self._pins_since_sweep: int = 0
+        self.max_in_flight = max_in_flight
+        self._in_flight: Dict[str, int] = {}
+        self._lease_condition = asyncio.Condition()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._health_task: Optional[asyncio.Task] = None
         self._index: int = 0
         self._stats: Dict[str, int] = {"rotations": 0, "failures": 0}
 
-    def get_next(self, strategy: str = "round_robin") -> Optional[str]:
+        # Indexes keeping selection and reporting O(1) / O(log n)
+        self._by_url: Dict[str, ProxyInfo] = {p.url: p for p in self._proxies}
+        self._healthy: List[ProxyInfo] = list(self._proxies)
+        self._healthy_pos: Dict[str, int] = {p.url: i for i, p in enumerate(self._healthy)}
+        self._usage_seq = itertools.count()
+        self._usage_heap: List[Tuple[float, int, str]] = []
+        self._rebuild_usage_heap()
+
+        # Persistent health state shared with other workers
+        self.state_store = state_store
+        self._dirty: Set[str] = set()
+        self._last_sync: float = 0.0
+        if state_store:
+            self._last_sync = time.time()
+            self._apply_state(state_store.load())
+
+    def get_next(
+        self,
+        strategy: str = "round_robin",
+        affinity_key: Optional[str] = None,
+    ) -> Optional[str]:
         """
         Get the next proxy URL using the specified strategy.
 
         Args:
-            strategy: Rotation strategy ('round_robin', 'random', 'least_used').
+            strategy: Rotation strategy ('round_robin', 'random', 'least_used',
+                'p2c' or 'fastest'). 'p2c' samples two proxies and keeps the one
+                with the better latency/success score; 'fastest' scans the
+                whole pool for the best score and suits small pools.
+            affinity_key: Target host or session key. The same key gets the
+                same proxy for affinity_ttl seconds while it stays healthy,
+                and a fresh one is chosen by strategy otherwise.
 
         Returns:
             Proxy URL string or None if no healthy proxies.
         """
-        healthy = [p for p in self._proxies if p.is_healthy]
-        if not healthy:
+        if affinity_key is not None:
+            proxy = self._pinned(affinity_key)
+            if proxy:
+                return self._select(proxy, None)
+
+        if not self._healthy:
             logger.warning("No healthy proxies available")
             return None
 
+        return self._select(self._choose(strategy, self._healthy), affinity_key)
+
+    def _choose(self, strategy: str, candidates: List[ProxyInfo]) -> ProxyInfo:
+        """Pick one of candidates, a non-empty subset of the healthy proxies."""
         if strategy == "random":
-            proxy = random.choice(healthy)
-        elif strategy == "least_used":
-            proxy = min(healthy, key=lambda p: p.last_used)
-        else:  # round_robin
+            return random.choice(candidates)
+        if strategy == "least_used":
+            if candidates is self._healthy:
+                return self._least_used()
+            return min(candidates, key=lambda p: p.last_used)
+        if strategy == "p2c":
+            if len(candidates) == 1:
+                return candidates[0]
+            first, second = random.sample(candidates, 2)
+            return first if self._score(first) <= self._score(second) else second
+        if strategy == "fastest":
+            return min(candidates, key=self._score)
+
+        # round_robin: advance through the healthy list, skipping non-candidates
+        healthy = self._healthy
+        allowed = None if candidates is healthy else {p.url for p in candidates}
+        while True:
             self._index = self._index % len(healthy)
             proxy = healthy[self._index]
             self._index += 1
+            if allowed is None or proxy.url in allowed:
+                return proxy
 
+    def _select(self, proxy: ProxyInfo, affinity_key: Optional[str]) -> str:
+        """Record a proxy as used, pinning it to the affinity key if given."""
         proxy.last_used = time.time()
+        self._push_usage(proxy)
         self._stats["rotations"] += 1
+        if affinity_key is not None:
+            self._pin(affinity_key, proxy)
         logger.debug("Proxy selected: %s", proxy.url)
         return proxy.url
 
+    @asynccontextmanager
+    async def lease(
+        self,
+        strategy: str = "round_robin",
+        affinity_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        report_errors: Optional[Callable[[BaseException], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Hold a proxy for the duration of an async with block.
+
+        Waits while every healthy proxy is at max_in_flight leases; a pinned
+        affinity key waits for its own proxy to free up. Leaving
+        the block normally reports a success. An exception is re-raised
+        and reported as a proxy failure only if report_errors accepts it;
+        by default that means is_proxy_error(), so job errors such as
+        selector timeouts never count against the proxy.
+
+        Args:
+            strategy: Rotation strategy, as for get_next().
+            affinity_key: Affinity key, as for get_next().
+            timeout: Max seconds to wait for a free proxy.
+            report_errors: Predicate selecting the exceptions that count as
+                proxy failures (default: is_proxy_error).
+
+        Raises:
+            RuntimeError: If no healthy proxies are available.
+            asyncio.TimeoutError: If no proxy frees up within timeout.
+        """
+        proxy_url = await asyncio.wait_for(
+            self._acquire_lease(strategy, affinity_key), timeout=timeout,
+        )
+        try:
+            yield proxy_url
+        except Exception as e:
+            if (report_errors or is_proxy_error)(e):
+                self.report_failure(proxy_url)
+            raise
+        else:
+            self.report_success(proxy_url)
+        finally:
+            async with self._lease_condition:
+                self._in_flight[proxy_url] -= 1
+                if not self._in_flight[proxy_url]:
+                    del self._in_flight[proxy_url]
+                self._lease_condition.notify_all()
+
+    async def _acquire_lease(self, strategy: str, affinity_key: Optional[str]) -> str:
+        async with self._lease_condition:
+            while True:
+                if not self._healthy:
+                    raise RuntimeError("No healthy proxies available")
+                proxy_url = self._pick_unsaturated(strategy, affinity_key)
+                if proxy_url:
+                    self._in_flight[proxy_url] = self._in_flight.get(proxy_url, 0) + 1
+                    return proxy_url
+                await self._lease_condition.wait()
+
+    def _pick_unsaturated(self, strategy: str, affinity_key: Optional[str]) -> Optional[str]:
+        """Select a healthy proxy below max_in_flight, or None if all are saturated."""
+        if self.max_in_flight is None:
+            return self.get_next(strategy, affinity_key)
+
+        def unsaturated(proxy: ProxyInfo) -> bool:
+            return self._in_flight.get(proxy.url, 0) < self.max_in_flight
+
+        if affinity_key is not None:
+            proxy = self._pinned(affinity_key)
+            if proxy:
+                # A pinned key waits for its own proxy rather than moving on
+                return self._select(proxy, None) if unsaturated(proxy) else None
+
+        candidates = [p for p in self._healthy if unsaturated(p)]
+        if not candidates:
+            return None
+        if len(candidates) == len(self._healthy):
+            candidates = self._healthy
+        return self._select(self._choose(strategy, candidates), affinity_key)
+
+    def release_affinity(self, affinity_key: str) -> None:
+        """Forget the proxy pinned to an affinity key."""
+        self._affinity.pop(affinity_key, None)
+
+    def _pinned(self, affinity_key: str) -> Optional[ProxyInfo]:
+        """Return the live proxy pinned to a key, refreshing its TTL."""
+        pinned = self._affinity.get(affinity_key)
+        if pinned is None:
+            return None
+
+        url, expires_at = pinned
+        proxy = self._by_url.get(url)
+        now = time.time()
+        if proxy is None or not proxy.is_healthy or expires_at <= now:
+            del self._affinity[affinity_key]
+            return None
+
+        self._affinity[affinity_key] = (url, now + self.affinity_ttl)
+        return proxy
+
+    def _pin(self, affinity_key: str, proxy: ProxyInfo) -> None:
+        now = time.time()
+        self._affinity[affinity_key] = (proxy.url, now + self.affinity_ttl)
+
+        # Sweep expired keys now and then so the map stays bounded
+        self._pins_since_sweep += 1
+        if self._pins_since_sweep >= 1000:
+            self._pins_since_sweep = 0
+            self._affinity = {
+                key: pin for key, pin in self._affinity.items() if pin[1] > now
+            }
+
     def report_failure(self, proxy_url: str) -> None:
         """Report a proxy failure to update health status."""
-        for proxy in self._proxies:
-            if proxy.url == proxy_url:
-                proxy.fail_count += 1
-                self._stats["failures"] += 1
-                if proxy.fail_count >= self.max_failures:
-                    proxy.is_healthy = False
-                    logger.warning("Proxy marked unhealthy: %s", proxy_url)
-                break
-
-    def report_success(self, proxy_url: str) -> None:
-        """Report a proxy success to reset failure count."""
-        for proxy in self._proxies:
-            if proxy.url == proxy_url:
-                proxy.fail_count = 0
-                proxy.is_healthy = True
-                break
-
-    async def health_check(self) -> Dict[str, int]:
+        proxy = self._by_url.get(proxy_url)
+        if proxy is None:
+            return
+
+        proxy.fail_count += 1
+        proxy.request_count += 1
+        self._dirty.add(proxy_url)
+        self._stats["failures"] += 1
+        if proxy.fail_count >= self.max_failures and proxy.is_healthy:
+            self._set_healthy(proxy, False)
+            logger.warning("Proxy marked unhealthy: %s", proxy_url)
+
+    def report_success(self, proxy_url: str, latency_ms: Optional[float] = None) -> None:
+        """
+        Report a proxy success to reset failure count.
+
+        Args:
+            proxy_url: Proxy that served the request.
+            latency_ms: Observed request latency, fed into the latency EWMA.
+        """
+        proxy = self._by_url.get(proxy_url)
+        if proxy is None:
+            return
+
+        proxy.fail_count = 0
+        proxy.success_count += 1
+        proxy.request_count += 1
+        self._dirty.add(proxy_url)
+        if latency_ms is not None:
+            self._record_latency(proxy, latency_ms)
+        self._set_healthy(proxy, True)
+
+    def _record_latency(self, proxy: ProxyInfo, latency_ms: float) -> None:
+        proxy.latency_ms = latency_ms
+        if proxy.ewma_latency_ms == 0.0:
+            proxy.ewma_latency_ms = latency_ms
+        else:
+            alpha = self.latency_alpha
+            proxy.ewma_latency_ms = alpha * latency_ms + (1 - alpha) * proxy.ewma_latency_ms
+
+    @staticmethod
+    def _score(proxy: ProxyInfo) -> float:
+        """Lower is better: EWMA latency divided by smoothed success rate."""
+        success_rate = (proxy.success_count + 1) / (proxy.request_count + 2)
+        return max(proxy.ewma_latency_ms, 1.0) / success_rate
+
+    def _set_healthy(self, proxy: ProxyInfo, healthy: bool) -> None:
+        """Update a proxy's health and the healthy index."""
+        proxy.is_healthy = healthy
+        in_index = proxy.url in self._healthy_pos
+
+        if healthy and not in_index:
+            self._healthy_pos[proxy.url] = len(self._healthy)
+            self._healthy.append(proxy)
+            self._push_usage(proxy)
+        elif not healthy and in_index:
+            # Swap with the last entry so removal stays O(1)
+            pos = self._healthy_pos.pop(proxy.url)
+            last = self._healthy.pop()
+            if last is not proxy:
+                self._healthy[pos] = last
+                self._healthy_pos[last.url] = pos
+
+    def _least_used(self) -> ProxyInfo:
+        """Return the healthy proxy with the oldest last_used time."""
+        heap = self._usage_heap
+        while heap:
+            last_used, _, url = heap[0]
+            proxy = self._by_url[url]
+            if proxy.is_healthy and proxy.last_used == last_used:
+                return proxy
+            # Stale entry from an older use or an unhealthy proxy
+            heapq.heappop(heap)
+
+        self._rebuild_usage_heap()
+        return self._by_url[heap[0][2]]
+
+    def _push_usage(self, proxy: ProxyInfo) -> None:
+        heapq.heappush(self._usage_heap, (proxy.last_used, next(self._usage_seq), proxy.url))
+        # Drop stale entries once they outnumber live ones
+        if len(self._usage_heap) > 2 * len(self._healthy) + 64:
+            self._rebuild_usage_heap()
+
+    def _rebuild_usage_heap(self) -> None:
+        self._usage_heap = [
+            (p.last_used, next(self._usage_seq), p.url) for p in self._healthy
+        ]
+        heapq.heapify(self._usage_heap)
+
+    async def health_check(self, stale_only: bool = False) -> Dict[str, int]:
         """
-        Run health check on all proxies.
+        Run health check on the proxy pool.
+
+        Checks share one pooled HTTP session and at most
+        check_concurrency of them run at the same time.
+
+        Args:
+            stale_only: Only check proxies not checked within check_interval.
 
         Returns:
-            Dict with 'healthy' and 'unhealthy' counts.
+            Dict with 'checked', 'healthy' and 'unhealthy' counts.
         """
-        tasks = [self._check_single(p) for p in self._proxies]
-        await asyncio.gather(*tasks, return_exceptions=True)
+        if stale_only:
+            cutoff = time.time() - self.check_interval
+            targets = [p for p in self._proxies if p.last_checked <= cutoff]
+        else:
+            targets = list(self._proxies)
+
+        session = self._get_session()
+        semaphore = asyncio.Semaphore(self.check_concurrency)
 
-        healthy = sum(1 for p in self._proxies if p.is_healthy)
-        result = {"healthy": healthy, "unhealthy": len(self._proxies) - healthy}
-        logger.info("Health check: %d/%d healthy", healthy, len(self._proxies))
+        async def bounded_check(proxy: ProxyInfo) -> None:
+            async with semaphore:
+                await self._check_single(proxy, session)
+
+        await asyncio.gather(*(bounded_check(p) for p in targets), return_exceptions=True)
+
+        healthy = len(self._healthy)
+        result = {
+            "checked": len(targets),
+            "healthy": healthy,
+            "unhealthy": len(self._proxies) - healthy,
+        }
+        logger.info(
+            "Health check: %d checked, %d/%d healthy",
+            len(targets),
+            healthy,
+            len(self._proxies),
+        )
         return result
 
-    async def _check_single(self, proxy: ProxyInfo) -> None:
+    def start_health_checks(self) -> asyncio.Task:
+        """
+        Start a background task re-checking stale proxies.
+
+        The task wakes up several times per check_interval so proxies
+        with staggered last_checked times are re-checked on schedule.
+        """
+        if self._health_task and not self._health_task.done():
+            return self._health_task
+        self._health_task = asyncio.create_task(self._health_loop())
+        return self._health_task
+
+    async def stop_health_checks(self) -> None:
+        """Stop the background health check task."""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    async def flush_state(self) -> int:
+        """
+        Sync proxy health with the state store.
+
+        Writes proxies changed locally since the last sync, then applies
+        changes other workers wrote in the meantime.
+
+        Returns:
+            Number of proxies written.
+        """
+        if not self.state_store:
+            return 0
+
+        dirty = [self._by_url[url] for url in self._dirty]
+        self._dirty.clear()
+        written = await asyncio.to_thread(self.state_store.save, dirty)
+
+        # Small overlap so rows written during the previous sync are not missed
+        since = self._last_sync - 1.0
+        self._last_sync = time.time()
+        self._apply_state(await asyncio.to_thread(self.state_store.load, since))
+        return written
+
+    def _apply_state(self, states: Dict[str, Dict[str, Any]]) -> None:
+        """Apply stored state to proxies without unsynced local changes."""
+        for url, state in states.items():
+            proxy = self._by_url.get(url)
+            if proxy is None or url in self._dirty:
+                continue
+            for name, value in state.items():
+                if name != "is_healthy":
+                    setattr(proxy, name, value)
+            self._set_healthy(proxy, bool(state["is_healthy"]))
+
+    async def close(self) -> None:
+        """Stop background checks, save proxy state and close the HTTP session."""
+        await self.stop_health_checks()
+        await self.flush_state()
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _health_loop(self) -> None:
+        tick = max(1.0, self.check_interval / 10)
+        while True:
+            try:
+                await self.health_check(stale_only=True)
+                await self.flush_state()
+            except Exception as e:
+                logger.error("Background health check failed: %s", str(e))
+            await asyncio.sleep(tick)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session used for health checks."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.check_concurrency)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=10),
+            )
+        return self._session
+
+    async def _check_single(self, proxy: ProxyInfo, session: aiohttp.ClientSession) -> None:
         """Check a single proxy's health."""
         start = time.time()
         try:
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(self.check_url, proxy=proxy.url) as resp:
-                    if resp.status == 200:
-                        proxy.latency_ms = (time.time() - start) * 1000
-                        proxy.is_healthy = True
-                        proxy.fail_count = 0
-                        proxy.last_checked = time.time()
-                        return
+            async with session.get(self.check_url, proxy=proxy.url) as resp:
+                if resp.status == 200:
+                    self._record_latency(proxy, (time.time() - start) * 1000)
+                    proxy.fail_count = 0
+                    self._set_healthy(proxy, True)
+                    proxy.last_checked = time.time()
+                    self._dirty.add(proxy.url)
+                    return
         except Exception as e:
             logger.debug("Health check failed for %s: %s", proxy.url, str(e))
 
         proxy.fail_count += 1
         if proxy.fail_count >= self.max_failures:
-            proxy.is_healthy = False
+            self._set_healthy(proxy, False)
         proxy.last_checked = time.time()
+        self._dirty.add(proxy.url)
 
     @property
     def pool_size(self) -> int:
@@ -155,9 +552,14 @@ class ProxyRotation:
     @property
     def healthy_count(self) -> int:
         """Number of healthy proxies."""
-        return sum(1 for p in self._proxies if p.is_healthy)
+        return len(self._healthy)
 
     @property
     def stats(self) -> Dict[str, int]:
         """Get rotation statistics."""
-        return {**self._stats, "pool_size": self.pool_size, "healthy": self.healthy_count}
\ No newline at end of file
+        return {
+            **self._stats,
+            "pool_size": self.pool_size,
+            "healthy": self.healthy_count,
+            "in_flight": sum(self._in_flight.values()),
+        }
\ No newline at end of file
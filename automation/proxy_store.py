@@ -0,0 +1,125 @@
+"""
+Proxy State Store Module.
+
+Persists proxy health (failures, latency, last check) in a local
+SQLite database so restarted workers and sibling processes on the
+same host can reuse it instead of re-probing the whole pool.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# ProxyInfo fields persisted per proxy
+STATE_FIELDS = (
+    "is_healthy",
+    "latency_ms",
+    "ewma_latency_ms",
+    "fail_count",
+    "success_count",
+    "request_count",
+    "last_checked",
+)
+
+
+class ProxyStateStore:
+    """
+    SQLite-backed proxy health store.
+
+    The database runs in WAL mode so several worker processes can
+    read and write it concurrently. Every row carries the time it
+    was written, letting readers fetch only what changed since
+    their last sync.
+
+    Args:
+        path: SQLite database file.
+        timeout: Seconds to wait for a database lock.
+
+    Example:
+        >>> store = ProxyStateStore("./proxy_state.db")
+        >>> rotation = ProxyRotation(proxies, state_store=store)
+        >>> await rotation.flush_state()
+    """
+
+    def __init__(self, path: str = "./proxy_state.db", timeout: float = 5.0):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS proxy_state (
+                url TEXT PRIMARY KEY,
+                is_healthy INTEGER NOT NULL,
+                latency_ms REAL NOT NULL,
+                ewma_latency_ms REAL NOT NULL,
+                fail_count INTEGER NOT NULL,
+                success_count INTEGER NOT NULL,
+                request_count INTEGER NOT NULL,
+                last_checked REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_proxy_state_updated ON proxy_state (updated_at)"
+        )
+        self._conn.commit()
+
+    def load(self, since: float = 0.0) -> Dict[str, Dict[str, Any]]:
+        """
+        Read stored proxy state.
+
+        Args:
+            since: Only return rows written after this timestamp.
+
+        Returns:
+            Dict mapping proxy URL to its stored fields.
+        """
+        columns = ", ".join(STATE_FIELDS)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT url, {columns} FROM proxy_state WHERE updated_at > ?",
+                (since,),
+            ).fetchall()
+
+        return {row[0]: dict(zip(STATE_FIELDS, row[1:])) for row in rows}
+
+    def save(self, proxies: Iterable[Any]) -> int:
+        """
+        Upsert the state of the given ProxyInfo objects.
+
+        Returns:
+            Number of rows written.
+        """
+        now = time.time()
+        rows = [
+            (p.url, *(getattr(p, name) for name in STATE_FIELDS), now)
+            for p in proxies
+        ]
+        if not rows:
+            return 0
+
+        columns = ", ".join(STATE_FIELDS)
+        placeholders = ", ".join("?" for _ in range(len(STATE_FIELDS) + 2))
+        updates = ", ".join(f"{name} = excluded.{name}" for name in (*STATE_FIELDS, "updated_at"))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO proxy_state (url, {columns}, updated_at) "
+                    f"VALUES ({placeholders}) "
+                    f"ON CONFLICT(url) DO UPDATE SET {updates}",
+                    rows,
+                )
+        logger.debug("Saved state for %d proxies", len(rows))
+        return len(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,254 @@
+"""
+Response Cache Module.
+
+Opt-in on-disk cache for static responses (scripts, stylesheets,
+fonts, images) served to browser contexts via route fulfillment.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from playwright.async_api import APIResponse, BrowserContext, Route
+
+logger = logging.getLogger(__name__)
+
+# Resource types worth caching across contexts
+CACHEABLE_RESOURCE_TYPES = ("script", "stylesheet", "font", "image")
+
+# Headers describing the wire encoding; fulfilled bodies are already decoded
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+@dataclass
+class CacheEntry:
+    """Index record pointing a URL at a content-addressed body."""
+    digest: str
+    status: int
+    headers: Dict[str, str]
+    size: int
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk HTTP response cache.
+
+    Bodies are stored once per SHA-256 digest under ``cache_dir/blobs``
+    and referenced from a URL index that is evicted in LRU order once
+    the stored bytes exceed max_bytes. Only successful GET responses of
+    the configured resource types without no-store/private/no-cache or
+    Set-Cookie are cached.
+
+    Args:
+        cache_dir: Directory for the index and blobs.
+        max_bytes: Total size budget for stored bodies.
+        ttl: Seconds an entry is served, capped by Cache-Control max-age.
+        resource_types: Playwright resource types to cache.
+        max_entry_bytes: Largest single body that will be stored.
+
+    Example:
+        >>> cache = ResponseCache(cache_dir="./http_cache")
+        >>> async with Browser(response_cache=cache) as browser:
+        ...     page = await browser.new_page()
+        >>> print(cache.stats)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "./response_cache",
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl: float = 86400.0,
+        resource_types: Iterable[str] = CACHEABLE_RESOURCE_TYPES,
+        max_entry_bytes: int = 20 * 1024 * 1024,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.resource_types = frozenset(resource_types)
+        self.max_entry_bytes = max_entry_bytes
+        self._index: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._blob_refs: Dict[str, int] = {}
+        self._storing: Set[str] = set()
+        self._total_bytes: int = 0
+        self._stats: Dict[str, int] = {
+            "hits": 0, "misses": 0, "stores": 0, "evictions": 0, "bytes_saved": 0,
+        }
+        self._load_index()
+
+    async def install(self, context: BrowserContext) -> None:
+        """Serve cacheable requests of a browser context from the cache."""
+        await context.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.resource_types:
+            await route.fallback()
+            return
+
+        url = request.url
+        entry = self._lookup(url)
+        if entry:
+            body = await asyncio.to_thread(self._read_blob, entry.digest)
+            if body is not None:
+                self._stats["hits"] += 1
+                self._stats["bytes_saved"] += len(body)
+                await route.fulfill(status=entry.status, headers=entry.headers, body=body)
+                return
+            self._remove(url)
+
+        self._stats["misses"] += 1
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception as e:
+            logger.debug("Cache fetch failed for %s: %s", url, str(e))
+            await route.fallback()
+            return
+
+        ttl = self._cache_ttl(response, len(body))
+        if ttl > 0 and url not in self._storing:
+            # Concurrent misses on one URL share the first one's store
+            self._storing.add(url)
+            try:
+                await self._store(url, response, body, ttl)
+            except Exception as e:
+                logger.warning("Could not cache %s: %s", url, str(e))
+            finally:
+                self._storing.discard(url)
+        await route.fulfill(response=response, body=body)
+
+    def _lookup(self, url: str) -> Optional[CacheEntry]:
+        entry = self._index.get(url)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(url)
+            return None
+        self._index.move_to_end(url)
+        return entry
+
+    def _cache_ttl(self, response: APIResponse, size: int) -> float:
+        """Seconds to keep a response, or 0 if it must not be cached."""
+        if response.status != 200 or not 0 < size <= self.max_entry_bytes:
+            return 0.0
+
+        headers = response.headers
+        if "set-cookie" in headers:
+            return 0.0
+        cache_control = headers.get("cache-control", "").lower()
+        if any(d in cache_control for d in ("no-store", "no-cache", "private")):
+            return 0.0
+
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return min(self.ttl, float(match.group(1)))
+        return self.ttl
+
+    async def _store(self, url: str, response: APIResponse, body: bytes, ttl: float) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        if digest not in self._blob_refs:
+            await asyncio.to_thread(self._write_blob, digest, body)
+
+        # Replace the old entry only now, so its blob is not unlinked mid-write
+        self._remove(url)
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        self._index[url] = CacheEntry(
+            digest=digest,
+            status=response.status,
+            headers=headers,
+            size=len(body),
+            expires_at=time.time() + ttl,
+        )
+        self._add_ref(digest, len(body))
+        self._stats["stores"] += 1
+
+        while self._total_bytes > self.max_bytes and self._index:
+            old_url = next(iter(self._index))
+            self._remove(old_url)
+            self._stats["evictions"] += 1
+
+    def _add_ref(self, digest: str, size: int) -> None:
+        if digest not in self._blob_refs:
+            self._blob_refs[digest] = 0
+            self._total_bytes += size
+        self._blob_refs[digest] += 1
+
+    def _remove(self, url: str) -> None:
+        entry = self._index.pop(url, None)
+        if entry is None:
+            return
+        self._blob_refs[entry.digest] -= 1
+        if self._blob_refs[entry.digest] == 0:
+            del self._blob_refs[entry.digest]
+            self._total_bytes -= entry.size
+            try:
+                self._blob_path(entry.digest).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            return self._blob_path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_blob(self, digest: str, body: bytes) -> None:
+        path = self._blob_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _load_index(self) -> None:
+        index_path = self.cache_dir / "index.json"
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("Ignoring unreadable cache index: %s", str(e))
+            return
+
+        now = time.time()
+        for url, record in records:
+            entry = CacheEntry(**record)
+            if entry.expires_at > now:
+                self._index[url] = entry
+                self._add_ref(entry.digest, entry.size)
+        logger.info("Loaded %d cached responses from %s", len(self._index), index_path)
+
+    def flush(self) -> None:
+        """Write the URL index to disk so the cache survives restarts."""
+        index_path = self.cache_dir / "index.json"
+        tmp_path = index_path.with_suffix(".tmp")
+        records = [[url, asdict(entry)] for url, entry in self._index.items()]
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(records, f, separators=(",", ":"))
+        os.replace(tmp_path, index_path)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {**self._stats, "entries": len(self._index), "size_bytes": self._total_bytes}
@@ -6,16 +6,37 @@ screenshots during browser automation tasks.
 """
 
 import os
+import asyncio
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Set, Tuple
 from pathlib import Path
 
 from playwright.async_api import Page
 
+from automation.image_hash import HashIndex, compute_hash
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ComparisonResult:
+    """
+    Outcome of a region-aware screenshot comparison.
+
+    diff_boxes are (left, top, right, bottom) pixel boxes around changed
+    areas, in tile-sized steps. When exited_early is set, comparison
+    stopped as soon as the threshold could no longer be met, so
+    similarity is an upper bound and diff_boxes cover only the part
+    compared so far.
+    """
+    is_similar: bool
+    similarity: float
+    diff_boxes: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    exited_early: bool = False
+
+
 class ScreenshotManager:
     """
     Screenshot utility for browser automation.
@@ -27,6 +48,9 @@ class ScreenshotManager:
         output_dir: Directory for saving screenshots.
         format: Image format ('png' or 'jpeg').
         quality: JPEG quality (1-100), only for JPEG format.
+        hash_index: Optional HashIndex; captures are hashed and added to it.
+        dedupe_distance: With hash_index, discard captures within this
+            Hamming distance of an indexed screenshot.
 
     Example:
         >>> manager = ScreenshotManager(output_dir="./screenshots")
@@ -39,10 +63,14 @@ class ScreenshotManager:
         output_dir: str = "./screenshots",
         format: str = "png",
         quality: int = 80,
+        hash_index: Optional[HashIndex] = None,
+        dedupe_distance: Optional[int] = None,
     ):
         self.output_dir = Path(output_dir)
         self.format = format
         self.quality = quality
+        self.hash_index = hash_index
+        self.dedupe_distance = dedupe_distance
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     async def capture(
@@ -62,7 +90,8 @@ class ScreenshotManager:
             selector: CSS selector for element screenshot.
 
         Returns:
-            Path to the saved screenshot file.
+            Path to the saved screenshot file, or to the indexed
+            near-duplicate when deduplication discarded the capture.
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{name}_{timestamp}.{self.format}"
@@ -83,9 +112,62 @@ class ScreenshotManager:
             screenshot_options["full_page"] = full_page
             await page.screenshot(**screenshot_options)
 
+        if self.hash_index is not None:
+            return await self._index_capture(str(filepath))
+
         logger.info("Screenshot saved: %s", filepath)
         return str(filepath)
 
+    async def _index_capture(self, path: str) -> str:
+        """Hash a new capture and add it to the index unless it is a near-duplicate."""
+        try:
+            image_hash = await asyncio.to_thread(compute_hash, path, self.hash_index.method)
+        except ImportError:
+            logger.error("Pillow and numpy required for screenshot hashing")
+            logger.info("Screenshot saved: %s", path)
+            return path
+        if self.dedupe_distance is not None:
+            match = self.hash_index.nearest(image_hash, self.dedupe_distance)
+            if match:
+                distance, existing = match
+                os.remove(path)
+                logger.info("Discarded near-duplicate screenshot of %s (distance %d)", existing, distance)
+                return existing
+
+        self.hash_index.add(image_hash, path)
+        logger.info("Screenshot saved: %s", path)
+        return path
+
+    def find_closest_baseline(
+        self,
+        image_path: str,
+        max_distance: int = 10,
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Find the indexed screenshot most similar to an image.
+
+        Args:
+            image_path: Screenshot to look up.
+            max_distance: Largest Hamming distance to accept.
+
+        Returns:
+            Tuple of (baseline_path, distance), or None if nothing is close.
+        """
+        if self.hash_index is None:
+            raise RuntimeError("ScreenshotManager has no hash_index")
+
+        try:
+            image_hash = compute_hash(image_path, self.hash_index.method)
+        except ImportError:
+            logger.error("Pillow and numpy required for screenshot hashing")
+            return None
+
+        match = self.hash_index.nearest(image_hash, max_distance)
+        if match is None:
+            return None
+        distance, baseline = match
+        return baseline, distance
+
     async def capture_element(
         self,
         page: Page,
@@ -130,33 +212,97 @@ class ScreenshotManager:
         Returns:
             Tuple of (is_similar, similarity_score).
         """
-        try:
-            from PIL import Image
-            import numpy as np
-
-            img_a = np.array(Image.open(image_path_a).convert("RGB"))
-            img_b = np.array(Image.open(image_path_b).convert("RGB"))
+        result = self.compare_regions(image_path_a, image_path_b, threshold=threshold)
+        return result.is_similar, result.similarity
 
-            if img_a.shape != img_b.shape:
-                logger.warning("Image dimensions differ, cannot compare")
-                return False, 0.0
+    def compare_regions(
+        self,
+        image_path_a: str,
+        image_path_b: str,
+        threshold: float = 0.95,
+        early_exit: bool = False,
+        strip_height: int = 512,
+        tile_size: int = 32,
+        pixel_tolerance: int = 0,
+    ) -> ComparisonResult:
+        """
+        Compare two screenshots strip by strip and locate the differences.
 
-            # Calculate similarity
-            diff = np.abs(img_a.astype(float) - img_b.astype(float))
-            max_diff = 255.0 * 3  # RGB channels
-            similarity = 1.0 - (diff.sum() / (img_a.size * max_diff / 3))
+        Images are decoded once as 8-bit RGB and compared in horizontal
+        strips, so temporary memory stays proportional to one strip
+        rather than to the whole page.
 
-            is_similar = similarity >= threshold
-            logger.info(
-                "Image comparison: %.2f%% similar (%s)",
-                similarity * 100,
-                "PASS" if is_similar else "FAIL",
-            )
-            return is_similar, round(similarity, 4)
+        Args:
+            image_path_a: Path to first image.
+            image_path_b: Path to second image.
+            threshold: Minimum similarity score (0.0-1.0).
+            early_exit: Stop once the threshold can no longer be met.
+            strip_height: Rows compared per step, rounded to tile_size.
+            tile_size: Edge length of the tiles diff boxes are built from.
+            pixel_tolerance: Per-channel difference ignored when finding boxes.
 
+        Returns:
+            ComparisonResult with the score and diff boxes.
+        """
+        try:
+            from PIL import Image
+            import numpy as np
         except ImportError:
             logger.error("Pillow and numpy required for image comparison")
-            return False, 0.0
+            return ComparisonResult(False, 0.0)
+
+        with Image.open(image_path_a) as img_a, Image.open(image_path_b) as img_b:
+            if img_a.size != img_b.size:
+                logger.warning("Image dimensions differ, cannot compare")
+                return ComparisonResult(False, 0.0)
+
+            width, height = img_a.size
+            if not width or not height:
+                return ComparisonResult(threshold <= 1.0, 1.0)
+            strip_height = max(tile_size, strip_height - strip_height % tile_size)
+            max_total = width * height * 3 * 255
+            # Largest summed channel difference that still meets the threshold
+            budget = (1.0 - threshold) * max_total
+            total_diff = 0
+            changed_tiles: Set[Tuple[int, int]] = set()
+            exited_early = False
+
+            for top in range(0, height, strip_height):
+                box = (0, top, width, min(top + strip_height, height))
+                strip_a = np.asarray(img_a.crop(box).convert("RGB"))
+                strip_b = np.asarray(img_b.crop(box).convert("RGB"))
+
+                # max - min keeps the absolute difference in uint8
+                diff = np.maximum(strip_a, strip_b) - np.minimum(strip_a, strip_b)
+                total_diff += int(diff.sum(dtype=np.uint64))
+
+                changed = diff.max(axis=2) > pixel_tolerance
+                if changed.any():
+                    pad_rows, pad_cols = -changed.shape[0] % tile_size, -changed.shape[1] % tile_size
+                    if pad_rows or pad_cols:
+                        changed = np.pad(changed, ((0, pad_rows), (0, pad_cols)))
+                    tiles = changed.reshape(
+                        changed.shape[0] // tile_size, tile_size,
+                        changed.shape[1] // tile_size, tile_size,
+                    ).any(axis=(1, 3))
+                    rows, cols = np.nonzero(tiles)
+                    changed_tiles.update(zip((rows + top // tile_size).tolist(), cols.tolist()))
+
+                if early_exit and total_diff > budget:
+                    exited_early = True
+                    break
+
+        similarity = round(1.0 - total_diff / max_total, 4)
+        is_similar = not exited_early and similarity >= threshold
+        diff_boxes = _merge_tiles(changed_tiles, tile_size, width, height)
+        logger.info(
+            "Image comparison: %.2f%% similar (%s%s), %d diff regions",
+            similarity * 100,
+            "PASS" if is_similar else "FAIL",
+            ", early exit" if exited_early else "",
+            len(diff_boxes),
+        )
+        return ComparisonResult(is_similar, similarity, diff_boxes, exited_early)
 
     def cleanup(self, max_age_hours: int = 24) -> int:
         """
@@ -176,4 +322,38 @@ class ScreenshotManager:
                 removed += 1
 
         logger.info("Cleaned up %d old screenshots", removed)
-        return removed
\ No newline at end of file
+        return removed
+
+
+def _merge_tiles(
+    tiles: Set[Tuple[int, int]],
+    tile_size: int,
+    width: int,
+    height: int,
+) -> List[Tuple[int, int, int, int]]:
+    """Group touching (row, col) tiles into pixel bounding boxes."""
+    boxes = []
+    remaining = set(tiles)
+    while remaining:
+        stack = [remaining.pop()]
+        top = bottom = stack[0][0]
+        left = right = stack[0][1]
+        while stack:
+            row, col = stack.pop()
+            top, bottom = min(top, row), max(bottom, row)
+            left, right = min(left, col), max(right, col)
+            for neighbour in (
+                (row - 1, col - 1), (row - 1, col), (row - 1, col + 1),
+                (row, col - 1), (row, col + 1),
+                (row + 1, col - 1), (row + 1, col), (row + 1, col + 1),
+            ):
+                if neighbour in remaining:
+                    remaining.remove(neighbour)
+                    stack.append(neighbour)
+        boxes.append((
+            left * tile_size,
+            top * tile_size,
+            min((right + 1) * tile_size, width),
+            min((bottom + 1) * tile_size, height),
+        ))
+    return sorted(boxes, key=lambda b: (b[1], b[0]))
\ No newline at end of file
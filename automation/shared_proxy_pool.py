@@ -0,0 +1,317 @@
+"""
+Shared Proxy Pool Module.
+
+Keeps rotation position, usage counts and proxy health in POSIX
+shared memory so every worker process on a host sees the same pool.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from automation.proxy_rotation import ProxyInfo, ProxyRotation
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = 0x50524F5859  # "PROXY"
+_HEADER = struct.Struct("qqqq")  # magic, pool size, URL list hash, round-robin counter
+_RECORD_SLOTS = 4  # healthy, fail_count, use_count (int64), last_used (float64)
+
+
+def _url_list_hash(urls: List[str]) -> int:
+    digest = hashlib.blake2b("\n".join(urls).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+class SharedProxyState:
+    """
+    Proxy pool state in a named shared memory segment.
+
+    The first process to open a name creates and initialises the
+    segment; later processes attach to it. All processes must pass the
+    same URL list in the same order. Updates are serialised with an
+    flock on a lock file next to the segment, which works across
+    unrelated processes.
+
+    Args:
+        name: Shared memory segment name.
+        urls: Proxy URLs in pool order.
+
+    Example:
+        >>> state = SharedProxyState("scraper-proxies", urls)
+        >>> index = state.select("round_robin")
+    """
+
+    def __init__(self, name: str, urls: List[str]):
+        self.name = name
+        self.size = len(urls)
+        self._thread_lock = threading.Lock()
+        lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self._lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        nbytes = _HEADER.size + max(self.size, 1) * _RECORD_SLOTS * 8
+        url_hash = _url_list_hash(urls)
+        with self._locked():
+            try:
+                self._shm = _open_shared_memory(name, create=True, size=nbytes)
+                created = True
+            except FileExistsError:
+                self._shm = _open_shared_memory(name)
+                created = False
+
+            if created:
+                # Mark every proxy healthy before the header makes the segment valid
+                body = self._shm.buf[_HEADER.size:nbytes]
+                flags = body.cast("q")
+                for index in range(self.size):
+                    flags[index * _RECORD_SLOTS] = 1
+                flags.release()
+                body.release()
+                _HEADER.pack_into(self._shm.buf, 0, _MAGIC, self.size, url_hash, 0)
+
+            magic, size, stored_hash, _ = _HEADER.unpack_from(self._shm.buf, 0)
+            if magic != _MAGIC or size != self.size or stored_hash != url_hash:
+                self._shm.close()
+                raise ValueError(f"Shared proxy pool '{name}' was created with a different proxy list")
+
+        self._body = self._shm.buf[_HEADER.size:nbytes]
+        self._ints = self._body.cast("q")
+        self._floats = self._body.cast("d")
+        logger.info(
+            "%s shared proxy pool '%s' (%d proxies)",
+            "Created" if created else "Attached to",
+            name,
+            self.size,
+        )
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def select(self, strategy: str = "round_robin") -> Optional[int]:
+        """
+        Pick a healthy proxy index and record its use.
+
+        Args:
+            strategy: 'round_robin' (shared position) or 'random'.
+
+        Returns:
+            Proxy index, or None if no proxy is healthy.
+        """
+        if not self.size:
+            return None
+        ints = self._ints
+        with self._locked():
+            if strategy == "random":
+                start = random.randrange(self.size)
+            else:
+                start = struct.unpack_from("q", self._shm.buf, 24)[0] % self.size
+
+            for offset in range(self.size):
+                index = (start + offset) % self.size
+                if ints[index * _RECORD_SLOTS]:
+                    break
+            else:
+                return None
+
+            if strategy != "random":
+                struct.pack_into("q", self._shm.buf, 24, index + 1)
+            self._mark_used(index, time.time())
+        return index
+
+    def is_healthy(self, index: int) -> bool:
+        """Read a proxy's shared health flag."""
+        return bool(self._ints[index * _RECORD_SLOTS])
+
+    def mark_used(self, index: int, now: float) -> None:
+        """Record a use of a proxy selected outside select()."""
+        with self._locked():
+            self._mark_used(index, now)
+
+    def _mark_used(self, index: int, now: float) -> None:
+        base = index * _RECORD_SLOTS
+        self._ints[base + 2] += 1
+        self._floats[base + 3] = now
+
+    def record_failure(self, index: int, max_failures: int) -> Tuple[int, bool]:
+        """
+        Count a failure for a proxy.
+
+        Returns:
+            Tuple of (shared fail count, still healthy).
+        """
+        base = index * _RECORD_SLOTS
+        with self._locked():
+            self._ints[base + 1] += 1
+            fail_count = self._ints[base + 1]
+            if fail_count >= max_failures:
+                self._ints[base] = 0
+            return fail_count, bool(self._ints[base])
+
+    def set_health(self, index: int, healthy: bool) -> None:
+        """Set a proxy's health flag; marking healthy clears its failures."""
+        base = index * _RECORD_SLOTS
+        with self._locked():
+            self._ints[base] = 1 if healthy else 0
+            if healthy:
+                self._ints[base + 1] = 0
+
+    def snapshot(self) -> List[Tuple[bool, int, int, float]]:
+        """Return (healthy, fail_count, use_count, last_used) for every proxy."""
+        with self._locked():
+            return [
+                (
+                    bool(self._ints[i * _RECORD_SLOTS]),
+                    self._ints[i * _RECORD_SLOTS + 1],
+                    self._ints[i * _RECORD_SLOTS + 2],
+                    self._floats[i * _RECORD_SLOTS + 3],
+                )
+                for i in range(self.size)
+            ]
+
+    def close(self) -> None:
+        """Detach from the segment."""
+        self._ints.release()
+        self._floats.release()
+        self._body.release()
+        self._shm.close()
+        os.close(self._lock_fd)
+
+    def unlink(self) -> None:
+        """Remove the segment; call once when the whole fleet shuts down."""
+        try:
+            shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        shm.unlink()
+        shm.close()
+
+
+def _open_shared_memory(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """Open a segment that outlives the process that created it."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    # Older Pythons unlink tracked segments when any attached process exits
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedProxyRotation(ProxyRotation):
+    """
+    ProxyRotation whose position, usage and health are shared across processes.
+
+    'round_robin' and 'random' select directly on the shared segment.
+    Other strategies select from this process's indexes and then
+    confirm the pick against the shared health flags. Failures are
+    counted in the shared segment, so a dead proxy is detected once for
+    the whole host.
+
+    Args:
+        proxies: List of proxy URLs (same order in every process).
+        shared_name: Name of the shared memory segment.
+        **kwargs: Other ProxyRotation arguments.
+
+    Example:
+        >>> rotation = SharedProxyRotation(proxies, shared_name="scraper-proxies")
+        >>> proxy = rotation.get_next()
+    """
+
+    def __init__(self, proxies: List[str], shared_name: str, **kwargs):
+        urls = list(dict.fromkeys(proxies))
+        self._shared = SharedProxyState(shared_name, urls)
+        self._slot: Dict[str, int] = {url: i for i, url in enumerate(urls)}
+        super().__init__(urls, **kwargs)
+        self.sync_from_shared()
+
+    def get_next(
+        self,
+        strategy: str = "round_robin",
+        affinity_key: Optional[str] = None,
+    ) -> Optional[str]:
+        """Get the next proxy URL; see ProxyRotation.get_next()."""
+        if strategy in ("round_robin", "random") and affinity_key is None:
+            index = self._shared.select(strategy)
+            if index is None:
+                logger.warning("No healthy proxies available")
+                return None
+            proxy = self._proxies[index]
+            proxy.last_used = time.time()
+            self._stats["rotations"] += 1
+            return proxy.url
+
+        for _ in range(len(self._proxies)):
+            url = super().get_next(strategy, affinity_key)
+            if url is None:
+                return None
+            index = self._slot[url]
+            if self._shared.is_healthy(index):
+                self._shared.mark_used(index, self._by_url[url].last_used)
+                return url
+            # Another process marked it unhealthy
+            ProxyRotation._set_healthy(self, self._by_url[url], False)
+        return None
+
+    def report_failure(self, proxy_url: str) -> None:
+        """Report a proxy failure to the shared pool."""
+        proxy = self._by_url.get(proxy_url)
+        if proxy is None:
+            return
+
+        fail_count, healthy = self._shared.record_failure(self._slot[proxy_url], self.max_failures)
+        proxy.fail_count = fail_count
+        proxy.request_count += 1
+        self._dirty.add(proxy_url)
+        self._stats["failures"] += 1
+        if not healthy and proxy.is_healthy:
+            ProxyRotation._set_healthy(self, proxy, False)
+            logger.warning("Proxy marked unhealthy: %s", proxy_url)
+
+    def _set_healthy(self, proxy: ProxyInfo, healthy: bool) -> None:
+        super()._set_healthy(proxy, healthy)
+        self._shared.set_health(self._slot[proxy.url], healthy)
+
+    def sync_from_shared(self) -> None:
+        """Refresh local health flags and failure counts from the shared pool."""
+        for proxy, (healthy, fail_count, _, _) in zip(self._proxies, self._shared.snapshot()):
+            proxy.fail_count = fail_count
+            if proxy.is_healthy != healthy:
+                ProxyRotation._set_healthy(self, proxy, healthy)
+
+    async def health_check(self, stale_only: bool = False) -> Dict[str, int]:
+        """Run a health check, then pick up changes made by other processes."""
+        result = await super().health_check(stale_only=stale_only)
+        self.sync_from_shared()
+        return result
+
+    async def close(self) -> None:
+        """Close the rotation and detach from the shared segment."""
+        await super().close()
+        self._shared.close()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Get rotation statistics including shared usage."""
+        snapshot = self._shared.snapshot()
+        return {
+            **super().stats,
+            "shared_uses": sum(uses for _, _, uses, _ in snapshot),
+            "shared_healthy": sum(1 for healthy, _, _, _ in snapshot if healthy),
+        }
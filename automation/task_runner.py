@@ -61,10 +61,18 @@ class AutomationTask:
 
 
 class TaskRunner:
-    """Execute a series of automation tasks with dependency resolution."""
+    """Execute a series of automation tasks with dependency resolution.
 
-    def __init__(self, name: str = "workflow"):
+    Tasks whose dependencies have completed are started immediately, with
+    at most ``max_concurrency`` tasks running at once. The default of 1
+    runs tasks one at a time in dependency order.
+    """
+
+    def __init__(self, name: str = "workflow", max_concurrency: int = 1):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self.name = name
+        self.max_concurrency = max_concurrency
         self._tasks: Dict[str, AutomationTask] = {}
         self._results: Dict[str, TaskResult] = {}
 
@@ -79,26 +87,52 @@ class TaskRunner:
         started_at = datetime.utcnow().isoformat()
 
         execution_order = self._resolve_order()
-        logger.info(f"Starting workflow '{self.name}' with {len(execution_order)} tasks")
-
-        for task_name in execution_order:
-            task = self._tasks[task_name]
-
-            if not self._dependencies_met(task):
-                self._results[task_name] = TaskResult(
-                    task_name=task_name, status=TaskStatus.SKIPPED,
-                    error="Dependencies not met",
-                )
-                continue
-
-            result = await self._execute_task(task, context)
-            self._results[task_name] = result
+        logger.info(
+            f"Starting workflow '{self.name}' with {len(execution_order)} tasks "
+            f"(max concurrency {self.max_concurrency})"
+        )
 
-            if result.status == TaskStatus.COMPLETED and result.result_data:
-                context[task_name] = result.result_data
+        self._results = {}
+        pending = list(execution_order)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                for task_name in list(pending):
+                    task = self._tasks[task_name]
+                    if self._dependencies_failed(task):
+                        pending.remove(task_name)
+                        self._results[task_name] = TaskResult(
+                            task_name=task_name, status=TaskStatus.SKIPPED,
+                            error="Dependencies not met",
+                        )
+                    elif len(running) < self.max_concurrency and self._dependencies_met(task):
+                        pending.remove(task_name)
+                        running[asyncio.create_task(self._execute_task(task, context))] = task_name
+
+                if not running:
+                    # Remaining tasks wait on each other (dependency cycle)
+                    for task_name in pending:
+                        self._results[task_name] = TaskResult(
+                            task_name=task_name, status=TaskStatus.SKIPPED,
+                            error="Dependencies not met",
+                        )
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    task_name = running.pop(finished)
+                    result = finished.result()
+                    self._results[task_name] = result
+
+                    if result.status == TaskStatus.COMPLETED and result.result_data:
+                        context[task_name] = result.result_data
+        finally:
+            for unfinished in running:
+                unfinished.cancel()
 
         total_duration = (time.perf_counter() - start_time) * 1000
-        results = list(self._results.values())
+        results = [self._results[name] for name in execution_order]
 
         return WorkflowResult(
             workflow_name=self.name,
@@ -116,6 +150,7 @@ class TaskRunner:
         start = time.perf_counter()
         logger.info(f"Executing task: {task.name}")
 
+        last_error = None
         for attempt in range(task.retry_count + 1):
             try:
                 result = await asyncio.wait_for(
@@ -128,6 +163,7 @@ class TaskRunner:
                     duration_ms=duration, result_data=result,
                 )
             except Exception as e:
+                last_error = e
                 logger.error(f"Task '{task.name}' attempt {attempt + 1} failed: {e}")
                 if attempt < task.retry_count:
                     await asyncio.sleep(1)
@@ -135,9 +171,18 @@ class TaskRunner:
         duration = (time.perf_counter() - start) * 1000
         return TaskResult(
             task_name=task.name, status=TaskStatus.FAILED,
-            duration_ms=duration, error=str(e),
+            duration_ms=duration, error=str(last_error),
         )
 
+    def _dependencies_failed(self, task: AutomationTask) -> bool:
+        for dep in task.depends_on:
+            if dep not in self._tasks:
+                return True
+            result = self._results.get(dep)
+            if result and result.status != TaskStatus.COMPLETED:
+                return True
+        return False
+
     def _dependencies_met(self, task: AutomationTask) -> bool:
         for dep in task.depends_on:
             result = self._results.get(dep)
@@ -4,10 +4,37 @@ import asyncio
 import logging
 import time
 from typing import Optional, Callable, Any
+from dataclasses import dataclass
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Resolves true once no mutations were seen for quietMs, false on timeout or missing root
+DOM_STABLE_SCRIPT = """
+([selector, quietMs, timeoutMs]) => new Promise((resolve) => {
+    const root = selector ? document.querySelector(selector) : document.documentElement;
+    if (!root) {
+        resolve(false);
+        return;
+    }
+    let quietTimer = null;
+    let deadline = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish(true), quietMs);
+    });
+    const finish = (stable) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadline);
+        resolve(stable);
+    };
+    observer.observe(root, {childList: true, subtree: true, attributes: true, characterData: true});
+    quietTimer = setTimeout(() => finish(true), quietMs);
+    deadline = setTimeout(() => finish(false), timeoutMs);
+})
+"""
+
 
 class WaitCondition(Enum):
     VISIBLE = "visible"
@@ -17,6 +44,16 @@ class WaitCondition(Enum):
     STABLE = "stable"
 
 
+@dataclass
+class DomStability:
+    """Outcome of wait_for_dom_stable(); truthy when the DOM settled."""
+    stable: bool
+    waited_ms: float
+
+    def __bool__(self) -> bool:
+        return self.stable
+
+
 class WaitStrategies:
     """Collection of advanced wait strategies for page interactions."""
 
@@ -70,26 +107,37 @@ class WaitStrategies:
             return None
 
     @staticmethod
-    async def wait_for_dom_stable(page, poll_interval: float = 0.5, stability_time: float = 2.0):
-        """Wait until DOM structure stops changing."""
-        prev_html = ""
-        stable_since = 0.0
-
-        for _ in range(int(30 / poll_interval)):
-            current_html = await page.content()
-            if current_html == prev_html:
-                if stable_since == 0:
-                    stable_since = time.time()
-                elif time.time() - stable_since >= stability_time:
-                    logger.debug("DOM is stable")
-                    return True
-            else:
-                stable_since = 0
-                prev_html = current_html
-            await asyncio.sleep(poll_interval)
-
-        logger.warning("DOM stability timeout reached")
-        return False
+    async def wait_for_dom_stable(
+        page,
+        poll_interval: float = 0.5,
+        stability_time: float = 2.0,
+        timeout: float = 30.0,
+        selector: Optional[str] = None,
+    ) -> DomStability:
+        """Wait until DOM structure stops changing.
+
+        A MutationObserver inside the page resolves once no mutations happened
+        for ``stability_time`` seconds, optionally scoped to the subtree under
+        ``selector``. ``poll_interval`` is no longer used and kept for
+        backwards compatibility.
+        """
+        start = time.perf_counter()
+        try:
+            stable = await page.evaluate(
+                DOM_STABLE_SCRIPT,
+                [selector, int(stability_time * 1000), int(timeout * 1000)],
+            )
+        except Exception as e:
+            # Navigation destroys the execution context mid-wait
+            logger.warning(f"DOM stability wait interrupted: {e}")
+            stable = False
+
+        waited_ms = (time.perf_counter() - start) * 1000
+        if stable:
+            logger.debug(f"DOM is stable after {waited_ms:.0f}ms")
+        else:
+            logger.warning(f"DOM stability timeout reached after {waited_ms:.0f}ms")
+        return DomStability(stable=bool(stable), waited_ms=waited_ms)
 
     @staticmethod
     async def retry_until(
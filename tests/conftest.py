@@ -0,0 +1,38 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from automation.browser import Browser
+
+
+def make_fake_context(**options):
+    """Mock BrowserContext that fires its close listeners when closed."""
+    context = MagicMock()
+    context.pages = []
+    context.options = options
+    listeners = {}
+    context.on = lambda event, handler: listeners.setdefault(event, []).append(handler)
+
+    async def close():
+        for handler in listeners.get("close", []):
+            handler(context)
+
+    context.close = AsyncMock(side_effect=close)
+    context.clear_cookies = AsyncMock()
+    context.clear_permissions = AsyncMock()
+    context.storage_state = AsyncMock(return_value={"cookies": [], "origins": []})
+    return context
+
+
+@pytest.fixture
+def fake_browser():
+    """Browser that hands out mock contexts without launching Playwright."""
+    browser = Browser()
+    browser._browser = MagicMock()
+
+    async def new_context(**options):
+        return make_fake_context(**options)
+
+    browser._browser.new_context = AsyncMock(side_effect=new_context)
+    return browser
@@ -48,6 +48,223 @@ class TestProxyRotation:
         assert stats["pool_size"] == 2
         assert stats["healthy"] == 2
 
+    def test_least_used_cycles_through_pool(self):
+        urls = ["http://a:80", "http://b:80", "http://c:80"]
+        rotation = ProxyRotation(proxies=urls)
+        results = [rotation.get_next("least_used") for _ in range(6)]
+        assert sorted(results[:3]) == urls
+        assert results[3:] == results[:3]
+
+    def test_unhealthy_proxy_is_skipped_by_all_strategies(self):
+        rotation = ProxyRotation(
+            proxies=["http://a:80", "http://b:80", "http://c:80"],
+            max_failures=1,
+        )
+        rotation.report_failure("http://b:80")
+        for strategy in ("round_robin", "random", "least_used"):
+            picks = {rotation.get_next(strategy) for _ in range(10)}
+            assert picks == {"http://a:80", "http://c:80"}
+        assert rotation.healthy_count == 2
+
+    def test_recovered_proxy_rejoins_rotation(self):
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80"], max_failures=1)
+        rotation.report_failure("http://a:80")
+        rotation.report_success("http://a:80")
+        picks = {rotation.get_next() for _ in range(4)}
+        assert picks == {"http://a:80", "http://b:80"}
+
+    def test_unknown_proxy_reports_are_ignored(self):
+        rotation = ProxyRotation(proxies=["http://a:80"])
+        rotation.report_failure("http://unknown:80")
+        rotation.report_success("http://unknown:80")
+        assert rotation.stats["failures"] == 0
+
+    def test_latency_ewma(self):
+        rotation = ProxyRotation(proxies=["http://a:80"], latency_alpha=0.5)
+        rotation.report_success("http://a:80", latency_ms=100)
+        rotation.report_success("http://a:80", latency_ms=200)
+        proxy = rotation._by_url["http://a:80"]
+        assert proxy.ewma_latency_ms == 150
+        assert proxy.latency_ms == 200
+
+    def test_fastest_prefers_low_latency(self):
+        rotation = ProxyRotation(proxies=["http://slow:80", "http://fast:80"])
+        rotation.report_success("http://slow:80", latency_ms=900)
+        rotation.report_success("http://fast:80", latency_ms=50)
+        assert rotation.get_next("fastest") == "http://fast:80"
+
+    def test_p2c_prefers_low_latency_and_success(self):
+        rotation = ProxyRotation(proxies=["http://flaky:80", "http://good:80"], max_failures=100)
+        for _ in range(5):
+            rotation.report_success("http://good:80", latency_ms=80)
+            rotation.report_success("http://flaky:80", latency_ms=80)
+            rotation.report_failure("http://flaky:80")
+            rotation.report_failure("http://flaky:80")
+        picks = [rotation.get_next("p2c") for _ in range(10)]
+        assert set(picks) == {"http://good:80"}
+
+    def test_affinity_key_sticks_to_proxy(self):
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80", "http://c:80"])
+        first = rotation.get_next(affinity_key="shop.example.com")
+        rotation.get_next()
+        assert rotation.get_next(affinity_key="shop.example.com") == first
+        assert rotation.get_next(affinity_key="other.example.com") != first
+
+    def test_affinity_falls_back_when_unhealthy(self):
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80"], max_failures=1)
+        first = rotation.get_next(affinity_key="host")
+        rotation.report_failure(first)
+        second = rotation.get_next(affinity_key="host")
+        assert second != first
+        assert rotation.get_next(affinity_key="host") == second
+
+    def test_affinity_expires(self):
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80"], affinity_ttl=0)
+        first = rotation.get_next(affinity_key="host")
+        assert rotation.get_next(affinity_key="host") != first
+
+    @pytest.mark.asyncio
+    async def test_health_check_stale_only(self):
+        import time
+
+        rotation = ProxyRotation(
+            proxies=["http://a:80", "http://b:80"],
+            check_interval=300,
+        )
+        rotation._proxies[0].last_checked = time.time()
+        checked = []
+
+        async def fake_check(proxy, session):
+            checked.append(proxy.url)
+
+        rotation._check_single = fake_check
+        result = await rotation.health_check(stale_only=True)
+        await rotation.close()
+
+        assert checked == ["http://b:80"]
+        assert result["checked"] == 1
+
+    @pytest.mark.asyncio
+    async def test_health_check_concurrency_is_bounded(self):
+        import asyncio
+
+        rotation = ProxyRotation(
+            proxies=[f"http://p{i}:80" for i in range(20)],
+            check_concurrency=3,
+        )
+        in_flight = 0
+        peak = 0
+
+        async def fake_check(proxy, session):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+        rotation._check_single = fake_check
+        await rotation.health_check()
+        await rotation.close()
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_lease_skips_saturated_proxies(self):
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80"], max_in_flight=1)
+        async with rotation.lease() as first:
+            async with rotation.lease() as second:
+                assert {first, second} == {"http://a:80", "http://b:80"}
+                assert rotation.stats["in_flight"] == 2
+        assert rotation.stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strategy", ["fastest", "random", "p2c", "least_used", "round_robin"])
+    async def test_lease_uses_free_proxy_with_any_strategy(self, strategy):
+        proxies = ["http://a:80", "http://b:80", "http://c:80"]
+        rotation = ProxyRotation(proxies=proxies, max_in_flight=1)
+        rotation.report_success("http://a:80", latency_ms=10)
+        rotation.report_success("http://b:80", latency_ms=500)
+        rotation.report_success("http://c:80", latency_ms=900)
+
+        for _ in range(5):
+            async with rotation.lease(strategy) as held:
+                async with rotation.lease(strategy, timeout=0.1) as second:
+                    async with rotation.lease(strategy, timeout=0.1) as third:
+                        assert {held, second, third} == set(proxies)
+
+    @pytest.mark.asyncio
+    async def test_lease_affinity_waits_for_pinned_proxy(self):
+        import asyncio
+
+        rotation = ProxyRotation(proxies=["http://a:80", "http://b:80"], max_in_flight=1)
+        async with rotation.lease("fastest", affinity_key="site") as pinned:
+            with pytest.raises(asyncio.TimeoutError):
+                async with rotation.lease("fastest", affinity_key="site", timeout=0.01):
+                    pass
+            async with rotation.lease("fastest") as other:
+                assert other != pinned
+
+    @pytest.mark.asyncio
+    async def test_lease_waits_when_saturated(self):
+        import asyncio
+
+        rotation = ProxyRotation(proxies=["http://a:80"], max_in_flight=1)
+        order = []
+
+        async def worker(name):
+            async with rotation.lease():
+                order.append(f"{name}-start")
+                await asyncio.sleep(0.01)
+                order.append(f"{name}-end")
+
+        await asyncio.gather(worker("one"), worker("two"))
+        assert order == ["one-start", "one-end", "two-start", "two-end"]
+
+    @pytest.mark.asyncio
+    async def test_lease_timeout(self):
+        import asyncio
+
+        rotation = ProxyRotation(proxies=["http://a:80"], max_in_flight=1)
+        async with rotation.lease():
+            with pytest.raises(asyncio.TimeoutError):
+                async with rotation.lease(timeout=0.01):
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_lease_ignores_job_errors(self):
+        rotation = ProxyRotation(proxies=["http://a:80"], max_failures=1)
+        with pytest.raises(ValueError):
+            async with rotation.lease():
+                raise ValueError("Timeout 30000ms exceeded waiting for selector")
+        assert rotation.healthy_count == 1
+
+        with pytest.raises(RuntimeError):
+            async with rotation.lease():
+                raise RuntimeError("page.goto: net::ERR_PROXY_CONNECTION_FAILED")
+        assert rotation.healthy_count == 0
+
+    @pytest.mark.asyncio
+    async def test_lease_custom_error_predicate(self):
+        rotation = ProxyRotation(proxies=["http://a:80"], max_failures=1)
+        with pytest.raises(ValueError):
+            async with rotation.lease(report_errors=lambda e: isinstance(e, ValueError)):
+                raise ValueError("blocked by target")
+        assert rotation.healthy_count == 0
+
+    @pytest.mark.asyncio
+    async def test_lease_reports_outcome(self):
+        rotation = ProxyRotation(proxies=["http://a:80"], max_failures=1)
+        async with rotation.lease() as proxy:
+            pass
+        assert rotation._by_url[proxy].success_count == 1
+
+        with pytest.raises(ConnectionError):
+            async with rotation.lease():
+                raise ConnectionError("proxy refused")
+        assert rotation.healthy_count == 0
+        with pytest.raises(RuntimeError):
+            async with rotation.lease():
+                pass
+
 
 class TestAntiDetect:
     """Tests for anti-detection module."""
@@ -81,4 +298,291 @@ class TestScreenshotManager:
     def test_cleanup_empty_dir(self, tmp_path):
         manager = ScreenshotManager(output_dir=str(tmp_path))
         removed = manager.cleanup(max_age_hours=0)
-        assert removed == 0
\ No newline at end of file
+        assert removed == 0
+
+    def _save(self, path, pixels):
+        import numpy as np
+        from PIL import Image
+
+        Image.fromarray(np.asarray(pixels, dtype=np.uint8)).save(path)
+        return str(path)
+
+    def test_compare_matches_mean_difference(self, tmp_path):
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        a = rng.integers(0, 256, size=(300, 200, 3))
+        b = np.clip(a + rng.integers(-20, 21, size=a.shape), 0, 255)
+        path_a = self._save(tmp_path / "a.png", a)
+        path_b = self._save(tmp_path / "b.png", b)
+        expected = 1.0 - np.abs(a - b).sum() / (a.size * 255)
+
+        manager = ScreenshotManager(output_dir=str(tmp_path))
+        is_similar, similarity = manager.compare(path_a, path_b)
+        assert similarity == round(expected, 4)
+        assert is_similar == (similarity >= 0.95)
+
+    def test_compare_regions_finds_diff_boxes(self, tmp_path):
+        import numpy as np
+
+        a = np.zeros((1000, 300, 3))
+        b = a.copy()
+        b[10:20, 10:20] = 255
+        b[900:950, 250:300] = 255
+        manager = ScreenshotManager(output_dir=str(tmp_path))
+        result = manager.compare_regions(
+            self._save(tmp_path / "a.png", a),
+            self._save(tmp_path / "b.png", b),
+            strip_height=64,
+        )
+        assert result.diff_boxes == [(0, 0, 32, 32), (224, 896, 300, 960)]
+        assert result.is_similar
+        assert not result.exited_early
+
+    def test_compare_regions_early_exit(self, tmp_path):
+        import numpy as np
+
+        a = np.zeros((2048, 64, 3))
+        b = np.full_like(a, 255)
+        manager = ScreenshotManager(output_dir=str(tmp_path))
+        result = manager.compare_regions(
+            self._save(tmp_path / "a.png", a),
+            self._save(tmp_path / "b.png", b),
+            early_exit=True,
+            strip_height=128,
+        )
+        assert result.exited_early
+        assert not result.is_similar
+        assert result.diff_boxes == [(0, 0, 64, 128)]
+
+    def test_compare_size_mismatch(self, tmp_path):
+        import numpy as np
+
+        manager = ScreenshotManager(output_dir=str(tmp_path))
+        result = manager.compare(
+            self._save(tmp_path / "a.png", np.zeros((10, 10, 3))),
+            self._save(tmp_path / "b.png", np.zeros((20, 10, 3))),
+        )
+        assert result == (False, 0.0)
+
+
+class TestBrowserProxyTimings:
+    """Tests for feeding page load timings back into proxy rotation."""
+
+    def _handlers(self, rotation):
+        from automation.browser import Browser
+
+        browser = Browser(proxy_rotation=rotation)
+        context = MagicMock()
+        browser._track_proxy_timings(context, "http://a:80")
+        return {call.args[0]: call.args[1] for call in context.on.call_args_list}
+
+    def test_document_timing_reported(self):
+        rotation = ProxyRotation(proxies=["http://a:80"])
+        handlers = self._handlers(rotation)
+        request = MagicMock(resource_type="document", timing={"responseEnd": 240.0})
+        handlers["requestfinished"](request)
+        assert rotation._by_url["http://a:80"].ewma_latency_ms == 240.0
+
+    def test_proxy_errors_reported_as_failures(self):
+        rotation = ProxyRotation(proxies=["http://a:80"])
+        handlers = self._handlers(rotation)
+        handlers["requestfailed"](MagicMock(resource_type="document", failure="net::ERR_ABORTED"))
+        handlers["requestfailed"](MagicMock(resource_type="document", failure="net::ERR_PROXY_CONNECTION_FAILED"))
+        assert rotation._by_url["http://a:80"].fail_count == 1
+
+
+class TestBrowserStorageState:
+    """Tests for starting contexts from a storage state snapshot."""
+
+    STATE = {
+        "cookies": [{"name": "sid", "value": "1", "domain": "example.com", "path": "/"}],
+        "origins": [{"origin": "https://example.com", "localStorage": [{"name": "t", "value": "x"}]}],
+        "session_storage": [{"origin": "https://example.com", "items": {"k": "v"}}],
+    }
+
+    def test_snapshot_passed_without_session_storage(self):
+        from automation.browser import Browser
+
+        options = Browser().build_context_options(storage_state=self.STATE)
+        assert options["storage_state"] == {
+            "cookies": self.STATE["cookies"],
+            "origins": self.STATE["origins"],
+        }
+
+    def test_state_file_path_passed_through(self):
+        from automation.browser import Browser
+
+        options = Browser().build_context_options(storage_state="state.json")
+        assert options["storage_state"] == "state.json"
+
+    @pytest.mark.asyncio
+    async def test_new_page_restores_session_storage(self):
+        from automation.browser import Browser
+
+        browser = Browser()
+        browser._browser = MagicMock()
+        context = MagicMock()
+        context.new_page = AsyncMock(return_value=MagicMock())
+        context.add_init_script = AsyncMock()
+        browser._browser.new_context = AsyncMock(return_value=context)
+
+        await browser.new_page(storage_state=self.STATE)
+        script = context.add_init_script.await_args.args[0]
+        assert '"https://example.com": {"k": "v"}' in script
+
+
+class TestBrowserCrashRecovery:
+    """Tests for relaunching the browser after a crash."""
+
+    async def _launched(self, launch):
+        from automation.browser import Browser
+        from automation.driver import PlaywrightDriver
+
+        playwright = MagicMock()
+        playwright.stop = AsyncMock()
+        playwright.chromium.launch = launch
+        driver = PlaywrightDriver()
+        with patch("automation.driver.async_playwright") as starter:
+            starter.return_value.start = AsyncMock(return_value=playwright)
+            browser = Browser(driver=driver, relaunch_backoff=0)
+            await browser.launch()
+        return browser
+
+    @staticmethod
+    def _fake_browser():
+        pw_browser = MagicMock()
+        pw_browser.close = AsyncMock()
+        return pw_browser
+
+    @staticmethod
+    def _disconnect(pw_browser):
+        handler = next(c.args[1] for c in pw_browser.on.call_args_list if c.args[0] == "disconnected")
+        handler(pw_browser)
+
+    @pytest.mark.asyncio
+    async def test_relaunches_and_notifies_listeners(self):
+        first, second = self._fake_browser(), self._fake_browser()
+        browser = await self._launched(AsyncMock(side_effect=[first, second]))
+        lost_context = MagicMock()
+        browser._contexts.append(lost_context)
+        notified = []
+        browser.add_crash_listener(lambda b, lost: notified.append(lost))
+
+        self._disconnect(first)
+        assert browser._contexts == []
+        await browser.wait_until_running()
+
+        assert notified == [[lost_context]]
+        assert browser._browser is second
+        assert browser.crash_count == 1
+        await browser.close()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_attempts(self):
+        first = self._fake_browser()
+        launch = AsyncMock(side_effect=[first, RuntimeError("oom"), RuntimeError("oom"), RuntimeError("oom")])
+        browser = await self._launched(launch)
+
+        self._disconnect(first)
+        with pytest.raises(RuntimeError):
+            await browser.wait_until_running()
+        assert launch.await_count == 4
+        await browser.close()
+
+    @pytest.mark.asyncio
+    async def test_close_does_not_relaunch(self):
+        first = self._fake_browser()
+        launch = AsyncMock(return_value=first)
+        browser = await self._launched(launch)
+
+        await browser.close()
+        self._disconnect(first)
+        assert browser._relaunch_task is None
+        assert launch.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_restart_replaces_browser_without_crash_handling(self):
+        first, second = self._fake_browser(), self._fake_browser()
+        browser = await self._launched(AsyncMock(side_effect=[first, second]))
+        context = MagicMock(close=AsyncMock())
+        browser._contexts.append(context)
+        first.close = AsyncMock(side_effect=lambda: self._disconnect(first))
+
+        await browser.restart()
+        context.close.assert_awaited_once()
+        assert browser._browser is second
+        assert browser.crash_count == 0
+        await browser.close()
+
+
+class TestBrowserPersistentContext:
+    """Tests for persistent-context mode on user_data_dir."""
+
+    async def _launch(self, tmp_path, **kwargs):
+        from automation.browser import Browser
+        from automation.driver import PlaywrightDriver
+
+        initial = MagicMock(url="about:blank", is_closed=lambda: False)
+        context = MagicMock(pages=[initial])
+        context.new_page = AsyncMock(side_effect=lambda: MagicMock(set_viewport_size=AsyncMock()))
+        context.close = AsyncMock()
+        playwright = MagicMock()
+        playwright.stop = AsyncMock()
+        playwright.chromium.launch_persistent_context = AsyncMock(return_value=context)
+        with patch("automation.driver.async_playwright") as starter:
+            starter.return_value.start = AsyncMock(return_value=playwright)
+            browser = Browser(
+                user_data_dir=str(tmp_path / "profile"),
+                driver=PlaywrightDriver(),
+                **kwargs,
+            )
+            await browser.launch()
+        return browser, playwright, context, initial
+
+    @pytest.mark.asyncio
+    async def test_launches_persistent_context(self, tmp_path):
+        from automation.routing import RoutingProfile
+
+        browser, playwright, context, initial = await self._launch(tmp_path)
+        launch = playwright.chromium.launch_persistent_context
+        assert launch.await_args.args == (str(tmp_path / "profile"),)
+        assert launch.await_args.kwargs["headless"] is True
+        playwright.chromium.launch.assert_not_called()
+        assert browser.is_running
+
+        assert await browser.new_page() is initial
+        page = await browser.new_page(viewport={"width": 800, "height": 600})
+        assert page is not initial
+        page.set_viewport_size.assert_awaited_once_with({"width": 800, "height": 600})
+
+        with pytest.raises(RuntimeError):
+            await browser.new_context()
+        with pytest.raises(ValueError):
+            await browser.new_page(storage_state={"cookies": []})
+        with pytest.raises(ValueError):
+            await browser.new_page(routing_profile=RoutingProfile.minimal())
+
+        await browser.close()
+        context.close.assert_awaited_once()
+        assert not browser.is_running
+
+    def test_rejects_routes_with_user_data_dir(self, tmp_path):
+        from automation.browser import Browser
+        from automation.response_cache import ResponseCache
+        from automation.routing import RoutingProfile
+
+        with pytest.raises(ValueError):
+            Browser(user_data_dir=str(tmp_path), routing_profile=RoutingProfile.minimal())
+        with pytest.raises(ValueError):
+            Browser(user_data_dir=str(tmp_path), response_cache=ResponseCache(str(tmp_path / "cache")))
+
+    @pytest.mark.asyncio
+    async def test_clones_template_into_new_profile(self, tmp_path):
+        template = tmp_path / "template" / "Default"
+        template.mkdir(parents=True)
+        (template / "Preferences").write_text("{}")
+
+        browser, _, _, _ = await self._launch(tmp_path, profile_template=str(tmp_path / "template"))
+        assert (tmp_path / "profile" / "Default" / "Preferences").exists()
+        await browser.close()
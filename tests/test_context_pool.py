@@ -0,0 +1,109 @@
+"""Tests for the browser context pool."""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from automation.context_pool import ContextPool
+
+
+class TestContextPool:
+    @pytest.mark.asyncio
+    async def test_released_context_is_reused(self, fake_browser):
+        pool = ContextPool(fake_browser)
+        first = await pool.acquire(locale="de-DE")
+        await pool.release(first)
+        second = await pool.acquire(locale="de-DE")
+        assert second is first
+        first.clear_cookies.assert_awaited_once()
+        assert pool.stats["reused"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reset_clears_origin_storage(self, fake_browser):
+        pool = ContextPool(fake_browser)
+        context = await pool.acquire()
+        context.storage_state = AsyncMock(return_value={
+            "cookies": [],
+            "origins": [{"origin": "https://a.example", "localStorage": []}],
+        })
+        page = MagicMock(goto=AsyncMock(), evaluate=AsyncMock(), route=AsyncMock(), close=AsyncMock())
+        context.new_page = AsyncMock(return_value=page)
+
+        await pool.release(context)
+        page.goto.assert_awaited_once_with("https://a.example")
+        page.evaluate.assert_awaited_once()
+        page.close.assert_awaited_once()
+        assert await pool.acquire() is context
+
+    @pytest.mark.asyncio
+    async def test_different_options_get_different_contexts(self, fake_browser):
+        pool = ContextPool(fake_browser)
+        first = await pool.acquire(locale="de-DE")
+        await pool.release(first)
+        second = await pool.acquire(locale="fr-FR")
+        assert second is not first
+        assert second.options["locale"] == "fr-FR"
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_uses(self, fake_browser):
+        pool = ContextPool(fake_browser, max_uses=1)
+        first = await pool.acquire()
+        await pool.release(first)
+        first.close.assert_awaited_once()
+        second = await pool.acquire()
+        assert second is not first
+
+    @pytest.mark.asyncio
+    async def test_warm_prefills_idle_contexts(self, fake_browser):
+        pool = ContextPool(fake_browser, max_size=3)
+        created = await pool.warm(5, locale="en-US")
+        assert created == 3
+        assert pool.stats["idle"] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_pool_evicts_idle_context_of_other_key(self, fake_browser):
+        pool = ContextPool(fake_browser, max_size=1)
+        first = await pool.acquire(locale="de-DE")
+        await pool.release(first)
+        second = await pool.acquire(locale="fr-FR")
+        first.close.assert_awaited_once()
+        assert pool.stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_eviction_picks_least_recently_released(self, fake_browser):
+        pool = ContextPool(fake_browser, max_size=2)
+        german = await pool.acquire(locale="de-DE")
+        await pool.release(german)
+        german = await pool.acquire(locale="de-DE")
+        french = await pool.acquire(locale="fr-FR")
+        await pool.release(french)
+        await pool.release(german)
+
+        await pool.acquire(locale="es-ES")
+        french.close.assert_awaited_once()
+        german.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_when_saturated(self, fake_browser):
+        pool = ContextPool(fake_browser, max_size=1)
+        first = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        await pool.release(first)
+        assert await asyncio.wait_for(waiter, 1) is first
+
+    @pytest.mark.asyncio
+    async def test_browser_crash_drops_idle_contexts(self, fake_browser):
+        pool = ContextPool(fake_browser, max_size=3)
+        await pool.warm(2)
+        busy = await pool.acquire(locale="de-DE")
+
+        await pool._on_browser_crash(fake_browser, [])
+        assert pool.stats["idle"] == 0
+        assert pool.stats["size"] == 1
+        assert pool.stats["crashed"] == 2
+
+        busy.clear_cookies.side_effect = Exception("Target closed")
+        await pool.release(busy)
+        assert pool.stats["size"] == 0
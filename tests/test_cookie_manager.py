@@ -0,0 +1,212 @@
+"""Tests for cookie and session management."""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from automation.cookie_manager import CookieManager, session_storage_init_script
+from automation.cookie_store import CookieStore, JsonCookieStore, SqliteCookieStore
+
+
+def make_context(cookies=None):
+    context = MagicMock()
+    context.cookies = AsyncMock(return_value=cookies or [])
+    context.add_cookies = AsyncMock()
+    return context
+
+
+COOKIES = [
+    {"name": "session", "value": "abc", "domain": "example.com", "expires": -1},
+    {"name": "old", "value": "x", "domain": "example.com", "expires": 1.0},
+]
+
+
+class TestCookieManager:
+    @pytest.mark.asyncio
+    async def test_save_writes_compact_json(self, tmp_path):
+        manager = CookieManager(str(tmp_path))
+        assert manager.storage_dir == tmp_path
+        assert await manager.save_cookies(make_context(COOKIES), "user@site") == 2
+
+        path = tmp_path / "user_site.json"
+        text = path.read_text()
+        assert "\n" not in text
+        assert json.loads(text)["cookie_count"] == 2
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    @pytest.mark.asyncio
+    async def test_load_filters_expired(self, tmp_path):
+        await CookieManager(str(tmp_path)).save_cookies(make_context(COOKIES), "p")
+
+        context = make_context()
+        assert await CookieManager(str(tmp_path)).load_cookies(context, "p") == 1
+        context.add_cookies.assert_awaited_once_with([COOKIES[0]])
+
+    @pytest.mark.asyncio
+    async def test_hot_profile_load_skips_disk(self, tmp_path):
+        manager = CookieManager(str(tmp_path))
+        await manager.save_cookies(make_context(COOKIES), "p")
+
+        with patch.object(JsonCookieStore, "load_many") as load_many:
+            assert await manager.load_cookies(make_context(), "p") == 1
+            assert await manager.load_cookies(make_context(), "p") == 1
+        load_many.assert_not_called()
+
+        manager.forget("p")
+        assert await manager.load_cookies(make_context(), "p") == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, tmp_path):
+        manager = CookieManager(str(tmp_path), max_cached=2)
+        for profile in ("a", "b"):
+            await manager.save_cookies(make_context(COOKIES), profile)
+        await manager.load_cookies(make_context(), "a")
+        await manager.save_cookies(make_context(COOKIES), "c")
+
+        assert list(manager._cookies) == ["a", "c"]
+        assert await manager.load_cookies(make_context(), "b") == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_profile(self, tmp_path):
+        manager = CookieManager(str(tmp_path))
+        assert await manager.load_cookies(make_context(), "nobody") == 0
+
+    @pytest.mark.asyncio
+    async def test_delete_profile_clears_cache(self, tmp_path):
+        manager = CookieManager(str(tmp_path))
+        await manager.save_cookies(make_context(COOKIES), "p")
+
+        assert manager.delete_profile("p")
+        assert await manager.load_cookies(make_context(), "p") == 0
+        assert manager.list_profiles() == []
+
+
+class TestStorageState:
+    STATE = {
+        "cookies": COOKIES,
+        "origins": [{"origin": "https://example.com", "localStorage": [{"name": "t", "value": "x"}]}],
+    }
+
+    def make_state_context(self, pages=()):
+        context = make_context()
+        context.storage_state = AsyncMock(return_value=dict(self.STATE))
+        context.pages = list(pages)
+        return context
+
+    @pytest.mark.asyncio
+    async def test_save_state_captures_session_storage(self, tmp_path):
+        page = MagicMock(url="https://example.com/")
+        page.evaluate = AsyncMock(return_value={"origin": "https://example.com", "items": {"k": "v"}})
+        blank = MagicMock(url="about:blank")
+        blank.evaluate = AsyncMock(return_value={"origin": "null", "items": {}})
+        manager = CookieManager(str(tmp_path))
+
+        state = await manager.save_state(self.make_state_context([page, blank]), "p", session_storage=True)
+        assert state["session_storage"] == [{"origin": "https://example.com", "items": {"k": "v"}}]
+        script = session_storage_init_script(state)
+        assert script.endswith('({"https://example.com": {"k": "v"}}, "__session_restored__")')
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    async def test_load_state_round_trip(self, tmp_path, backend):
+        store = (
+            JsonCookieStore(str(tmp_path)) if backend == "json"
+            else SqliteCookieStore(str(tmp_path / "cookies.db"))
+        )
+        await CookieManager(store=store).save_state(self.make_state_context(), "p")
+
+        manager = CookieManager(store=store)
+        state = await manager.load_state("p")
+        assert state["origins"] == self.STATE["origins"]
+        assert state["cookies"] == [COOKIES[0]]
+        assert session_storage_init_script(state) is None
+        assert await manager.load_state("missing") is None
+
+        assert manager.delete_profile("p")
+        assert await manager.load_state("p") is None
+        store.close()
+
+
+class TestCookieStores:
+    def test_base_class_is_abstract(self):
+        with pytest.raises(TypeError):
+            CookieStore()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["json", "sqlite"])
+    async def test_manager_lists_profiles_by_domain(self, tmp_path, backend):
+        store = (
+            JsonCookieStore(str(tmp_path)) if backend == "json"
+            else SqliteCookieStore(str(tmp_path / "cookies.db"))
+        )
+        other = [{"name": "x", "value": "1", "domain": "other.com", "expires": -1}]
+        manager = CookieManager(store=store)
+        await manager.save_many({"a": make_context(COOKIES), "b": make_context(other)})
+
+        profiles = manager.list_profiles()
+        assert {p["profile"] for p in profiles} == {"a", "b"}
+        assert all(set(p) == {"profile", "cookie_count", "saved_at", "file_size"} for p in profiles)
+        assert [p["profile"] for p in manager.list_profiles(domain="other.com")] == ["b"]
+        manager.close()
+
+
+class TestSqliteCookieStore:
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = SqliteCookieStore(str(tmp_path / "cookies.db"))
+        yield store
+        store.close()
+
+    def test_save_and_load_many(self, store):
+        store.save_many({"a": COOKIES, "b": [], "c": COOKIES[:1]})
+
+        loaded = store.load_many(["a", "b", "c", "missing"])
+        assert sorted(c["name"] for c in loaded["a"]) == ["old", "session"]
+        assert loaded["b"] == []
+        assert "missing" not in loaded
+        assert store.load("missing") is None
+
+    def test_duplicate_cookies_counted_once(self, store):
+        store.save("a", [COOKIES[0], dict(COOKIES[0], value="newer")])
+        assert store.load("a") == [dict(COOKIES[0], value="newer")]
+        assert store.list_profiles()[0]["cookie_count"] == 1
+
+    def test_resave_replaces_cookies(self, store):
+        store.save("a", COOKIES)
+        store.save("a", COOKIES[:1])
+        assert store.load("a") == COOKIES[:1]
+
+    def test_list_profiles_by_domain(self, store):
+        other = [{"name": "x", "value": "1", "domain": "other.com", "expires": -1}]
+        store.save_many({"a": COOKIES, "b": other})
+
+        assert {p["profile"] for p in store.list_profiles()} == {"a", "b"}
+        by_domain = store.list_profiles(domain="other.com")
+        assert [(p["profile"], p["cookie_count"]) for p in by_domain] == [("b", 1)]
+
+    def test_purge_expired_updates_counts(self, store):
+        store.save_many({"a": COOKIES, "b": COOKIES[:1]})
+
+        assert store.purge_expired() == 1
+        counts = {p["profile"]: p["cookie_count"] for p in store.list_profiles()}
+        assert counts == {"a": 1, "b": 1}
+        assert store.load("a") == COOKIES[:1]
+
+    def test_delete(self, store):
+        store.save("a", COOKIES)
+        assert store.delete("a")
+        assert not store.delete("a")
+        assert store.list_profiles() == []
+
+    @pytest.mark.asyncio
+    async def test_manager_with_sqlite_store(self, store):
+        manager = CookieManager(store=store)
+        await manager.save_many({"a": make_context(COOKIES), "b": make_context(COOKIES[:1])})
+
+        assert manager.storage_dir is None
+
+        fresh = CookieManager(store=store)
+        assert await fresh.preload(["a", "b", "c"]) == 2
+        context = make_context()
+        assert await fresh.load_cookies(context, "a") == 1
+        context.add_cookies.assert_awaited_once_with([COOKIES[0]])
@@ -1,6 +1,7 @@
 """Tests for the data extraction module."""
 
 import pytest
+from unittest.mock import AsyncMock
 from automation.data_extractor import DataExtractor, ExtractionRule
 
 
@@ -61,4 +62,153 @@ class TestExtractionRule:
             default=0.0,
         )
         assert rule.transform is not None
-        assert rule.default == 0.0
\ No newline at end of file
+        assert rule.default == 0.0
+
+
+class FakePage:
+    url = "https://example.com/products"
+
+    def __init__(self, raw_results):
+        self.raw_results = raw_results
+        self.evaluate_calls = 0
+
+    async def evaluate(self, script, specs):
+        self.evaluate_calls += 1
+        self.specs = specs
+        return self.raw_results
+
+
+class TestBatchedExtraction:
+    @pytest.mark.asyncio
+    async def test_single_evaluate_for_all_rules(self):
+        extractor = (
+            DataExtractor()
+            .add_text_rule("title", "h1")
+            .add_text_rule("price", "span.price", transform=DataExtractor.clean_price)
+            .add_list_rule("tags", "span.tag")
+            .add_attribute_rule("img", "img.hero", "src")
+        )
+        page = FakePage([
+            {"value": "  Widget "},
+            {"value": "$19.99"},
+            {"values": [" a ", "b", None]},
+            {"value": "/hero.png"},
+        ])
+
+        result = await extractor.extract(page, batched=True)
+
+        assert page.evaluate_calls == 1
+        assert page.specs[3] == {"selector": "img.hero", "attribute": "src", "multiple": False}
+        assert result.data == {
+            "title": "Widget",
+            "price": 19.99,
+            "tags": ["a", "b"],
+            "img": "/hero.png",
+        }
+        assert result.errors == []
+
+    @pytest.mark.asyncio
+    async def test_missing_and_invalid_rules(self):
+        extractor = (
+            DataExtractor()
+            .add_text_rule("title", "h1")
+            .add_text_rule("rating", "span.rating", default="n/a")
+            .add_text_rule("broken", "[[")
+        )
+        page = FakePage([
+            {"missing": True},
+            {"missing": True},
+            {"error": "SyntaxError: invalid selector"},
+        ])
+
+        result = await extractor.extract(page, batched=True)
+
+        assert result.data == {"title": None, "rating": "n/a", "broken": None}
+        assert result.errors[0] == "Element not found: h1"
+        assert "SyntaxError" in result.errors[1]
+
+
+    @pytest.mark.asyncio
+    async def test_evaluate_failure_returns_defaults(self):
+        extractor = (
+            DataExtractor()
+            .add_text_rule("title", "h1")
+            .add_text_rule("rating", "span.rating", default="n/a")
+        )
+        page = FakePage([])
+        page.evaluate = AsyncMock(side_effect=Exception("Execution context was destroyed"))
+
+        result = await extractor.extract(page, batched=True)
+
+        assert result.data == {"title": None, "rating": "n/a"}
+        assert len(result.errors) == 2
+        assert all("context was destroyed" in error for error in result.errors)
+
+
+PRODUCT_HTML = """
+<html><body>
+  <h1 class="title"> Widget </h1>
+  <span class="price">$1,299.00</span>
+  <ul><li class="tag">red</li><li class="tag">blue</li></ul>
+  <a class="main" href="/widget">Details</a>
+</body></html>
+"""
+
+
+def product_extractor():
+    return (
+        DataExtractor()
+        .add_text_rule("title", "h1.title")
+        .add_text_rule("price", "span.price", transform=DataExtractor.clean_price)
+        .add_list_rule("tags", "li.tag")
+        .add_attribute_rule("link", "a.main", "href")
+        .add_text_rule("rating", "span.rating", default=0)
+    )
+
+
+class TestOfflineExtraction:
+    def test_extract_html(self):
+        pytest.importorskip("lxml.cssselect")
+        result = product_extractor().extract_html(PRODUCT_HTML, url="snapshot://1")
+
+        assert result.url == "snapshot://1"
+        assert result.data == {
+            "title": "Widget",
+            "price": 1299.0,
+            "tags": ["red", "blue"],
+            "link": "/widget",
+            "rating": 0,
+        }
+        assert result.errors == []
+
+    def test_extract_html_missing_element(self):
+        pytest.importorskip("lxml.cssselect")
+        extractor = DataExtractor().add_text_rule("title", "h2")
+        result = extractor.extract_html("<html><body></body></html>")
+        assert result.data == {"title": None}
+        assert result.errors == ["Element not found: h2"]
+
+    def test_extract_html_with_xml_declaration(self):
+        pytest.importorskip("lxml.cssselect")
+        extractor = DataExtractor().add_text_rule("title", "h1")
+        html = '<?xml version="1.0" encoding="utf-8"?><html><body><h1>Widget</h1></body></html>'
+        assert extractor.extract_html(html).data == {"title": "Widget"}
+
+    def test_unparsable_document_is_reported(self):
+        pytest.importorskip("lxml.cssselect")
+        documents = [("doc://comment", "<!-- nothing here -->"), ("doc://ok", PRODUCT_HTML)]
+        results = product_extractor().extract_documents(documents, max_workers=1)
+
+        assert results[0].data["title"] is None
+        assert results[0].errors and "Could not parse HTML" in results[0].errors[0]
+        assert results[1].data["title"] == "Widget"
+
+    def test_extract_documents_preserves_order(self):
+        pytest.importorskip("lxml.cssselect")
+        documents = [
+            (f"doc://{i}", f"<html><body><h1 class='title'>Item {i}</h1></body></html>")
+            for i in range(5)
+        ]
+        results = product_extractor().extract_documents(documents, max_workers=2, chunksize=2)
+        assert [r.url for r in results] == [url for url, _ in documents]
+        assert [r.data["title"] for r in results] == [f"Item {i}" for i in range(5)]
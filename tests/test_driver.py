@@ -0,0 +1,77 @@
+"""Tests for the shared Playwright driver manager."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from automation.browser import Browser
+from automation.driver import PlaywrightDriver
+
+
+@pytest.fixture
+def fake_playwright():
+    playwright = MagicMock()
+    playwright.stop = AsyncMock()
+    playwright.chromium.launch = AsyncMock(side_effect=lambda **kwargs: MagicMock(close=AsyncMock()))
+    starter = MagicMock()
+    starter.return_value.start = AsyncMock(return_value=playwright)
+    with patch("automation.driver.async_playwright", starter):
+        yield playwright, starter
+
+
+class TestPlaywrightDriver:
+    @pytest.mark.asyncio
+    async def test_driver_started_once_and_stopped_by_last_release(self, fake_playwright):
+        playwright, starter = fake_playwright
+        driver = PlaywrightDriver()
+
+        results = await asyncio.gather(*(driver.acquire() for _ in range(3)))
+        assert all(result is playwright for result in results)
+        assert starter.call_count == 1
+        assert driver.refs == 3
+
+        await driver.release()
+        await driver.release()
+        playwright.stop.assert_not_awaited()
+        await driver.release()
+        playwright.stop.assert_awaited_once()
+
+        await driver.release()
+        assert driver.refs == 0
+
+    @pytest.mark.asyncio
+    async def test_restarts_after_full_release(self, fake_playwright):
+        _, starter = fake_playwright
+        driver = PlaywrightDriver()
+        await driver.acquire()
+        await driver.release()
+        await driver.acquire()
+        assert starter.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_browsers_share_driver(self, fake_playwright):
+        playwright, starter = fake_playwright
+        driver = PlaywrightDriver()
+        first = Browser(driver=driver)
+        second = Browser(driver=driver)
+
+        await first.launch()
+        await second.launch()
+        assert starter.call_count == 1
+        assert playwright.chromium.launch.await_count == 2
+
+        await first.close()
+        playwright.stop.assert_not_awaited()
+        await second.close()
+        playwright.stop.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_launch_releases_driver(self, fake_playwright):
+        playwright, _ = fake_playwright
+        playwright.chromium.launch = AsyncMock(side_effect=RuntimeError("no browser"))
+        driver = PlaywrightDriver()
+
+        with pytest.raises(RuntimeError):
+            await Browser(driver=driver).launch()
+        assert driver.refs == 0
+        playwright.stop.assert_awaited_once()
@@ -0,0 +1,80 @@
+"""Tests for the multi-process browser fleet."""
+
+import os
+import pytest
+
+from automation.fleet import BrowserFleet
+
+
+class FakeBrowser:
+    """Stand-in for Browser that needs no Playwright install."""
+
+    crash_count = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class SiteError(Exception):
+    """Exception whose constructor arguments differ from its args."""
+
+    def __init__(self, url, status):
+        super().__init__(f"{url} returned {status}")
+
+
+async def worker_pid(browser, value):
+    return os.getpid(), value * 2
+
+
+async def failing_job(browser):
+    raise ValueError("job failed")
+
+
+async def unpicklable_error_job(browser):
+    raise SiteError("https://example.com", 503)
+
+
+async def crashing_job(browser):
+    os._exit(1)
+
+
+class TestBrowserFleet:
+    @pytest.mark.asyncio
+    async def test_jobs_run_in_worker_processes(self):
+        async with BrowserFleet(workers=2, browser_factory=FakeBrowser) as fleet:
+            results = [await fleet.submit(worker_pid, i) for i in range(4)]
+
+        assert [value for _, value in results] == [0, 2, 4, 6]
+        assert all(pid != os.getpid() for pid, _ in results)
+        assert sum(w["completed"] for w in fleet.stats) == 4
+
+    @pytest.mark.asyncio
+    async def test_job_exception_is_reraised(self):
+        async with BrowserFleet(workers=1, browser_factory=FakeBrowser) as fleet:
+            with pytest.raises(ValueError, match="job failed"):
+                await fleet.submit(failing_job)
+
+    @pytest.mark.asyncio
+    async def test_unpicklable_exception_becomes_runtime_error(self):
+        async with BrowserFleet(workers=1, browser_factory=FakeBrowser) as fleet:
+            with pytest.raises(RuntimeError, match="returned 503"):
+                await fleet.submit(unpicklable_error_job)
+            _, value = await fleet.submit(worker_pid, 3)
+
+        assert value == 6
+        assert fleet.stats[0]["restarts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_crashed_worker_is_restarted(self):
+        async with BrowserFleet(
+            workers=1, browser_factory=FakeBrowser, restart_delay=0.01,
+        ) as fleet:
+            with pytest.raises(RuntimeError, match="exited"):
+                await fleet.submit(crashing_job)
+            pid, value = await fleet.submit(worker_pid, 1)
+
+        assert value == 2
+        assert fleet.stats[0]["restarts"] == 1
@@ -0,0 +1,114 @@
+"""Tests for perceptual hashing and the screenshot hash index."""
+
+import os
+import random
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from automation.image_hash import HashIndex, compute_hash, hamming_distance
+from automation.screenshot import ScreenshotManager
+
+
+def gradient(width=200, height=150, shift=0):
+    x = np.linspace(0, 255, width)
+    y = np.linspace(0, 255, height)[:, None]
+    pixels = (x + y) / 2
+    pixels[40:80, 60 + shift:120 + shift] = 255 - pixels[40:80, 60 + shift:120 + shift]
+    return Image.fromarray(np.stack([pixels] * 3, axis=2).astype(np.uint8))
+
+
+class TestHashes:
+    @pytest.mark.parametrize("method", ["ahash", "dhash", "phash"])
+    def test_near_duplicates_are_close(self, method):
+        base = compute_hash(gradient(), method)
+        noisy = np.asarray(gradient()).astype(int) + np.random.default_rng(0).integers(-3, 4, (150, 200, 3))
+        near = compute_hash(Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)), method)
+        other = compute_hash(Image.fromarray(255 - np.asarray(gradient())), method)
+
+        assert hamming_distance(base, near) <= 4
+        assert hamming_distance(base, other) > 20
+
+    def test_hash_from_path(self, tmp_path):
+        path = tmp_path / "a.png"
+        gradient().save(path)
+        assert compute_hash(str(path)) == compute_hash(gradient())
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError):
+            compute_hash(gradient(), "xhash")
+
+
+class TestHashIndex:
+    def test_search_matches_brute_force(self):
+        rng = random.Random(1)
+        hashes = [rng.getrandbits(64) for _ in range(500)]
+        index = HashIndex()
+        for i, h in enumerate(hashes):
+            index.add(h, f"k{i}")
+
+        query = hashes[7] ^ 0b1011
+        expected = sorted(
+            (hamming_distance(query, h), f"k{i}")
+            for i, h in enumerate(hashes)
+            if hamming_distance(query, h) <= 20
+        )
+        assert index.search(query, 20) == expected
+        assert index.nearest(query, 5) == (3, "k7")
+        assert len(index) == 500
+
+    def test_save_and_load(self, tmp_path):
+        index = HashIndex(method="dhash")
+        index.add(0b1111, "a")
+        index.add(0b1111, "b")
+        index.add(0b0001, "c")
+        path = str(tmp_path / "index.json")
+        index.save(path)
+
+        loaded = HashIndex.load(path)
+        assert loaded.method == "dhash"
+        assert len(loaded) == 3
+        assert loaded.search(0b1111, 0) == [(0, "a"), (0, "b")]
+
+
+class TestScreenshotDedupe:
+    def make_page(self, images):
+        page = MagicMock()
+
+        async def screenshot(path, **kwargs):
+            images.pop(0).save(path)
+
+        page.screenshot = AsyncMock(side_effect=screenshot)
+        return page
+
+    @pytest.mark.asyncio
+    async def test_capture_discards_near_duplicates(self, tmp_path):
+        inverted = Image.fromarray(255 - np.asarray(gradient()))
+        page = self.make_page([gradient(), gradient(), inverted])
+        manager = ScreenshotManager(str(tmp_path), hash_index=HashIndex(), dedupe_distance=4)
+
+        first = await manager.capture(page, "a")
+        second = await manager.capture(page, "b")
+        third = await manager.capture(page, "c")
+
+        assert second == first
+        assert third != first
+        assert sorted(str(p) for p in tmp_path.iterdir()) == sorted([first, third])
+        assert manager.find_closest_baseline(first) == (first, 0)
+
+    def test_find_closest_baseline_requires_index(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            ScreenshotManager(str(tmp_path)).find_closest_baseline("x.png")
+
+    @pytest.mark.asyncio
+    async def test_capture_without_numpy_keeps_screenshot(self, tmp_path):
+        manager = ScreenshotManager(str(tmp_path), hash_index=HashIndex())
+        with patch("automation.screenshot.compute_hash", side_effect=ImportError("numpy")):
+            path = await manager.capture(self.make_page([gradient()]), "a")
+            assert manager.find_closest_baseline(path) is None
+
+        assert os.path.exists(path)
+        assert len(manager.hash_index) == 0
@@ -0,0 +1,152 @@
+"""Tests for the memory watchdog."""
+
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from automation.context_pool import ContextPool
+from automation.memory_watchdog import MemoryWatchdog, context_heap_usage, process_tree_rss
+
+MB = 1024 * 1024
+
+
+def write_proc(proc_dir, pid, ppid, rss_pages, name="chrome"):
+    path = proc_dir / str(pid)
+    path.mkdir()
+    (path / "stat").write_text(f"{pid} ({name}) S {ppid} 1 1 0 -1")
+    (path / "statm").write_text(f"1000 {rss_pages} 0 0 0 0 0")
+
+
+@pytest.fixture
+def pooled(fake_browser):
+    fake_browser.restart = AsyncMock()
+    return fake_browser, ContextPool(fake_browser)
+
+
+class TestProcessTreeRss:
+    def test_sums_descendants_only(self, tmp_path):
+        page = os.sysconf("SC_PAGE_SIZE")
+        write_proc(tmp_path, 10, 1, 100, name="python")
+        write_proc(tmp_path, 11, 10, 200, name="node")
+        write_proc(tmp_path, 12, 11, 300, name="chrome (gpu)")
+        write_proc(tmp_path, 20, 1, 999, name="other")
+
+        assert process_tree_rss(10, proc_dir=str(tmp_path)) == 500 * page
+        assert process_tree_rss(10, include_root=True, proc_dir=str(tmp_path)) == 600 * page
+
+    def test_missing_procfs(self, tmp_path):
+        assert process_tree_rss(proc_dir=str(tmp_path / "missing")) == 0
+
+
+class TestContextHeapUsage:
+    @pytest.mark.asyncio
+    async def test_sums_page_heaps(self):
+        session = MagicMock()
+        session.send = AsyncMock(side_effect=lambda method: {
+            "metrics": [{"name": "JSHeapUsedSize", "value": 5 * MB}],
+        } if method == "Performance.getMetrics" else {})
+        session.detach = AsyncMock()
+        context = MagicMock(pages=[MagicMock(), MagicMock()])
+        context.new_cdp_session = AsyncMock(return_value=session)
+
+        assert await context_heap_usage(context) == 10 * MB
+        assert session.detach.await_count == 2
+
+
+class TestMemoryWatchdog:
+    async def run_check(self, watchdog, rss, heaps):
+        usage = AsyncMock(side_effect=lambda context: heaps.get(id(context), 0))
+        with patch("automation.memory_watchdog.process_tree_rss", return_value=rss), \
+                patch("automation.memory_watchdog.context_heap_usage", usage):
+            return await watchdog.check()
+
+    @pytest.mark.asyncio
+    async def test_under_budget_does_nothing(self, pooled):
+        browser, pool = pooled
+        await pool.warm(2)
+        watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=100)
+
+        result = await self.run_check(watchdog, 50 * MB, {})
+        assert result == {"rss_bytes": 50 * MB, "retired": 0, "restarted": False}
+
+    @pytest.mark.asyncio
+    async def test_retires_heaviest_then_restarts(self, pooled):
+        browser, pool = pooled
+        light = await pool.acquire()
+        heavy = await pool.acquire()
+        heaps = {id(light): 10 * MB, id(heavy): 80 * MB}
+        watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=100)
+
+        result = await self.run_check(watchdog, 150 * MB, heaps)
+        assert result["retired"] == 1
+        heavy.close.assert_not_awaited()
+
+        await pool.release(heavy)
+        heavy.close.assert_awaited_once()
+        await pool.release(light)
+        light.close.assert_not_awaited()
+
+        result = await self.run_check(watchdog, 150 * MB, heaps)
+        assert result["restarted"]
+        browser.restart.assert_awaited_once()
+        light.close.assert_awaited_once()
+        assert watchdog.stats["restarts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_context_heap_budget(self, pooled):
+        browser, pool = pooled
+        await pool.warm(2)
+        big = pool.contexts[0]
+        watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=1000, context_heap_budget_mb=50)
+
+        result = await self.run_check(watchdog, 100 * MB, {id(big): 60 * MB})
+        assert result["retired"] == 1
+        big.close.assert_awaited_once()
+        assert pool.stats["size"] == 1
+
+    @pytest.mark.asyncio
+    async def test_restart_postponed_while_busy(self, pooled):
+        browser, pool = pooled
+        await pool.acquire()
+        watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=100, drain_timeout=0.01)
+        watchdog._over_budget = True
+
+        result = await self.run_check(watchdog, 150 * MB, {})
+        assert not result["restarted"]
+        browser.restart.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_no_restart_without_pool(self, pooled):
+        browser, _ = pooled
+        watchdog = MemoryWatchdog(browser, rss_budget_mb=100)
+
+        for _ in range(2):
+            result = await self.run_check(watchdog, 150 * MB, {})
+            assert result == {"rss_bytes": 150 * MB, "retired": 0, "restarted": False}
+        browser.restart.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_measures_root_pid_tree(self, pooled):
+        browser, pool = pooled
+        watchdog = MemoryWatchdog(browser, pool=pool, root_pid=4242)
+
+        with patch("automation.memory_watchdog.process_tree_rss", return_value=50 * MB) as tree_rss:
+            await watchdog.check()
+        tree_rss.assert_called_once_with(4242, True)
+
+    @pytest.mark.asyncio
+    async def test_restart_postponed_for_unpooled_contexts(self, pooled):
+        browser, pool = pooled
+        await pool.warm(1)
+        outside = await browser.new_context()
+        watchdog = MemoryWatchdog(browser, pool=pool, rss_budget_mb=100)
+        watchdog._over_budget = True
+
+        result = await self.run_check(watchdog, 150 * MB, {})
+        assert not result["restarted"]
+        browser.restart.assert_not_awaited()
+        outside.close.assert_not_awaited()
+
+        await outside.close()
+        result = await self.run_check(watchdog, 150 * MB, {})
+        assert result["restarted"]
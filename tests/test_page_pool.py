@@ -0,0 +1,111 @@
+"""Tests for the page pool."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from automation.page_pool import PagePool
+
+
+def make_page():
+    page = MagicMock()
+    page.closed = False
+    page.is_closed = lambda: page.closed
+    page.handlers = {}
+    page.on = MagicMock(side_effect=lambda event, handler: page.handlers.setdefault(event, []).append(handler))
+    page.remove_listener = MagicMock(side_effect=lambda event, handler: page.handlers[event].remove(handler))
+    page.unroute_all = AsyncMock()
+    page.evaluate = AsyncMock()
+    page.goto = AsyncMock()
+
+    async def close():
+        page.closed = True
+
+    page.close = AsyncMock(side_effect=close)
+    return page
+
+
+def make_context():
+    context = MagicMock()
+    context.new_page = AsyncMock(side_effect=lambda: make_page())
+    return context
+
+
+class TestPagePool:
+    @pytest.mark.asyncio
+    async def test_released_page_is_reset_and_reused(self):
+        pool = PagePool(make_context(), clear_storage=True)
+        page = await pool.acquire()
+        handler = MagicMock()
+        pool.listen(page, "response", handler)
+        popup = make_page()
+        page.handlers["popup"][0](popup)
+
+        await pool.release(page)
+        assert page.handlers["response"] == []
+        assert popup.closed
+        page.unroute_all.assert_awaited_once_with(behavior="ignoreErrors")
+        page.evaluate.assert_awaited_once()
+        page.goto.assert_awaited_once_with("about:blank")
+
+        assert await pool.acquire() is page
+        assert pool.stats["reused"] == 1
+
+    @pytest.mark.asyncio
+    async def test_recycles_after_max_uses(self):
+        pool = PagePool(make_context(), max_uses=2)
+        page = await pool.acquire()
+        await pool.release(page)
+        await pool.acquire()
+        await pool.release(page)
+
+        assert page.closed
+        assert await pool.acquire() is not page
+
+    @pytest.mark.asyncio
+    async def test_failed_reset_recycles_page(self):
+        pool = PagePool(make_context())
+        page = await pool.acquire()
+        page.goto.side_effect = Exception("Target crashed")
+        await pool.release(page)
+
+        assert page.closed
+        assert pool.stats["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waits_when_full(self):
+        pool = PagePool(make_context(), max_size=1)
+        page = await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        await pool.release(page)
+        assert await waiter is page
+
+    @pytest.mark.asyncio
+    async def test_closed_by_job_is_replaced(self):
+        pool = PagePool(make_context())
+        async with pool.page() as page:
+            await page.close()
+        assert pool.stats["size"] == 0
+        assert await pool.acquire() is not page
+
+    @pytest.mark.asyncio
+    async def test_close_reports_leaked_pages(self):
+        pool = PagePool(make_context())
+        await pool.acquire()
+        idle = await pool.acquire()
+        await pool.release(idle)
+
+        await pool.close()
+        assert idle.closed
+        assert pool.stats["leaked"] == 1
+        with pytest.raises(RuntimeError):
+            await pool.acquire()
+
+    @pytest.mark.asyncio
+    async def test_foreign_page_rejected(self):
+        pool = PagePool(make_context())
+        with pytest.raises(ValueError):
+            await pool.release(make_page())
@@ -0,0 +1,61 @@
+"""Tests for browser profile cloning."""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from automation.profiles import clone_profile
+
+
+@pytest.fixture
+def template(tmp_path):
+    root = tmp_path / "template"
+    (root / "Default" / "Cache" / "Cache_Data").mkdir(parents=True)
+    (root / "Default" / "Preferences").write_text("{}")
+    (root / "Default" / "Cache" / "Cache_Data" / "data_0").write_bytes(b"cached")
+    (root / "SingletonLock").write_text("host-123")
+    os.symlink("host-123", root / "SingletonSocket")
+    os.symlink("Preferences", root / "Default" / "Prefs-link")
+    return root
+
+
+class TestCloneProfile:
+    def test_clones_files_and_skips_locks(self, template, tmp_path):
+        target = tmp_path / "worker-1"
+        stats = clone_profile(str(template), str(target))
+
+        assert (target / "Default" / "Preferences").read_text() == "{}"
+        assert (target / "Default" / "Cache" / "Cache_Data" / "data_0").read_bytes() == b"cached"
+        assert os.readlink(target / "Default" / "Prefs-link") == "Preferences"
+        assert not (target / "SingletonLock").exists()
+        assert not os.path.lexists(target / "SingletonSocket")
+        assert stats["skipped"] == 2
+        assert stats["reflinked"] + stats["copied"] == 3
+
+    def test_hardlinks_cache_files(self, template, tmp_path):
+        target = tmp_path / "worker-1"
+        stats = clone_profile(str(template), str(target), hardlink_caches=True)
+
+        cached = target / "Default" / "Cache" / "Cache_Data" / "data_0"
+        assert os.stat(cached).st_ino == os.stat(template / "Default" / "Cache" / "Cache_Data" / "data_0").st_ino
+        assert os.stat(target / "Default" / "Preferences").st_nlink == 1
+        assert stats["hardlinked"] == 1
+
+    def test_falls_back_to_copy_without_reflink(self, template, tmp_path):
+        unsupported = OSError(95, "Operation not supported")
+        with patch("automation.profiles._reflink", side_effect=unsupported) as reflink:
+            stats = clone_profile(str(template), str(tmp_path / "worker-1"))
+        assert reflink.call_count == 1
+        assert stats["copied"] == 3
+
+    def test_existing_target(self, template, tmp_path):
+        target = tmp_path / "worker-1"
+        target.mkdir()
+        with pytest.raises(FileExistsError):
+            clone_profile(str(template), str(target))
+        clone_profile(str(template), str(target), overwrite=True)
+        assert (target / "Default" / "Preferences").exists()
+
+    def test_missing_template(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            clone_profile(str(tmp_path / "missing"), str(tmp_path / "target"))
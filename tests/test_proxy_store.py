@@ -0,0 +1,51 @@
+"""Tests for persistent proxy health state."""
+
+import time
+import pytest
+
+from automation.proxy_rotation import ProxyRotation
+from automation.proxy_store import ProxyStateStore
+
+PROXIES = ["http://a:80", "http://b:80", "http://c:80"]
+
+
+class TestProxyStateStore:
+    def test_save_and_load_roundtrip(self, tmp_path):
+        store = ProxyStateStore(str(tmp_path / "state.db"))
+        rotation = ProxyRotation(PROXIES, max_failures=1)
+        rotation.report_failure("http://b:80")
+        rotation.report_success("http://a:80", latency_ms=120)
+
+        assert store.save(rotation._proxies) == 3
+        state = store.load()
+        assert state["http://b:80"]["is_healthy"] == 0
+        assert state["http://a:80"]["ewma_latency_ms"] == 120
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_restarted_worker_skips_known_bad_proxy(self, tmp_path):
+        store = ProxyStateStore(str(tmp_path / "state.db"))
+        rotation = ProxyRotation(PROXIES, max_failures=1, state_store=store)
+        rotation.report_failure("http://b:80")
+        rotation._by_url["http://a:80"].last_checked = time.time()
+        rotation.report_success("http://a:80")
+        await rotation.flush_state()
+
+        restarted = ProxyRotation(PROXIES, max_failures=1, state_store=store)
+        assert restarted.healthy_count == 2
+        assert "http://b:80" not in {restarted.get_next() for _ in range(6)}
+        assert restarted._by_url["http://a:80"].last_checked > 0
+        store.close()
+
+    @pytest.mark.asyncio
+    async def test_workers_share_state_through_flush(self, tmp_path):
+        path = str(tmp_path / "state.db")
+        first = ProxyRotation(PROXIES, max_failures=1, state_store=ProxyStateStore(path))
+        second = ProxyRotation(PROXIES, max_failures=1, state_store=ProxyStateStore(path))
+
+        first.report_failure("http://c:80")
+        await first.flush_state()
+        await second.flush_state()
+
+        assert second.healthy_count == 2
+        assert not second._by_url["http://c:80"].is_healthy
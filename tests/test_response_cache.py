@@ -0,0 +1,130 @@
+"""Tests for the on-disk response cache."""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from automation.response_cache import ResponseCache
+
+
+def make_route(url, resource_type="script", method="GET"):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    route.request.method = method
+    route.fulfill = AsyncMock()
+    route.fallback = AsyncMock()
+    return route
+
+
+def make_response(body, status=200, headers=None):
+    response = MagicMock()
+    response.status = status
+    response.headers = headers or {"content-type": "application/javascript"}
+    response.body = AsyncMock(return_value=body)
+    return response
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        miss = make_route("https://cdn.example.com/app.js")
+        miss.fetch = AsyncMock(return_value=make_response(b"console.log(1)"))
+        await cache._handle_route(miss)
+
+        hit = make_route("https://cdn.example.com/app.js")
+        await cache._handle_route(hit)
+
+        hit.fulfill.assert_awaited_once()
+        assert hit.fulfill.await_args.kwargs["body"] == b"console.log(1)"
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+        assert cache.stats["bytes_saved"] == len(b"console.log(1)")
+
+    @pytest.mark.asyncio
+    async def test_non_cacheable_requests_fall_through(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        route = make_route("https://example.com/", resource_type="document")
+        await cache._handle_route(route)
+        route.fallback.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_no_store_is_not_cached(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        route = make_route("https://cdn.example.com/app.js")
+        route.fetch = AsyncMock(return_value=make_response(
+            b"x", headers={"cache-control": "no-store"},
+        ))
+        await cache._handle_route(route)
+        assert cache.stats["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_identical_bodies_share_blob(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        for url in ("https://a.example.com/lib.js", "https://b.example.com/lib.js"):
+            route = make_route(url)
+            route.fetch = AsyncMock(return_value=make_response(b"shared"))
+            await cache._handle_route(route)
+
+        assert cache.stats["entries"] == 2
+        assert cache.stats["size_bytes"] == len(b"shared")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_store_once(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        routes = []
+        for _ in range(8):
+            route = make_route("https://cdn.example.com/bundle.js")
+            route.fetch = AsyncMock(return_value=make_response(b"x" * 1000))
+            routes.append(route)
+        await asyncio.gather(*(cache._handle_route(route) for route in routes))
+
+        assert all(route.fulfill.await_count == 1 for route in routes)
+        assert cache.stats["stores"] == 1
+        assert list(cache._blob_refs.values()) == [1]
+        assert list(tmp_path.glob("blobs/*/*.tmp")) == []
+
+        cache._remove("https://cdn.example.com/bundle.js")
+        assert cache.stats["size_bytes"] == 0
+        assert list(tmp_path.glob("blobs/*/*")) == []
+
+    @pytest.mark.asyncio
+    async def test_failed_store_still_fulfills(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        route = make_route("https://cdn.example.com/app.js")
+        route.fetch = AsyncMock(return_value=make_response(b"body"))
+        with patch.object(ResponseCache, "_write_blob", side_effect=OSError("disk full")):
+            await cache._handle_route(route)
+
+        route.fulfill.assert_awaited_once()
+        assert cache.stats["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_bounds_size(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path), max_bytes=10)
+        for i in range(3):
+            route = make_route(f"https://cdn.example.com/{i}.js")
+            route.fetch = AsyncMock(return_value=make_response(bytes([i]) * 6))
+            await cache._handle_route(route)
+
+        assert cache.stats["entries"] == 1
+        assert cache.stats["evictions"] == 2
+        assert cache.stats["size_bytes"] <= 10
+
+    @pytest.mark.asyncio
+    async def test_index_survives_restart(self, tmp_path):
+        cache = ResponseCache(cache_dir=str(tmp_path))
+        route = make_route("https://cdn.example.com/app.css", resource_type="stylesheet")
+        route.fetch = AsyncMock(return_value=make_response(
+            b"body{}", headers={"content-type": "text/css", "content-encoding": "gzip"},
+        ))
+        await cache._handle_route(route)
+        cache.flush()
+
+        reloaded = ResponseCache(cache_dir=str(tmp_path))
+        hit = make_route("https://cdn.example.com/app.css", resource_type="stylesheet")
+        await reloaded._handle_route(hit)
+
+        assert hit.fulfill.await_args.kwargs["headers"] == {"content-type": "text/css"}
+        assert reloaded.stats["hits"] == 1
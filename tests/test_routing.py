@@ -0,0 +1,54 @@
+"""Tests for request routing profiles."""
+
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+
+from automation.routing import RoutingProfile
+
+
+def make_route(url, resource_type):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    route.abort = AsyncMock()
+    route.fallback = AsyncMock()
+    return route
+
+
+class TestRoutingProfile:
+    def test_blocks_resource_type(self):
+        profile = RoutingProfile(block_resource_types=["image"])
+        assert profile.should_block("https://example.com/a.png", "image")
+        assert not profile.should_block("https://example.com/", "document")
+
+    def test_blocks_domain_and_subdomains(self):
+        profile = RoutingProfile(block_domains=["doubleclick.net"])
+        assert profile.should_block("https://ad.doubleclick.net/x.js", "script")
+        assert profile.should_block("https://doubleclick.net/", "script")
+        assert not profile.should_block("https://notdoubleclick.net/", "script")
+
+    def test_blocks_url_pattern(self):
+        profile = RoutingProfile(block_url_patterns=["*/analytics/*"])
+        assert profile.should_block("https://example.com/analytics/track", "xhr")
+        assert not profile.should_block("https://example.com/api/items", "xhr")
+
+    def test_minimal_profile(self):
+        profile = RoutingProfile.minimal()
+        assert profile.should_block("https://example.com/font.woff2", "font")
+        assert profile.should_block("https://www.google-analytics.com/g.js", "script")
+        assert not profile.should_block("https://example.com/app.js", "script")
+
+    @pytest.mark.asyncio
+    async def test_route_handler_counts_requests(self):
+        profile = RoutingProfile(block_resource_types=["image"])
+        blocked = make_route("https://example.com/a.png", "image")
+        allowed = make_route("https://example.com/", "document")
+
+        await profile._handle_route(blocked)
+        await profile._handle_route(allowed)
+
+        blocked.abort.assert_awaited_once_with("blockedbyclient")
+        allowed.fallback.assert_awaited_once()
+        assert profile.stats["blocked_requests"] == 1
+        assert profile.stats["allowed_requests"] == 1
+        assert profile.stats["blocked_by_type"] == {"image": 1}
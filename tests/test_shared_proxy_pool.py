@@ -0,0 +1,80 @@
+"""Tests for the cross-process shared proxy pool."""
+
+import asyncio
+import multiprocessing
+import uuid
+import pytest
+
+from automation.shared_proxy_pool import SharedProxyRotation, SharedProxyState
+
+PROXIES = ["http://a:80", "http://b:80", "http://c:80"]
+
+
+@pytest.fixture
+def open_rotation():
+    name = f"test-proxies-{uuid.uuid4().hex[:8]}"
+    rotations = []
+
+    def factory(proxies=PROXIES, **kwargs):
+        rotation = SharedProxyRotation(proxies, shared_name=name, **kwargs)
+        rotations.append(rotation)
+        return rotation
+
+    factory.name = name
+    yield factory
+    for rotation in rotations:
+        rotation._shared.close()
+    state = SharedProxyState(name, PROXIES)
+    state.unlink()
+    state.close()
+
+
+def rotate_many(name, count):
+    rotation = SharedProxyRotation(PROXIES, shared_name=name)
+    for _ in range(count):
+        rotation.get_next()
+    asyncio.run(rotation.close())
+
+
+class TestSharedProxyRotation:
+    def test_round_robin_position_is_shared(self, open_rotation):
+        first = open_rotation()
+        second = open_rotation()
+        picks = [first.get_next(), second.get_next(), first.get_next()]
+        assert picks == PROXIES
+
+    def test_failures_are_shared(self, open_rotation):
+        first = open_rotation(max_failures=2)
+        second = open_rotation(max_failures=2)
+        first.report_failure("http://b:80")
+        second.report_failure("http://b:80")
+
+        for rotation in (first, second):
+            assert "http://b:80" not in {rotation.get_next() for _ in range(6)}
+
+    def test_fallback_strategy_respects_shared_health(self, open_rotation):
+        first = open_rotation(max_failures=1)
+        second = open_rotation(max_failures=1)
+        first.report_failure("http://a:80")
+        picks = {second.get_next("least_used") for _ in range(6)}
+        assert picks == {"http://b:80", "http://c:80"}
+
+    def test_mismatched_proxy_list_rejected(self, open_rotation):
+        open_rotation()
+        with pytest.raises(ValueError):
+            open_rotation(["http://other:80"])
+
+    def test_usage_counted_across_processes(self, open_rotation):
+        ctx = multiprocessing.get_context("spawn")
+        rotation = open_rotation()
+        workers = [
+            ctx.Process(target=rotate_many, args=(open_rotation.name, 500))
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        assert rotation.stats["shared_uses"] == 1000
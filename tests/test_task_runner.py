@@ -0,0 +1,87 @@
+"""Tests for the workflow task runner."""
+
+import asyncio
+import time
+import pytest
+
+from automation.task_runner import TaskRunner, AutomationTask, TaskStatus
+
+
+def sleeper(delay: float, value=None):
+    async def action(context):
+        await asyncio.sleep(delay)
+        return value
+    return action
+
+
+class TestTaskRunner:
+    @pytest.mark.asyncio
+    async def test_independent_tasks_run_concurrently(self):
+        runner = TaskRunner(max_concurrency=5)
+        for i in range(5):
+            runner.add_task(AutomationTask(f"t{i}", sleeper(0.1, i)))
+
+        start = time.perf_counter()
+        result = await runner.execute()
+        elapsed = time.perf_counter() - start
+
+        assert result.completed == 5
+        assert elapsed < 0.3
+
+    @pytest.mark.asyncio
+    async def test_default_runs_sequentially(self):
+        running = 0
+        peak = 0
+
+        async def action(context):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        runner = TaskRunner()
+        for i in range(3):
+            runner.add_task(AutomationTask(f"t{i}", action))
+        await runner.execute()
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    async def test_dependency_receives_upstream_result(self):
+        async def consume(context):
+            return context["fetch"] + 1
+
+        runner = TaskRunner(max_concurrency=4)
+        runner.add_task(AutomationTask("use", consume).depends("fetch"))
+        runner.add_task(AutomationTask("fetch", sleeper(0.01, 41)))
+        result = await runner.execute()
+
+        assert [r.task_name for r in result.task_results] == ["fetch", "use"]
+        assert result.task_results[1].result_data == 42
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_skips_dependents(self):
+        async def boom(context):
+            raise RuntimeError("boom")
+
+        runner = TaskRunner(max_concurrency=2)
+        runner.add_task(AutomationTask("a", boom))
+        runner.add_task(AutomationTask("b", sleeper(0)).depends("a"))
+        runner.add_task(AutomationTask("c", sleeper(0)))
+        result = await runner.execute()
+
+        statuses = {r.task_name: r.status for r in result.task_results}
+        assert statuses == {
+            "a": TaskStatus.FAILED,
+            "b": TaskStatus.SKIPPED,
+            "c": TaskStatus.COMPLETED,
+        }
+        assert result.task_results[0].error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_dependency_cycle_is_skipped(self):
+        runner = TaskRunner(max_concurrency=2)
+        runner.add_task(AutomationTask("a", sleeper(0)).depends("b"))
+        runner.add_task(AutomationTask("b", sleeper(0)).depends("a"))
+        result = await runner.execute()
+        assert result.skipped == 2
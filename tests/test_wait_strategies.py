@@ -51,4 +51,39 @@ class TestWaitConditionEnum:
 
     def test_all_conditions(self):
         conditions = list(WaitCondition)
-        assert len(conditions) == 5
\ No newline at end of file
+        assert len(conditions) == 5
+
+
+class FakePage:
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def evaluate(self, script, args):
+        self.args = args
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+class TestWaitForDomStable:
+    @pytest.mark.asyncio
+    async def test_stable_result_is_truthy(self):
+        page = FakePage(True)
+        result = await WaitStrategies.wait_for_dom_stable(
+            page, stability_time=0.5, timeout=5, selector="#results",
+        )
+        assert result
+        assert result.waited_ms >= 0
+        assert page.args == ["#results", 500, 5000]
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_falsy(self):
+        result = await WaitStrategies.wait_for_dom_stable(FakePage(False))
+        assert not result
+        assert result.stable is False
+
+    @pytest.mark.asyncio
+    async def test_navigation_error_is_not_stable(self):
+        page = FakePage(Exception("Execution context was destroyed"))
+        result = await WaitStrategies.wait_for_dom_stable(page)
+        assert not result